@@ -0,0 +1,338 @@
+from typing import Dict, List, Union
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from app.adapters.api.common import (
+    CATEGORIES,
+    REPOSITORY_CACHE,
+    REPOSITORY_TYPE,
+    ExportFormat,
+    ProductListQuery,
+    aserialize_export,
+    check_bulk_size,
+    export_media_type,
+    menu_response,
+    product_list_query,
+    products_json_response,
+)
+from app.adapters.api.conditional import (
+    catalog_headers,
+    if_match_version,
+    is_not_modified,
+    not_modified_response,
+    product_etag,
+    validator_headers,
+    wants_catalog_validation,
+)
+from app.adapters.cache.menu_snapshots import menu_snapshots
+from app.adapters.models.sql.async_session import get_async_db, get_async_replica_dbs
+from app.adapters.repositories import get_async_product_repository, product_cache
+from app.application.use_cases.async_product_use_cases import AsyncProductUseCases
+from app.config import settings
+from app.domain.entities.product import (
+    Product,
+    ProductBulkDeleteResult,
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductCategory,
+    ProductDb,
+    ProductUpdate,
+    StockReservation,
+)
+from app.domain.exceptions import (
+    InsufficientStockError,
+    ProductNotFoundError,
+    VersionConflictError,
+)
+
+router = APIRouter()
+
+
+# Helper function to get async product use cases with the configured repository. Declared
+# async so FastAPI calls it on the event loop: it only wraps the sessions, without I/O
+async def get_async_product_use_cases(
+    db: AsyncSession = Depends(get_async_db),
+    replicas: List[AsyncSession] = Depends(get_async_replica_dbs),
+) -> AsyncProductUseCases:
+    repository = get_async_product_repository(
+        REPOSITORY_TYPE,
+        db,
+        REPOSITORY_CACHE,
+        replicas,
+        settings.READ_FROM_NOSQL,
+        menu_snapshots,
+        settings.METRICS_ENABLED,
+    )
+    return AsyncProductUseCases(repository)
+
+
+@router.get("/", response_model=List[ProductDb])
+async def get_all_products(
+    request: Request,
+    query: ProductListQuery = Depends(product_list_query),
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    List products, optionally filtered and paginated by keyset.
+    When `limit` is set and more rows remain, the opaque token for the next page
+    is returned in the `X-Next-Cursor` header.
+    Supports conditional requests through `If-None-Match`; the catalog ETag is
+    only computed, and returned, for requests that send one.
+    """
+    headers = {}
+    if wants_catalog_validation(request):
+        headers = catalog_headers(request, await use_cases.get_catalog_stamp())
+        if is_not_modified(request, headers["ETag"], None):
+            return not_modified_response(headers)
+
+    try:
+        page = await use_cases.list_products(
+            query.filters, query.sort_by, query.order, query.limit, query.cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return products_json_response(page.items, headers)
+
+
+async def close_sessions(sessions: List[AsyncSession]) -> None:
+    for session in sessions:
+        await session.close()
+
+
+@router.get("/export")
+async def export_products(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    db: AsyncSession = Depends(get_async_db),
+    replicas: List[AsyncSession] = Depends(get_async_replica_dbs),
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    Stream the whole catalog as NDJSON (default) or as a chunked JSON array.
+    Rows are read in batches, so memory use does not grow with the catalog size.
+    """
+    headers = {}
+    if wants_catalog_validation(request):
+        headers = catalog_headers(request, await use_cases.get_catalog_stamp())
+        if is_not_modified(request, headers["ETag"], None):
+            return not_modified_response(headers)
+
+    products = use_cases.export_products(settings.EXPORT_BATCH_SIZE)
+    # The sessions are released by get_async_db/get_async_replica_dbs before the
+    # body is streamed; the export reopens the one it reads from lazily (the
+    # primary or a replica), so close them again once the last chunk has been sent
+    return StreamingResponse(
+        aserialize_export(products, format),
+        media_type=export_media_type(format),
+        headers=headers,
+        background=BackgroundTask(close_sessions, [db, *replicas]),
+    )
+
+
+@router.get("/categories", response_model=List[str])
+async def get_categories():
+    return CATEGORIES
+
+
+@router.get("/menu", response_model=Dict[ProductCategory, List[ProductDb]])
+async def get_menu(use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases)):
+    """
+    The whole menu grouped by category, served from a pre-serialized snapshot;
+    only a stale snapshot goes to the database
+    """
+    body = menu_snapshots.get()
+    if body is None:
+        generation = menu_snapshots.generation
+        body = menu_snapshots.load(await use_cases.get_all_products(), generation)
+    return menu_response(body)
+
+
+@router.get("/menu/{category}", response_model=List[ProductDb])
+async def get_category_menu(
+    category: ProductCategory,
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    body = menu_snapshots.get(category)
+    if body is None:
+        generation = menu_snapshots.generation
+        body = menu_snapshots.load(await use_cases.get_all_products(), generation, category)
+    return menu_response(body)
+
+
+@router.get("/search", response_model=List[ProductDb])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=settings.MAX_PAGE_SIZE),
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    Ranked full-text search on name and description. Every word must match and
+    the last one also matches as a prefix, for typeahead
+    """
+    return products_json_response(await use_cases.search_products(q, limit))
+
+
+@router.post("/bulk", response_model=ProductBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_products(
+    products: List[Product],
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    check_bulk_size(products)
+    return await use_cases.create_products(products)
+
+
+@router.put("/bulk", response_model=ProductBulkResult)
+async def update_products(
+    products: List[ProductBulkUpdate],
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    Update many products in one transaction; missing or duplicated IDs are
+    reported per item in `errors` instead of failing the whole batch
+    """
+    check_bulk_size(products)
+    return await use_cases.update_products(products)
+
+
+@router.delete("/bulk", response_model=ProductBulkDeleteResult)
+async def delete_products(
+    product_ids: List[int] = Body(...),
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    check_bulk_size(product_ids)
+    return await use_cases.delete_products(product_ids)
+
+
+@router.post("/reservations", response_model=List[ProductDb])
+async def reserve_stock(
+    reservation: StockReservation,
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    Apply the quantity changes of a whole order atomically. Stock is clamped at 0
+    unless `reject_if_insufficient` is set, in which case the request fails with 409
+    """
+    check_bulk_size(reservation.items)
+    try:
+        return await use_cases.reserve_stock(reservation)
+    except ProductNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except InsufficientStockError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return {"enabled": settings.CACHE_ENABLED, **product_cache.stats()}
+
+
+@router.get("/{product_id}", response_model=ProductDb)
+async def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    product = await use_cases.get_product_by_id(product_id)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found"
+        )
+    headers = validator_headers(product_etag(product), product.updated_at)
+    if is_not_modified(request, headers["ETag"], product.updated_at):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    return product
+
+
+@router.post("/", response_model=ProductDb, status_code=status.HTTP_201_CREATED)
+async def create_product(
+    product: Product, use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases)
+):
+    return await use_cases.create_product(product)
+
+
+async def apply_update(
+    product_id: int,
+    changes: Union[Product, ProductUpdate],
+    request: Request,
+    response: Response,
+    use_cases: AsyncProductUseCases,
+) -> ProductDb:
+    try:
+        updated_product = await use_cases.update_product(
+            product_id, changes, if_match_version(request, product_id)
+        )
+    except VersionConflictError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if not updated_product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found"
+        )
+    response.headers.update(validator_headers(product_etag(updated_product), updated_product.updated_at))
+    return updated_product
+
+
+@router.put("/{product_id}", response_model=ProductDb)
+async def update_product(
+    product_id: int,
+    product: Product,
+    request: Request,
+    response: Response,
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    Replace the product. With If-Match set to its ETag the write only applies
+    to that version; a product changed in the meantime fails with 409
+    """
+    return await apply_update(product_id, product, request, response, use_cases)
+
+
+@router.patch("/{product_id}", response_model=ProductDb)
+async def patch_product(
+    product_id: int,
+    changes: ProductUpdate,
+    request: Request,
+    response: Response,
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """Change only the fields present in the body, in a single round trip; If-Match as for PUT"""
+    return await apply_update(product_id, changes, request, response, use_cases)
+
+
+@router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_product(
+    product_id: int, use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases)
+):
+    deleted = await use_cases.delete_product(product_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found"
+        )
+
+
+@router.patch("/{product_id}/quantity/{change}", response_model=ProductDb)
+async def update_quantity(
+    product_id: int,
+    change: int,
+    use_cases: AsyncProductUseCases = Depends(get_async_product_use_cases),
+):
+    """
+    Update product quantity by adding the change amount (use negative for reduction)
+    """
+    updated_product = await use_cases.update_product_quantity(product_id, change)
+    if not updated_product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found"
+        )
+    return updated_product 
\ No newline at end of file
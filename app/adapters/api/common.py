@@ -0,0 +1,113 @@
+"""Request parsing and serialization helpers shared by the sync and async product routers"""
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, TypeAdapter
+
+from app.adapters.repositories import RepositoryType, product_cache
+from app.config import settings
+from app.domain.entities.product import (
+    ProductCategory,
+    ProductDb,
+    ProductFilter,
+    ProductSortField,
+    SortOrder,
+)
+
+
+# Resolved once per process instead of on every request
+REPOSITORY_CACHE = product_cache if settings.CACHE_ENABLED else None
+REPOSITORY_TYPE = RepositoryType(settings.PRODUCT_BACKEND)
+CATEGORIES = [category.value for category in ProductCategory]
+
+# Serializes already-validated entities in one pydantic-core call
+product_list_adapter = TypeAdapter(List[ProductDb])
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    JSON = "json"
+
+
+class ProductListQuery(BaseModel):
+    filters: ProductFilter
+    sort_by: ProductSortField
+    order: SortOrder
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+
+def product_list_query(
+    category: Optional[ProductCategory] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = None,
+    sort_by: ProductSortField = ProductSortField.ID,
+    order: SortOrder = SortOrder.ASC,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+) -> ProductListQuery:
+    filters = ProductFilter(
+        category=category, min_price=min_price, max_price=max_price, in_stock=in_stock
+    )
+    return ProductListQuery(filters=filters, sort_by=sort_by, order=order, limit=limit, cursor=cursor)
+
+
+def menu_response(body: bytes) -> Response:
+    """Serve a pre-serialized menu snapshot without touching it"""
+    return Response(content=body, media_type="application/json")
+
+
+def products_json_response(products: List[ProductDb], headers: Optional[dict] = None) -> Response:
+    """
+    JSON response for a product listing. Returning a Response skips FastAPI's
+    response_model step, which would validate and encode every item again
+    """
+    return Response(
+        content=product_list_adapter.dump_json(products),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def check_bulk_size(items: list):
+    if len(items) > settings.MAX_BULK_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk requests are limited to {settings.MAX_BULK_SIZE} items"
+        )
+
+
+def export_media_type(export_format: ExportFormat) -> str:
+    return "application/x-ndjson" if export_format == ExportFormat.NDJSON else "application/json"
+
+
+def serialize_export(products: Iterable[ProductDb], export_format: ExportFormat) -> Iterator[bytes]:
+    if export_format == ExportFormat.NDJSON:
+        for product in products:
+            yield product.model_dump_json().encode() + b"\n"
+        return
+
+    yield b"["
+    separator = b""
+    for product in products:
+        yield separator + product.model_dump_json().encode()
+        separator = b","
+    yield b"]"
+
+
+async def aserialize_export(
+    products: AsyncIterable[ProductDb], export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.NDJSON:
+        async for product in products:
+            yield product.model_dump_json().encode() + b"\n"
+        return
+
+    yield b"["
+    separator = b""
+    async for product in products:
+        yield separator + product.model_dump_json().encode()
+        separator = b","
+    yield b"]"
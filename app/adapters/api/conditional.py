@@ -0,0 +1,101 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.domain.entities.product import CatalogStamp, ProductDb
+
+
+def _timestamp(value: Optional[datetime]) -> int:
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1_000_000) if value else 0
+
+
+def product_etag(product: ProductDb) -> str:
+    # Every write bumps the version, so it identifies the representation on any backend
+    return f'"{product.id}-{product.version}"'
+
+
+def if_match_version(request: Request, product_id: int) -> Optional[int]:
+    """
+    Version a write must find, from If-Match; None without the header or for
+    "*". A header naming no version of this product can never match (409)
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+    # If-Match uses strong comparison, so weak (W/) tags never match
+    pattern = re.compile(rf'"{product_id}-(\d+)"')
+    versions = {
+        int(match.group(1))
+        for match in map(pattern.fullmatch, (tag.strip() for tag in if_match.split(",")))
+        if match
+    }
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"If-Match does not name a version of product with ID {product_id}"
+        )
+    if len(versions) > 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="If-Match may name a single version"
+        )
+    return versions.pop()
+
+
+def catalog_etag(stamp: CatalogStamp, variant: str = "") -> str:
+    """Entity tag for a catalog listing; variant distinguishes query strings"""
+    raw = f"{stamp.count}:{_timestamp(stamp.last_modified)}:{variant}"
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def catalog_headers(request: Request, stamp: CatalogStamp) -> dict:
+    """
+    Validators of a catalog listing. Only the ETag is sent: it includes the
+    product count, while the newest updated_at does not change on deletes
+    """
+    return {"ETag": catalog_etag(stamp, request.url.query)}
+
+
+def wants_catalog_validation(request: Request) -> bool:
+    """The catalog stamp costs a count over the catalog, so it is only read for If-None-Match"""
+    return "if-none-match" in request.headers
+
+
+def format_http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag}
+    if last_modified:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match (which takes precedence) or If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # GET uses weak comparison, so W/ prefixes are ignored
+        return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
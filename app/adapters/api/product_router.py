@@ -1,39 +1,250 @@
-from typing import List
+from typing import Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
-from app.adapters.models.sql.session import get_db
-from app.adapters.repositories import RepositoryType, get_product_repository
+from app.adapters.api.common import (
+    CATEGORIES,
+    REPOSITORY_CACHE,
+    REPOSITORY_TYPE,
+    ExportFormat,
+    ProductListQuery,
+    check_bulk_size,
+    export_media_type,
+    menu_response,
+    product_list_query,
+    products_json_response,
+    serialize_export,
+)
+from app.adapters.api.conditional import (
+    catalog_headers,
+    if_match_version,
+    is_not_modified,
+    not_modified_response,
+    product_etag,
+    validator_headers,
+    wants_catalog_validation,
+)
+from app.adapters.cache.menu_snapshots import menu_snapshots
+from app.adapters.models.sql.session import get_db, get_replica_dbs
+from app.adapters.repositories import get_product_repository, product_cache
 from app.application.use_cases.product_use_cases import ProductUseCases
-from app.domain.entities.product import Product, ProductDb, ProductCategory
+from app.config import settings
+from app.domain.entities.product import (
+    Product,
+    ProductBulkDeleteResult,
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductCategory,
+    ProductDb,
+    ProductUpdate,
+    StockReservation,
+)
+from app.domain.exceptions import (
+    InsufficientStockError,
+    ProductNotFoundError,
+    VersionConflictError,
+)
 
 router = APIRouter()
 
-# Helper function to get product use cases with SQL repository
-def get_product_use_cases(db: Session = Depends(get_db)) -> ProductUseCases:
-    repository = get_product_repository(RepositoryType.SQL, db)
+
+# Helper function to get product use cases with the configured repository. Declared
+# async so FastAPI calls it on the event loop: it only wraps the sessions, without I/O
+async def get_product_use_cases(
+    db: Session = Depends(get_db),
+    replicas: List[Session] = Depends(get_replica_dbs),
+) -> ProductUseCases:
+    repository = get_product_repository(
+        REPOSITORY_TYPE,
+        db,
+        REPOSITORY_CACHE,
+        replicas,
+        settings.READ_FROM_NOSQL,
+        menu_snapshots,
+        settings.METRICS_ENABLED,
+    )
     return ProductUseCases(repository)
 
 
 @router.get("/", response_model=List[ProductDb])
-def get_all_products(use_cases: ProductUseCases = Depends(get_product_use_cases)):
-    return use_cases.get_all_products()
+def get_all_products(
+    request: Request,
+    query: ProductListQuery = Depends(product_list_query),
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
+    """
+    List products, optionally filtered and paginated by keyset.
+    When `limit` is set and more rows remain, the opaque token for the next page
+    is returned in the `X-Next-Cursor` header.
+    Supports conditional requests through `If-None-Match`; the catalog ETag is
+    only computed, and returned, for requests that send one.
+    """
+    headers = {}
+    if wants_catalog_validation(request):
+        headers = catalog_headers(request, use_cases.get_catalog_stamp())
+        if is_not_modified(request, headers["ETag"], None):
+            return not_modified_response(headers)
+
+    try:
+        page = use_cases.list_products(
+            query.filters, query.sort_by, query.order, query.limit, query.cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return products_json_response(page.items, headers)
+
+
+def close_sessions(sessions: List[Session]) -> None:
+    for session in sessions:
+        session.close()
+
+
+@router.get("/export")
+def export_products(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    db: Session = Depends(get_db),
+    replicas: List[Session] = Depends(get_replica_dbs),
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
+    """
+    Stream the whole catalog as NDJSON (default) or as a chunked JSON array.
+    Rows are read in batches, so memory use does not grow with the catalog size.
+    """
+    headers = {}
+    if wants_catalog_validation(request):
+        headers = catalog_headers(request, use_cases.get_catalog_stamp())
+        if is_not_modified(request, headers["ETag"], None):
+            return not_modified_response(headers)
+
+    products = use_cases.export_products(settings.EXPORT_BATCH_SIZE)
+    # The sessions are released by get_db/get_replica_dbs before the body is
+    # streamed; the export reopens the one it reads from lazily (the primary or
+    # a replica), so close them again once the last chunk has been sent
+    return StreamingResponse(
+        serialize_export(products, format),
+        media_type=export_media_type(format),
+        headers=headers,
+        background=BackgroundTask(close_sessions, [db, *replicas]),
+    )
 
 
 @router.get("/categories", response_model=List[str])
-def get_categories():
-    return [category.value for category in ProductCategory]
+async def get_categories():
+    return CATEGORIES
+
+
+def load_menu(use_cases: ProductUseCases, category: Optional[ProductCategory]) -> bytes:
+    generation = menu_snapshots.generation
+    return menu_snapshots.load(use_cases.get_all_products(), generation, category)
+
+
+@router.get("/menu", response_model=Dict[ProductCategory, List[ProductDb]])
+async def get_menu(use_cases: ProductUseCases = Depends(get_product_use_cases)):
+    """
+    The whole menu grouped by category, served from a pre-serialized snapshot;
+    only a stale snapshot goes to the database
+    """
+    body = menu_snapshots.get() or await run_in_threadpool(load_menu, use_cases, None)
+    return menu_response(body)
+
+
+@router.get("/menu/{category}", response_model=List[ProductDb])
+async def get_category_menu(
+    category: ProductCategory,
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
+    body = menu_snapshots.get(category) or await run_in_threadpool(load_menu, use_cases, category)
+    return menu_response(body)
+
+
+@router.get("/search", response_model=List[ProductDb])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=settings.MAX_PAGE_SIZE),
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
+    """
+    Ranked full-text search on name and description. Every word must match and
+    the last one also matches as a prefix, for typeahead
+    """
+    return products_json_response(use_cases.search_products(q, limit))
+
+
+@router.post("/bulk", response_model=ProductBulkResult, status_code=status.HTTP_201_CREATED)
+def create_products(
+    products: List[Product], use_cases: ProductUseCases = Depends(get_product_use_cases)
+):
+    check_bulk_size(products)
+    return use_cases.create_products(products)
+
+
+@router.put("/bulk", response_model=ProductBulkResult)
+def update_products(
+    products: List[ProductBulkUpdate], use_cases: ProductUseCases = Depends(get_product_use_cases)
+):
+    """
+    Update many products in one transaction; missing or duplicated IDs are
+    reported per item in `errors` instead of failing the whole batch
+    """
+    check_bulk_size(products)
+    return use_cases.update_products(products)
+
+
+@router.delete("/bulk", response_model=ProductBulkDeleteResult)
+def delete_products(
+    product_ids: List[int] = Body(...), use_cases: ProductUseCases = Depends(get_product_use_cases)
+):
+    check_bulk_size(product_ids)
+    return use_cases.delete_products(product_ids)
+
+
+@router.post("/reservations", response_model=List[ProductDb])
+def reserve_stock(
+    reservation: StockReservation, use_cases: ProductUseCases = Depends(get_product_use_cases)
+):
+    """
+    Apply the quantity changes of a whole order atomically. Stock is clamped at 0
+    unless `reject_if_insufficient` is set, in which case the request fails with 409
+    """
+    check_bulk_size(reservation.items)
+    try:
+        return use_cases.reserve_stock(reservation)
+    except ProductNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except InsufficientStockError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    return {"enabled": settings.CACHE_ENABLED, **product_cache.stats()}
 
 
 @router.get("/{product_id}", response_model=ProductDb)
-def get_product(product_id: int, use_cases: ProductUseCases = Depends(get_product_use_cases)):
+def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
     product = use_cases.get_product_by_id(product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with ID {product_id} not found"
         )
+    headers = validator_headers(product_etag(product), product.updated_at)
+    if is_not_modified(request, headers["ETag"], product.updated_at):
+        return not_modified_response(headers)
+    response.headers.update(headers)
     return product
 
 
@@ -42,19 +253,55 @@ def create_product(product: Product, use_cases: ProductUseCases = Depends(get_pr
     return use_cases.create_product(product)
 
 
-@router.put("/{product_id}", response_model=ProductDb)
-def update_product(
-    product_id: int, product: Product, use_cases: ProductUseCases = Depends(get_product_use_cases)
-):
-    updated_product = use_cases.update_product(product_id, product)
+def apply_update(
+    product_id: int,
+    changes: Union[Product, ProductUpdate],
+    request: Request,
+    response: Response,
+    use_cases: ProductUseCases,
+) -> ProductDb:
+    try:
+        updated_product = use_cases.update_product(
+            product_id, changes, if_match_version(request, product_id)
+        )
+    except VersionConflictError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
     if not updated_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with ID {product_id} not found"
         )
+    response.headers.update(validator_headers(product_etag(updated_product), updated_product.updated_at))
     return updated_product
 
 
+@router.put("/{product_id}", response_model=ProductDb)
+def update_product(
+    product_id: int,
+    product: Product,
+    request: Request,
+    response: Response,
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
+    """
+    Replace the product. With If-Match set to its ETag the write only applies
+    to that version; a product changed in the meantime fails with 409
+    """
+    return apply_update(product_id, product, request, response, use_cases)
+
+
+@router.patch("/{product_id}", response_model=ProductDb)
+def patch_product(
+    product_id: int,
+    changes: ProductUpdate,
+    request: Request,
+    response: Response,
+    use_cases: ProductUseCases = Depends(get_product_use_cases),
+):
+    """Change only the fields present in the body, in a single round trip; If-Match as for PUT"""
+    return apply_update(product_id, changes, request, response, use_cases)
+
+
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(product_id: int, use_cases: ProductUseCases = Depends(get_product_use_cases)):
     deleted = use_cases.delete_product(product_id)
@@ -0,0 +1,144 @@
+import json
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.domain.entities.product import ProductCategory, ProductDb
+
+product_adapter = TypeAdapter(ProductDb)
+
+# category -> {product id -> serialized product}
+_Items = Dict[ProductCategory, Dict[int, bytes]]
+# (created_at, version) of the applied state of a product. SQLite hands a deleted
+# max id to the next insert, so created_at tells a new product from the one it replaced
+_Revision = Tuple[datetime, float]
+# Version of a deleted product: no later write to that same product may bring it back
+DELETED = math.inf
+
+
+def _revision(product: ProductDb) -> _Revision:
+    return (product.created_at or datetime.min, product.version)
+
+
+def _category_body(items: Dict[int, bytes]) -> bytes:
+    return b"[" + b",".join(items[product_id] for product_id in sorted(items)) + b"]"
+
+
+def _menu_body(bodies: Dict[ProductCategory, bytes]) -> bytes:
+    return b"{" + b",".join(
+        json.dumps(category.value).encode() + b":" + bodies[category] for category in ProductCategory
+    ) + b"}"
+
+
+class MenuSnapshots:
+    """
+    Pre-serialized JSON of the menu: one array per ProductCategory and the whole
+    menu as an object keyed by category, both served as-is.
+
+    Every product is serialized once and kept as bytes, so a write re-serializes
+    only the changed products and re-joins the categories they touch. Concurrent
+    writes may be applied out of order, so each product keeps the revision it was
+    applied at and older revisions are ignored. Writes made by other processes are
+    picked up by a full reload once the snapshots are older than max_age seconds.
+    """
+
+    def __init__(self, max_age: float, clock: Callable[[], float] = time.monotonic):
+        self.max_age = max_age
+        self._clock = clock
+        self._items: _Items = {}
+        self._revisions: Dict[int, _Revision] = {}
+        self._bodies: Dict[ProductCategory, bytes] = {}
+        self._menu = b""
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, category: Optional[ProductCategory] = None) -> Optional[bytes]:
+        """The snapshot body, or None when it must be (re)loaded"""
+        loaded_at = self._loaded_at
+        if loaded_at is None or self._clock() - loaded_at >= self.max_age:
+            return None
+        return self._menu if category is None else self._bodies[category]
+
+    def load(
+        self,
+        products: Iterable[ProductDb],
+        generation: int,
+        category: Optional[ProductCategory] = None,
+    ) -> bytes:
+        """
+        Build the snapshots from the full catalog and return the requested body.
+        They are only kept if no write happened since `generation` was read,
+        otherwise the catalog may predate that write.
+        """
+        items: _Items = {member: {} for member in ProductCategory}
+        revisions: Dict[int, _Revision] = {}
+        for product in products:
+            items[ProductCategory(product.category)][product.id] = product_adapter.dump_json(product)
+            revisions[product.id] = _revision(product)
+        bodies = {member: _category_body(items[member]) for member in ProductCategory}
+        menu = _menu_body(bodies)
+
+        with self._lock:
+            if generation == self._generation:
+                self._items, self._bodies, self._menu = items, bodies, menu
+                self._revisions = revisions
+                self._loaded_at = self._clock()
+        return menu if category is None else bodies[category]
+
+    def apply(self, upserted: Iterable[ProductDb] = (), deleted: Iterable[int] = ()) -> None:
+        """Patch the snapshots with the result of a write, unless a newer one is already applied"""
+        changes = [(product.id, product) for product in upserted if product is not None]
+        changes.extend((product_id, None) for product_id in deleted)
+        if not changes:
+            return
+
+        with self._lock:
+            self._generation += 1
+            if self._loaded_at is None:
+                return
+            touched = set()
+            for product_id, product in changes:
+                applied = self._revisions.get(product_id)
+                if product is not None:
+                    revision = _revision(product)
+                else:
+                    # The deleted product's own created_at; a product never seen is dated now
+                    revision = (applied[0] if applied else datetime.utcnow(), DELETED)
+                if applied is not None and revision < applied:
+                    continue
+                self._revisions[product_id] = revision
+                touched.update(self._remove(product_id))
+                if product is not None:
+                    category = ProductCategory(product.category)
+                    self._items[category][product_id] = product_adapter.dump_json(product)
+                    touched.add(category)
+            for category in touched:
+                self._bodies[category] = _category_body(self._items[category])
+            self._menu = _menu_body(self._bodies)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._items, self._bodies, self._menu = {}, {}, b""
+            self._revisions = {}
+            self._loaded_at = None
+
+    def _remove(self, product_id: int) -> Tuple[ProductCategory, ...]:
+        # A product may have moved category, so look in all of them
+        return tuple(
+            category for category, items in self._items.items()
+            if items.pop(product_id, None) is not None
+        )
+
+
+menu_snapshots = MenuSnapshots(max_age=settings.MENU_MAX_AGE_SECONDS)
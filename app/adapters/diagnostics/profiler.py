@@ -0,0 +1,159 @@
+"""Per-request sampling profiler writing collapsed stacks (flamegraph.pl, speedscope, inferno)"""
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# The app package; stacks without any frame from it are idle threads
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def collapsed_stack(frame, root: str = APP_ROOT) -> Optional[str]:
+    """'module:function;module:function...' from the outermost frame, None if no frame is under root"""
+    names = []
+    relevant = False
+    while frame is not None:
+        code = frame.f_code
+        relevant = relevant or code.co_filename.startswith(root)
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        frame = frame.f_back
+    if not relevant:
+        return None
+    names.reverse()
+    return ";".join(names)
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread at a fixed interval from a
+    background thread. Only stacks running code under root are counted, which
+    drops idle pool workers and an event loop waiting on I/O; requests served
+    concurrently by the same process are sampled too.
+    """
+
+    def __init__(self, interval: float, root: str = APP_ROOT):
+        self.interval = interval
+        self.root = root
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def sample(self, ignore: Optional[int] = None) -> None:
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == ignore:
+                continue
+            stack = collapsed_stack(frame, self.root)
+            if stack is not None:
+                self.stacks[stack] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the sampling thread to stop; it takes no sample after this returns control"""
+        self._stop.set()
+
+    def join(self) -> Counter:
+        """Wait for the sampling thread (after stop) and return the stacks"""
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(ignore=own)
+
+
+def collapsed(stacks: Counter) -> str:
+    """One 'stack count' line per distinct stack, the format flamegraph tools read"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling the requests that carry the trigger header
+    (any value but 0/false), plus a sample_rate share of all requests. One
+    request is profiled at a time per process, the others run untouched. The
+    profile id is returned in the X-Profile-Id header and names the file.
+    """
+
+    def __init__(
+        self,
+        app,
+        directory: str,
+        interval: float,
+        header: str = "X-Profile",
+        sample_rate: float = 0.0,
+        root: str = APP_ROOT,
+    ):
+        self.app = app
+        self.directory = directory
+        self.interval = interval
+        self.header = header.lower().encode("latin-1")
+        self.sample_rate = sample_rate
+        self.root = root
+        self._busy = threading.Lock()
+
+    def _wanted(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return value.lower() not in (b"", b"0", b"false")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:16]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        sampler = StackSampler(self.interval, self.root)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            seconds = time.perf_counter() - started
+            sampler.stop()
+            # Joining the sampler and writing the file would block the event loop
+            await run_in_threadpool(self._finish, profile_id, scope, sampler, seconds)
+
+    def _finish(self, profile_id: str, scope, sampler: StackSampler, seconds: float) -> None:
+        try:
+            stacks = sampler.join()
+            self._write(profile_id, scope, sampler.samples, stacks, seconds)
+        finally:
+            # Held until the sampler thread is gone, so samplers never sample each other
+            self._busy.release()
+
+    def _write(self, profile_id: str, scope, samples: int, stacks: Counter, seconds: float) -> str:
+        route = getattr(scope.get("route"), "path_format", None) or scope["path"]
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(
+            self.directory, f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{profile_id}.folded"
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "w") as profile:
+            profile.write(collapsed(stacks))
+        logger.info(
+            "Profiled %s %s in %.1f ms (%d samples) to %s", scope["method"], route, seconds * 1000, samples, path
+        )
+        return path
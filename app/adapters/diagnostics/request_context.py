@@ -0,0 +1,34 @@
+"""The HTTP request being served, for diagnostics emitted far below the routers"""
+from contextvars import ContextVar
+from typing import Optional
+
+# Copied into the threadpool with the rest of the context, so sync routes see it too
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """'METHOD /route/template' of the request in progress, None outside requests"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    # The router stores the matched route in the scope; before matching only the path is known
+    route = getattr(scope.get("route"), "path_format", None) or scope["path"]
+    return f"{scope['method']} {route}"
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware exposing the request scope through current_scope"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
@@ -0,0 +1,94 @@
+"""Log of the SQL statements and Mongo commands slower than SLOW_QUERY_MS, with the route they served"""
+import logging
+import time
+from typing import Optional
+
+from pymongo import monitoring
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.adapters.diagnostics.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+# Bulk inserts carry thousands of parameters; only the start of them is logged
+MAX_LOGGED_LENGTH = 1000
+
+# Session and cluster bookkeeping pymongo adds to every command
+MONGO_BOOKKEEPING = {"lsid", "$db", "$clusterTime", "txnNumber", "$readPreference"}
+
+
+def _shorten(value) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= MAX_LOGGED_LENGTH:
+        return text
+    return f"{text[:MAX_LOGGED_LENGTH]}... ({len(text)} chars)"
+
+
+def log_slow_query(
+    backend: str, seconds: float, statement: str, parameters: object = None, route: Optional[str] = None
+) -> None:
+    logger.warning(
+        "Slow %s query (%.1f ms) on %s: %s | parameters: %s",
+        backend,
+        seconds * 1000,
+        route or "no request",
+        _shorten(statement),
+        "-" if parameters is None else _shorten(parameters),
+        extra={"backend": backend, "duration_ms": round(seconds * 1000, 3), "route": route},
+    )
+
+
+def install_slow_query_log(engine: Engine, threshold_ms: float, log_parameters: bool = True) -> None:
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(connection, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def check(connection, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed >= threshold:
+            log_slow_query(
+                engine.dialect.name, elapsed, statement, parameters if log_parameters else None, current_route()
+            )
+
+
+class SlowCommandListener(monitoring.CommandListener):
+    """
+    Logs the Mongo commands slower than threshold_ms. The command document is
+    only available when it starts, so it is kept until the command finishes,
+    together with the route (Motor runs pymongo in an executor, where the
+    request context is not visible).
+    """
+
+    def __init__(self, threshold_ms: float, log_parameters: bool = True):
+        self.threshold_micros = threshold_ms * 1000
+        self.log_parameters = log_parameters
+        # (connection id, request id) -> (statement, parameters, route)
+        self._started = {}
+
+    def started(self, event):
+        command = event.command
+        parameters = None
+        if self.log_parameters:
+            parameters = {key: value for key, value in command.items() if key not in MONGO_BOOKKEEPING}
+        statement = f"{event.command_name} {event.database_name}.{command.get(event.command_name, '')}"
+        self._started[(event.connection_id, event.request_id)] = (statement, parameters, current_route())
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is not None and event.duration_micros >= self.threshold_micros:
+            statement, parameters, route = started
+            log_slow_query("mongo", event.duration_micros / 1_000_000, statement, parameters, route)
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from app.adapters.models.nosql.connection import get_mongo_client
+from app.adapters.models.sql.session import get_sessionmaker
+from app.config import settings
+from .store import IdempotencyRecord, IdempotencyStore, MemoryIdempotencyStore, StoredResponse
+from .sql_store import SQLIdempotencyStore
+from .nosql_store import NoSQLIdempotencyStore
+from .middleware import IdempotencyMiddleware
+
+
+def get_idempotency_store(kind: str) -> Optional[IdempotencyStore]:
+    """
+    Store for IDEMPOTENCY_STORE, or None when the header is ignored. The SQL
+    and Mongo stores use the sync drivers in both API modes, like the projector,
+    and only connect once a keyed request arrives.
+    """
+    if not kind:
+        return None
+    if kind == "memory":
+        return MemoryIdempotencyStore(
+            settings.IDEMPOTENCY_MAX_ENTRIES, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS
+        )
+    if kind == "sql":
+        return SQLIdempotencyStore(
+            lambda: get_sessionmaker()(), settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS
+        )
+    if kind == "nosql":
+        return NoSQLIdempotencyStore(
+            lambda: get_mongo_client()[settings.NOSQL_DB]["idempotency_keys"],
+            settings.IDEMPOTENCY_TTL_SECONDS,
+            settings.IDEMPOTENCY_LEASE_SECONDS,
+        )
+    raise ValueError(f"Unknown idempotency store: {kind}")
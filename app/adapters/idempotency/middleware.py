@@ -0,0 +1,137 @@
+import hashlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from app.adapters.idempotency.store import IdempotencyStore, StoredResponse
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Keys are stored in a String(255) column
+MAX_KEY_LENGTH = 255
+# Only headers that describe the response itself are replayed
+REPLAYED_HEADERS = {"content-type", "etag", "last-modified", "location"}
+
+
+def request_fingerprint(scope, body: bytes) -> str:
+    """A key may only be repeated with the same method, path, query string and body"""
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope["query_string"], body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware making write requests that carry an Idempotency-Key
+    safe to retry. The first request claims the key and its response is
+    stored (server errors release the key instead); repeats get the stored
+    response back without reaching the routes, a concurrent repeat gets 409
+    and reusing the key for another request gets 422.
+    """
+
+    def __init__(self, app, store: IdempotencyStore, header: str = "Idempotency-Key"):
+        self.app = app
+        self.store = store
+        self.header = header.lower().encode("latin-1")
+
+    async def _store_call(self, method, *args):
+        if self.store.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    def _key(self, scope):
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return value.decode("latin-1")
+        return None
+
+    async def __call__(self, scope, receive, send):
+        key = None
+        if scope["type"] == "http" and scope["method"] in WRITE_METHODS:
+            key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        # The body is part of the fingerprint, so it is read here and handed to the app
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        fingerprint = request_fingerprint(scope, body)
+        record = await self._store_call(self.store.claim, key, fingerprint)
+        if record is not None:
+            if record.fingerprint != fingerprint:
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )
+            elif record.response is None:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+            else:
+                await self._replay(record.response, send)
+                return
+            await response(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        headers = []
+        response_chunks = []
+
+        async def send_and_capture(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() in REPLAYED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+        except BaseException:
+            await self._store_call(self.store.release, key)
+            raise
+        if status >= 500:
+            # Nothing was committed, or not knowingly: let the retry run again
+            await self._store_call(self.store.release, key)
+        else:
+            await self._store_call(
+                self.store.complete, key, StoredResponse(status, headers, b"".join(response_chunks))
+            )
+
+    async def _replay(self, response: StoredResponse, send) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response.headers]
+        headers.append((b"content-length", str(len(response.body)).encode("latin-1")))
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
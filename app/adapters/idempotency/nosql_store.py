@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+from app.adapters.idempotency.store import IdempotencyRecord, IdempotencyStore, StoredResponse
+
+# The server deletes expired keys itself (its TTL monitor runs about once a minute)
+IDEMPOTENCY_INDEXES = [IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)]
+
+
+class NoSQLIdempotencyStore(IdempotencyStore):
+    """
+    Keys as _id of a Mongo collection, shared by every instance; the unique
+    _id makes the claim atomic. The collection is resolved on each call so the
+    client is only opened once a keyed request arrives.
+    """
+
+    def __init__(self, collection_factory: Callable[[], Collection], ttl: float, lease: float):
+        self.collection_factory = collection_factory
+        self.ttl = ttl
+        self.lease = lease
+
+    @property
+    def collection(self) -> Collection:
+        return self.collection_factory()
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_indexes(IDEMPOTENCY_INDEXES)
+
+    def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        now = datetime.utcnow()
+        claim = {"fingerprint": fingerprint, "expires_at": now + timedelta(seconds=self.lease)}
+        try:
+            self.collection.insert_one({"_id": key, **claim})
+            return None
+        except DuplicateKeyError:
+            pass
+
+        # Expired (or an abandoned lease) but not yet removed by the TTL monitor: take it over
+        reclaimed = self.collection.find_one_and_update(
+            {"_id": key, "expires_at": {"$lte": now}},
+            {"$set": claim, "$unset": {"status": "", "headers": "", "body": ""}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if reclaimed is not None:
+            return None
+
+        document = self.collection.find_one({"_id": key})
+        if document is None:
+            # Released in the meantime; the client may retry
+            return IdempotencyRecord(fingerprint)
+        response = None
+        if "status" in document:
+            headers = [tuple(pair) for pair in document["headers"]]
+            response = StoredResponse(document["status"], headers, document["body"])
+        return IdempotencyRecord(document["fingerprint"], response)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "status": response.status,
+                "headers": response.headers,
+                "body": response.body,
+                "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl),
+            }},
+        )
+
+    def release(self, key: str) -> None:
+        self.collection.delete_one({"_id": key})
@@ -0,0 +1,96 @@
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.adapters.idempotency.store import IdempotencyRecord, IdempotencyStore, StoredResponse
+from app.adapters.models.sql.idempotency_model import IdempotencyKeyModel
+
+# Expired rows are deleted at most this often, by whichever request comes next
+PURGE_INTERVAL_SECONDS = 60
+
+
+class SQLIdempotencyStore(IdempotencyStore):
+    """
+    Keys in the idempotency_keys table, shared by every instance. The primary
+    key makes the claim atomic: the first INSERT wins, the others read its row.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl: float, lease: float):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.lease = lease
+        self._next_purge = 0.0
+
+    def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease)
+        with self.session_factory() as session:
+            self._purge(session, now)
+            try:
+                session.execute(insert(IdempotencyKeyModel).values(
+                    key=key, fingerprint=fingerprint, expires_at=expires_at
+                ))
+                session.commit()
+                return None
+            except IntegrityError:
+                session.rollback()
+
+            # An expired key or lease is taken over by the same conditional UPDATE on every instance
+            reclaimed = session.execute(
+                update(IdempotencyKeyModel)
+                .where(IdempotencyKeyModel.key == key, IdempotencyKeyModel.expires_at <= now)
+                .values(
+                    fingerprint=fingerprint, status_code=None, headers=None, body=None, expires_at=expires_at
+                )
+            )
+            session.commit()
+            if reclaimed.rowcount:
+                return None
+
+            row = session.execute(
+                select(
+                    IdempotencyKeyModel.fingerprint,
+                    IdempotencyKeyModel.status_code,
+                    IdempotencyKeyModel.headers,
+                    IdempotencyKeyModel.body,
+                ).where(IdempotencyKeyModel.key == key)
+            ).first()
+        if row is None:
+            # Released between the INSERT and the SELECT; the client may retry
+            return IdempotencyRecord(fingerprint)
+        response = None
+        if row.status_code is not None:
+            headers = [tuple(pair) for pair in json.loads(row.headers)]
+            response = StoredResponse(row.status_code, headers, row.body)
+        return IdempotencyRecord(row.fingerprint, response)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self.session_factory() as session:
+            session.execute(
+                update(IdempotencyKeyModel)
+                .where(IdempotencyKeyModel.key == key)
+                .values(
+                    status_code=response.status,
+                    headers=json.dumps(response.headers),
+                    body=response.body,
+                    expires_at=datetime.utcnow() + timedelta(seconds=self.ttl),
+                )
+            )
+            session.commit()
+
+    def release(self, key: str) -> None:
+        with self.session_factory() as session:
+            session.execute(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.key == key))
+            session.commit()
+
+    def _purge(self, session: Session, now: datetime) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+        session.execute(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.expires_at <= now))
+        session.commit()
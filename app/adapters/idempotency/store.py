@@ -0,0 +1,106 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.adapters.cache.ttl_cache import TTLCache
+
+# (name, value) pairs, latin-1 decoded as in the ASGI headers
+Headers = List[Tuple[str, str]]
+
+
+class StoredResponse:
+    """A completed response, replayed for repeats of its request"""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Headers, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class IdempotencyRecord:
+    """What a key was first used for; response is None while that request is in progress"""
+
+    __slots__ = ("fingerprint", "response")
+
+    def __init__(self, fingerprint: str, response: Optional[StoredResponse] = None):
+        self.fingerprint = fingerprint
+        self.response = response
+
+
+class IdempotencyStore(ABC):
+    """
+    Keys of write requests and their responses, kept for ttl seconds. A claim
+    only holds its key for lease seconds until it completes, so a request that
+    never completes (its worker died) does not block retries for the whole ttl.
+    blocking stores do I/O and are called from the threadpool.
+    """
+
+    blocking = True
+
+    @abstractmethod
+    def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """
+        Atomically reserve an unused key, or one whose record or lease expired,
+        for a new request and return None, or return the record of the request
+        that holds it
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """Store the response of a claimed key and keep it for the full ttl"""
+        pass
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Forget a claimed key whose request failed, so a retry runs again"""
+        pass
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    Per-process LRU with TTL. Retries only hit it when they reach the same
+    worker; use the SQL or Mongo store behind several workers or instances.
+    In-progress claims are kept apart from the LRU so eviction never drops one.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl: float, lease: float, clock: Callable[[], float] = time.monotonic):
+        self.records = TTLCache(maxsize, ttl, clock)
+        # key -> (lease expiry, record) of requests still in progress
+        self.claims: Dict[str, Tuple[float, IdempotencyRecord]] = {}
+        self.lease = lease
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            now = self._clock()
+            claim = self.claims.get(key)
+            if claim is not None and claim[0] > now:
+                return claim[1]
+            record = self.records.get(key)
+            if record is None:
+                self.claims[key] = (now + self.lease, IdempotencyRecord(fingerprint))
+            return record
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            claim = self.claims.pop(key, None)
+            if claim is not None:
+                claim[1].response = response
+                self.records.set(key, claim[1])
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self.claims.pop(key, None)
+            self.records.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.claims.clear()
+            self.records.clear()
@@ -0,0 +1,111 @@
+"""The service's metrics and the hooks feeding them: ASGI middleware, repository calls, SQL statements"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.adapters.metrics.registry import MetricsRegistry
+from app.adapters.models.pool_metrics import DEFAULT_POOL_NAME, mongo_pool_metrics, sql_pool_metrics
+
+metrics_registry = MetricsRegistry()
+
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+repository_call_duration = metrics_registry.histogram(
+    "repository_call_duration_seconds", "Product repository call latency", ("backend", "operation")
+)
+repository_rows = metrics_registry.counter(
+    "repository_rows_returned_total", "Products returned by repository calls", ("backend", "operation")
+)
+repository_errors = metrics_registry.counter(
+    "repository_errors_total", "Product repository calls that raised", ("backend", "operation")
+)
+sql_statement_duration = metrics_registry.histogram(
+    "sql_statement_duration_seconds", "SQL statement execution time", ("dialect", "statement")
+)
+
+# Statement label values; anything else (PRAGMA, SAVEPOINT...) is reported as OTHER
+STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def statement_kind(statement: str) -> str:
+    # Only the first few characters are looked at, whatever the statement size
+    words = statement.lstrip()[:7].upper().split(None, 1)
+    return words[0] if words and words[0] in STATEMENT_KINDS else "OTHER"
+
+
+def record_repository_call(backend: str, operation: str, seconds: float, rows: Optional[int]) -> None:
+    repository_call_duration.observe(seconds, backend, operation)
+    if rows:
+        repository_rows.inc(backend, operation, amount=rows)
+
+
+def install_statement_metrics(engine: Engine) -> None:
+    dialect = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(connection, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def observe(connection, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            sql_statement_duration.observe(time.perf_counter() - started, dialect, statement_kind(statement))
+
+
+def _pool_samples():
+    pools = [("sql", name, metrics.snapshot()) for name, metrics in list(sql_pool_metrics.items())]
+    pools.append(("mongo", DEFAULT_POOL_NAME, mongo_pool_metrics.snapshot()))
+
+    def samples(key):
+        return [([("pool", pool), ("name", name)], snapshot[key]) for pool, name, snapshot in pools]
+
+    return [
+        ("db_pool_connections_created_total", "counter", "Connections opened by the pool",
+         samples("connections_created")),
+        ("db_pool_checkouts_total", "counter", "Connections handed out by the pool", samples("checkouts")),
+        ("db_pool_checkout_failures_total", "counter", "Checkouts that timed out", samples("checkout_failures")),
+        ("db_pool_checked_out", "gauge", "Connections currently in use", samples("checked_out")),
+        ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection",
+         samples("wait_seconds_total")),
+        ("db_pool_waits_total", "counter", "Checkouts that had to wait", samples("wait_count")),
+    ]
+
+
+metrics_registry.add_collector(_pool_samples)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request. Unlike BaseHTTPMiddleware it
+    adds no task or body buffering per request, only two perf_counter calls.
+    Routes are labelled by their template so ids do not blow up cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path_format", "unmatched")
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], route, str(status))
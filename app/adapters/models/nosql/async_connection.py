@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+
+from app.adapters.models.nosql.pool import client_options
+from app.config import settings
+
+
+# Created on first use; Motor binds to the running event loop at that point
+@lru_cache(maxsize=None)
+def get_async_mongo_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        host=settings.NOSQL_HOST,
+        port=settings.NOSQL_PORT,
+        **client_options(),
+    )
+
+
+def get_async_product_collection() -> AsyncIOMotorCollection:
+    return get_async_mongo_client()[settings.NOSQL_DB]["products"]
+
+
+def close_async_mongo_client() -> None:
+    if get_async_mongo_client.cache_info().currsize:
+        get_async_mongo_client().close()
+        get_async_mongo_client.cache_clear()
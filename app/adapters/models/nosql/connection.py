@@ -1,12 +1,27 @@
+from functools import lru_cache
+
 from pymongo import MongoClient
+from pymongo.collection import Collection
 
+from app.adapters.models.nosql.pool import client_options
 from app.config import settings
 
-mongo_client = MongoClient(
-    host=settings.NOSQL_HOST,
-    port=settings.NOSQL_PORT,
-)
 
-db = mongo_client[settings.NOSQL_DB]
+# Created on first use so the SQL backend never opens a Mongo client
+@lru_cache(maxsize=None)
+def get_mongo_client() -> MongoClient:
+    return MongoClient(
+        host=settings.NOSQL_HOST,
+        port=settings.NOSQL_PORT,
+        **client_options(),
+    )
+
+
+def get_product_collection() -> Collection:
+    return get_mongo_client()[settings.NOSQL_DB]["products"]
+
 
-product_collection = db["products"] 
\ No newline at end of file
+def close_mongo_client() -> None:
+    if get_mongo_client.cache_info().currsize:
+        get_mongo_client().close()
+        get_mongo_client.cache_clear()
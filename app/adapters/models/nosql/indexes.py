@@ -0,0 +1,31 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+TEXT_INDEX_NAME = "products_text"
+# Server error code for a $text query without a text index
+INDEX_NOT_FOUND = 27
+
+PRODUCT_INDEXES = [
+    IndexModel([("category", ASCENDING), ("price", ASCENDING)], name="category_price"),
+    IndexModel([("category", ASCENDING), ("quantity", ASCENDING)], name="category_quantity"),
+    IndexModel([("updated_at", DESCENDING)], name="updated_at"),
+    # Lowercased words of each field, for the search top-up's last-word prefix;
+    # documents written before these fields existed only match $text until rewritten
+    IndexModel([("name_terms", ASCENDING)], name="name_terms"),
+    IndexModel([("description_terms", ASCENDING)], name="description_terms"),
+    # No stemming or stop words so results line up with the SQL backends
+    IndexModel(
+        [("name", TEXT), ("description", TEXT)],
+        name=TEXT_INDEX_NAME,
+        weights={"name": 10, "description": 1},
+        default_language="none",
+    ),
+]
+
+
+def ensure_product_indexes(collection) -> None:
+    """Create the products indexes; a no-op for indexes that already exist"""
+    collection.create_indexes(PRODUCT_INDEXES)
+
+
+async def ensure_async_product_indexes(collection) -> None:
+    await collection.create_indexes(PRODUCT_INDEXES)
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from pymongo import monitoring
+
+from app.adapters.diagnostics.slow_queries import SlowCommandListener
+from app.adapters.models.pool_metrics import mongo_pool_metrics
+from app.config import settings
+
+
+class MongoPoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Feeds pymongo connection pool events into the shared pool metrics"""
+
+    def __init__(self):
+        # Checkouts are synchronous per thread, so the start time is kept per thread
+        self._local = threading.local()
+
+    def _record_wait(self):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            mongo_pool_metrics.record_wait(time.perf_counter() - started)
+            self._local.started = None
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._record_wait()
+        mongo_pool_metrics.record_checkout()
+
+    def connection_check_out_failed(self, event):
+        self._record_wait()
+        mongo_pool_metrics.record_checkout_failure()
+
+    def connection_checked_in(self, event):
+        mongo_pool_metrics.record_checkin()
+
+    def connection_created(self, event):
+        mongo_pool_metrics.record_connect()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+def client_options() -> dict:
+    """MongoClient/AsyncIOMotorClient keyword arguments built from the settings"""
+    options = {
+        "maxPoolSize": settings.NOSQL_MAX_POOL_SIZE,
+        "minPoolSize": settings.NOSQL_MIN_POOL_SIZE,
+        "event_listeners": [MongoPoolMetricsListener()],
+    }
+    if settings.SLOW_QUERY_MS > 0:
+        options["event_listeners"].append(
+            SlowCommandListener(settings.SLOW_QUERY_MS, settings.SLOW_QUERY_LOG_PARAMETERS)
+        )
+    timeouts = {
+        "connectTimeoutMS": settings.NOSQL_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.NOSQL_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.NOSQL_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": settings.NOSQL_WAIT_QUEUE_TIMEOUT_MS,
+    }
+    options.update({name: value for name, value in timeouts.items() if value})
+    return options
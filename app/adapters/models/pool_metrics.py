@@ -0,0 +1,74 @@
+import threading
+from typing import Dict
+
+
+class PoolMetrics:
+    """Thread-safe counters describing how a connection pool is being used"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_failures = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_checkout_failure(self) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_failures": self.checkout_failures,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "wait_count": self.wait_count,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / self.wait_count if self.wait_count else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+DEFAULT_POOL_NAME = "primary"
+
+# One instance per SQL pool (primary, each replica, their async engines), keyed by pool name
+sql_pool_metrics: Dict[str, PoolMetrics] = {DEFAULT_POOL_NAME: PoolMetrics()}
+_sql_pool_metrics_lock = threading.Lock()
+mongo_pool_metrics = PoolMetrics()
+
+
+def get_sql_pool_metrics(name: str) -> PoolMetrics:
+    with _sql_pool_metrics_lock:
+        metrics = sql_pool_metrics.get(name)
+        if metrics is None:
+            metrics = sql_pool_metrics[name] = PoolMetrics()
+        return metrics
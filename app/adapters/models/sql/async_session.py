@@ -0,0 +1,96 @@
+import asyncio
+from functools import lru_cache
+from typing import Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.engine import engine_options, install_engine_hooks
+# Imported so create_all knows about the products, outbox and idempotency tables
+from app.adapters.models.sql.idempotency_model import IdempotencyKeyModel  # noqa: F401
+from app.adapters.models.sql.outbox_model import ProductOutboxModel  # noqa: F401
+from app.adapters.models.sql.product_model import ProductModel  # noqa: F401
+from app.adapters.models.sql.session import replica_urls
+from app.config import settings
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL to the matching async driver"""
+    scheme, separator, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{scheme}'")
+    return f"{ASYNC_DRIVERS[backend]}{separator}{rest}"
+
+
+# Created on first use so the sync mode never needs the async drivers installed
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    url = settings.SQL_ASYNC_DATABASE_URL or to_async_url(settings.SQL_DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url, async_mode=True, pool_name="async_primary"))
+    install_engine_hooks(engine.sync_engine, url)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False)
+
+
+@lru_cache(maxsize=None)
+def get_async_replica_sessionmakers() -> Tuple[async_sessionmaker, ...]:
+    makers = []
+    for index, sync_url in enumerate(replica_urls()):
+        url = to_async_url(sync_url)
+        engine = create_async_engine(
+            url, **engine_options(url, async_mode=True, pool_name=f"async_replica_{index}")
+        )
+        install_engine_hooks(engine.sync_engine, url)
+        makers.append(async_sessionmaker(bind=engine, autoflush=False))
+    return tuple(makers)
+
+
+async def init_async_db(create_schema: bool = True, warmup: int = 0) -> None:
+    """Async counterpart of session.init_db"""
+    engine = get_async_engine()
+    if create_schema:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    connections = await asyncio.gather(*(engine.connect() for _ in range(warmup)))
+    for connection in connections:
+        await connection.close()
+
+
+async def dispose_async_engine() -> None:
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+        get_async_sessionmaker.cache_clear()
+        get_async_engine.cache_clear()
+    if get_async_replica_sessionmakers.cache_info().currsize:
+        for maker in get_async_replica_sessionmakers():
+            await maker.kw["bind"].dispose()
+        get_async_replica_sessionmakers.cache_clear()
+
+
+async def get_async_db():
+    db = get_async_sessionmaker()()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_replica_dbs():
+    dbs = [maker() for maker in get_async_replica_sessionmakers()]
+    try:
+        yield dbs
+    finally:
+        for db in dbs:
+            await db.close()
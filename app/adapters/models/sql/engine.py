@@ -0,0 +1,121 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.adapters.diagnostics.slow_queries import install_slow_query_log
+from app.adapters.metrics.instrumentation import install_statement_metrics
+from app.adapters.models.pool_metrics import DEFAULT_POOL_NAME, PoolMetrics, get_sql_pool_metrics
+from app.config import settings
+
+
+def pool_metrics(pool: Pool) -> PoolMetrics:
+    """Metrics of the pool named by engine_options; the name survives engine.dispose()"""
+    return get_sql_pool_metrics(getattr(pool, "logging_name", None) or DEFAULT_POOL_NAME)
+
+
+class _TimedPoolMixin:
+    """Records how long callers wait for a connection from the pool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics(self).record_checkout_failure()
+            raise
+        finally:
+            pool_metrics(self).record_wait(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_sqlite_memory(url: str) -> bool:
+    return is_sqlite(url) and (url.endswith(":memory:") or url.split("://", 1)[-1] in ("", "/"))
+
+
+def engine_options(url: str, async_mode: bool = False, pool_name: str = DEFAULT_POOL_NAME) -> dict:
+    """create_engine keyword arguments built from the pool/engine settings"""
+    options = {
+        "pool_pre_ping": settings.SQL_POOL_PRE_PING,
+        "query_cache_size": settings.SQL_STATEMENT_CACHE_SIZE,
+        # Names the pool's metrics, so engines sharing a process are reported apart
+        "pool_logging_name": pool_name,
+    }
+    if is_sqlite(url):
+        # Sessions are used from the threadpool, not only from the creating thread
+        options["connect_args"] = {"check_same_thread": False}
+        if is_sqlite_memory(url):
+            # In-memory databases live in a single connection; keep SQLAlchemy's pool
+            return options
+
+    options.update(
+        poolclass=TimedAsyncQueuePool if async_mode else TimedQueuePool,
+        pool_size=settings.SQL_POOL_SIZE,
+        max_overflow=settings.SQL_MAX_OVERFLOW,
+        pool_timeout=settings.SQL_POOL_TIMEOUT,
+        pool_recycle=settings.SQL_POOL_RECYCLE,
+    )
+    return options
+
+
+def sqlite_pragmas() -> dict:
+    pragmas = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    }
+    # Empty values keep SQLite's own defaults
+    return {name: value for name, value in pragmas.items() if value not in ("", None)}
+
+
+def install_engine_hooks(engine: Engine, url: str) -> None:
+    """Attach pool and statement metrics, the slow-query log and, for SQLite, per-connection pragmas"""
+    if settings.METRICS_ENABLED:
+        install_statement_metrics(engine)
+    if settings.SLOW_QUERY_MS > 0:
+        install_slow_query_log(engine, settings.SLOW_QUERY_MS, settings.SLOW_QUERY_LOG_PARAMETERS)
+    pragmas = sqlite_pragmas() if is_sqlite(url) and not is_sqlite_memory(url) else {}
+    metrics = pool_metrics(engine.pool)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+        if pragmas:
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+
+def pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    status = {
+        "name": getattr(pool, "logging_name", None) or DEFAULT_POOL_NAME,
+        "class": type(pool).__name__,
+        **pool_metrics(pool).snapshot(),
+    }
+    if isinstance(pool, QueuePool):
+        status.update(size=pool.size(), idle=pool.checkedin(), overflow=pool.overflow())
+    return status
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text
+
+from app.adapters.models.sql.base import Base
+
+
+class IdempotencyKeyModel(Base):
+    """
+    One row per Idempotency-Key. status_code, headers and body stay NULL while
+    the first request is in progress; expired rows are reclaimed or purged.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    # JSON list of [name, value] pairs
+    headers = Column(Text, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
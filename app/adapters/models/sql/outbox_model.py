@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer
+
+from app.adapters.models.sql.base import Base
+
+
+class ProductOutboxModel(Base):
+    """
+    One row per committed product change, written in the same transaction as the
+    change. The projector resolves the product's current state when it applies
+    the event, so a row only needs the product id.
+    """
+    __tablename__ = "product_outbox"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,13 +1,27 @@
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, Float, Index, Integer, String, text
 
 from app.adapters.models.sql.base import BaseModel
+from app.adapters.models.sql.search_index import install_search_index
 
 
 class ProductModel(BaseModel):
     __tablename__ = "products"
+    __table_args__ = (
+        # Category listings filtered/sorted by price or by stock
+        Index("ix_products_category_price", "category", "price"),
+        Index("ix_products_category_quantity", "category", "quantity"),
+        # max(updated_at) for the catalog stamp (ETags, search fallback)
+        Index("ix_products_updated_at", "updated_at"),
+    )
 
     name = Column(String, nullable=False, index=True)
     description = Column(String, nullable=False)
     category = Column(String, nullable=False)
     price = Column(Float, nullable=False)
-    quantity = Column(Integer, default=0) 
\ No newline at end of file
+    quantity = Column(Integer, default=0)
+    # Optimistic concurrency: bumped by every write, matched by compare-and-swap updates
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+
+
+# Creates and drops the full-text index along with the table
+install_search_index(ProductModel.__table__)
@@ -0,0 +1,102 @@
+"""
+Full-text index DDL for the products table (SQLite FTS5 / Postgres tsvector).
+New tables get it from create_all; existing databases from
+migrations/0003_products_search.<dialect>.sql, which holds the same statements.
+"""
+from sqlalchemy import Table, event, text
+from sqlalchemy.engine import Connection
+
+FTS_TABLE = "products_fts"
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+_SQLITE_FTS_DDL = [
+    # External-content table: the text lives in products, FTS5 only keeps the index
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, description, content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    # Index the rows that existed before the FTS table
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+_POSTGRES_DDL = [
+    f"""ALTER TABLE products ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED""",
+    f"CREATE INDEX ix_products_{SEARCH_VECTOR_COLUMN} "
+    f"ON products USING GIN ({SEARCH_VECTOR_COLUMN})",
+]
+
+
+def sqlite_has_fts5(connection: Connection) -> bool:
+    options = connection.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+def sqlite_fts_exists(connection: Connection) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+
+
+def postgres_search_vector_exists(connection: Connection) -> bool:
+    return connection.execute(
+        text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'products' AND column_name = :name"
+        ),
+        {"name": SEARCH_VECTOR_COLUMN},
+    ).first() is not None
+
+
+def has_search_index(connection: Connection) -> bool:
+    # Databases that predate the index keep working, on the in-memory fallback, until migrated
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return sqlite_fts_exists(connection)
+    if dialect == "postgresql":
+        return postgres_search_vector_exists(connection)
+    return False
+
+
+def create_search_index(table: Table, connection: Connection, **kw) -> None:
+    # Only runs when create_all creates the products table itself, never on an existing one
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        if not sqlite_has_fts5(connection):
+            return
+        # Left over if products was dropped outside drop_all
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        statements = _SQLITE_FTS_DDL
+    elif dialect == "postgresql":
+        statements = _POSTGRES_DDL
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_index(table: Table, connection: Connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        # Left over if products was dropped outside drop_all
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def install_search_index(table: Table) -> None:
+    event.listen(table, "after_create", create_search_index)
+    event.listen(table, "before_drop", drop_search_index)
@@ -1,15 +1,92 @@
+from functools import lru_cache
+from typing import List, Tuple
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.engine import engine_options, install_engine_hooks
+# Imported so create_all knows about the products, outbox and idempotency tables
+from app.adapters.models.sql.idempotency_model import IdempotencyKeyModel  # noqa: F401
+from app.adapters.models.sql.outbox_model import ProductOutboxModel  # noqa: F401
+from app.adapters.models.sql.product_model import ProductModel  # noqa: F401
 from app.config import settings
 
-engine = create_engine(settings.SQL_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Created on first use so importing the app (tests, worker forks) does no DB work
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    engine = create_engine(settings.SQL_DATABASE_URL, **engine_options(settings.SQL_DATABASE_URL))
+    install_engine_hooks(engine, settings.SQL_DATABASE_URL)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+def replica_urls() -> List[str]:
+    return [url.strip() for url in settings.SQL_REPLICA_URLS.split(",") if url.strip()]
+
+
+@lru_cache(maxsize=None)
+def get_replica_sessionmakers() -> Tuple[sessionmaker, ...]:
+    makers = []
+    for index, url in enumerate(replica_urls()):
+        engine = create_engine(url, **engine_options(url, pool_name=f"replica_{index}"))
+        install_engine_hooks(engine, url)
+        makers.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return tuple(makers)
+
+
+def init_db(create_schema: bool = True, warmup: int = 0) -> None:
+    """Create the tables if asked and open `warmup` pooled connections ahead of traffic"""
+    engine = get_engine()
+    if create_schema:
+        Base.metadata.create_all(bind=engine)
 
-def get_db():
-    db = SessionLocal()
+    connections = [engine.connect() for _ in range(warmup)]
+    for connection in connections:
+        connection.close()
+
+
+def dispose_engine() -> None:
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+        get_sessionmaker.cache_clear()
+        get_engine.cache_clear()
+    if get_replica_sessionmakers.cache_info().currsize:
+        for maker in get_replica_sessionmakers():
+            maker.kw["bind"].dispose()
+        get_replica_sessionmakers.cache_clear()
+
+
+async def get_db():
+    # An async generator resolves on the event loop instead of costing two
+    # threadpool hops per request; the Session only checks out a connection
+    # on its first query, so creating it here does no I/O
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        if db.in_transaction():
+            # Releasing the connection issues a ROLLBACK, which may block
+            await run_in_threadpool(db.close)
+        else:
+            db.close()
+
+
+async def get_replica_dbs():
+    # One lazy Session per replica; only the replica a request reads from connects
+    dbs = [maker() for maker in get_replica_sessionmakers()]
+    try:
+        yield dbs
+    finally:
+        for db in dbs:
+            if db.in_transaction():
+                await run_in_threadpool(db.close)
+            else:
+                db.close()
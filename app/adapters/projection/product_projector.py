@@ -0,0 +1,185 @@
+"""
+Project the SQL product outbox into the Mongo products collection, the
+denormalized read model served when READ_FROM_NOSQL is set.
+
+    python -m app.adapters.projection.product_projector          # run until stopped
+    python -m app.adapters.projection.product_projector --once   # drain and exit
+"""
+import argparse
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, PyMongoError
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.adapters.models.sql.outbox_model import ProductOutboxModel
+from app.adapters.models.sql.product_model import ProductModel
+from app.adapters.repositories.nosql_queries import entity_document
+from app.adapters.repositories.sql_statements import chunks, map_row, product_select
+from app.domain.entities.product import ProductDb
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_COLLECTION = "projection_checkpoints"
+DUPLICATE_KEY = 11000
+
+
+class ProductProjector:
+    """
+    Applies outbox events in id order, batch_size at a time:
+
+    - the batch's product ids are resolved to their current SQL rows with one
+      query per chunk; missing rows become deletes, the others upserts;
+    - an upsert only replaces a document whose version is not newer, so a
+      replayed batch or a second projector never moves a document back in time;
+    - the applied events are deleted by id and the checkpoint is advanced.
+
+    Events are removed by id instead of being skipped by position because
+    sequence values can commit out of order. A crash before the delete replays
+    the batch on restart, which the guarded upserts make harmless.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        collection: Collection,
+        batch_size: int = 500,
+        name: str = "products",
+    ):
+        self.session_factory = session_factory
+        self.collection = collection
+        self.checkpoints = collection.database[CHECKPOINTS_COLLECTION]
+        self.batch_size = batch_size
+        self.name = name
+
+    def checkpoint(self) -> Optional[dict]:
+        """{"last_event_id", "events", "updated_at"} of the last applied batch"""
+        return self.checkpoints.find_one({"_id": self.name})
+
+    def run_once(self) -> int:
+        """Apply the next batch of events; returns how many were applied"""
+        with self.session_factory() as session:
+            events = session.execute(
+                select(ProductOutboxModel.id, ProductOutboxModel.product_id)
+                .order_by(ProductOutboxModel.id)
+                .limit(self.batch_size)
+            ).all()
+            if not events:
+                return 0
+
+            product_ids = sorted({event.product_id for event in events})
+            self._apply(product_ids, self._current_products(session, product_ids))
+
+            event_ids = [event.id for event in events]
+            for chunk in chunks(event_ids):
+                session.execute(delete(ProductOutboxModel).where(ProductOutboxModel.id.in_(chunk)))
+            session.commit()
+
+        self.checkpoints.update_one(
+            {"_id": self.name},
+            {
+                "$max": {"last_event_id": event_ids[-1]},
+                "$inc": {"events": len(event_ids)},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+        return len(event_ids)
+
+    def drain(self) -> int:
+        total = 0
+        while processed := self.run_once():
+            total += processed
+        return total
+
+    def _current_products(self, session: Session, product_ids: List[int]) -> Dict[int, ProductDb]:
+        products = {}
+        for chunk in chunks(product_ids):
+            rows = session.execute(product_select().where(ProductModel.id.in_(chunk)))
+            products.update((product.id, product) for product in map(map_row, rows))
+        return products
+
+    def _apply(self, product_ids: List[int], products: Dict[int, ProductDb]) -> None:
+        operations = []
+        for product_id in product_ids:
+            product = products.get(product_id)
+            if product is None:
+                operations.append(DeleteOne({"_id": product_id}))
+            else:
+                operations.append(ReplaceOne(
+                    {"_id": product_id, "version": {"$not": {"$gt": product.version}}},
+                    entity_document(product),
+                    upsert=True,
+                ))
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as exc:
+            # The guard did not match a newer document, so the upsert hit its _id: keep it
+            if any(error["code"] != DUPLICATE_KEY for error in exc.details["writeErrors"]):
+                raise
+
+
+class ProjectorWorker:
+    """Background thread polling the outbox until stopped"""
+
+    def __init__(self, projector: ProductProjector, poll_interval: float = 1.0):
+        self.projector = projector
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="product-projector", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.projector.run_once()
+            except (SQLAlchemyError, PyMongoError):
+                logger.exception("Product projection failed, retrying in %ss", self.poll_interval)
+                processed = 0
+            # Keep going while batches come back full, otherwise wait for new events
+            if processed < self.projector.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def main():
+    from app.adapters.models.nosql.connection import get_product_collection
+    from app.adapters.models.nosql.indexes import ensure_product_indexes
+    from app.adapters.models.sql.session import get_sessionmaker
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--once", action="store_true", help="apply pending events and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    collection = get_product_collection()
+    ensure_product_indexes(collection)
+    projector = ProductProjector(get_sessionmaker(), collection, settings.OUTBOX_BATCH_SIZE)
+    if args.once:
+        print(f"applied {projector.drain()} events")
+        return
+
+    worker = ProjectorWorker(projector, settings.OUTBOX_POLL_INTERVAL_SECONDS)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
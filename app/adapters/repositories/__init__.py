@@ -1,11 +1,31 @@
 from enum import Enum
-from typing import Optional
+from typing import Optional, Sequence
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.adapters.cache.menu_snapshots import MenuSnapshots
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
 from app.domain.interfaces.product_repository import ProductRepository
 from .sql_product_repository import SQLProductRepository
 from .nosql_product_repository import NoSQLProductRepository
+from .cached_product_repository import (
+    AsyncCachedProductRepository,
+    CachedProductRepository,
+    ProductCache,
+    product_cache,
+)
+from .instrumented_product_repository import (
+    AsyncInstrumentedProductRepository,
+    InstrumentedProductRepository,
+)
+from .menu_snapshot_repository import AsyncMenuSnapshotRepository, MenuSnapshotRepository
+from .read_write_split import (
+    AsyncReadWriteSplitRepository,
+    ReadWriteSplitRepository,
+    ReplicaMonitor,
+    replica_monitor,
+)
 
 
 class RepositoryType(str, Enum):
@@ -13,12 +33,75 @@ class RepositoryType(str, Enum):
     NOSQL = "nosql"
 
 
+def _tracker(decorator, instrument: bool):
+    if not instrument:
+        return lambda repository, backend: repository
+    return decorator
+
+
 def get_product_repository(
-    repository_type: RepositoryType, db_session: Optional[Session] = None
+    repository_type: RepositoryType,
+    db_session: Optional[Session] = None,
+    cache: Optional[ProductCache] = None,
+    replica_sessions: Sequence[Session] = (),
+    read_from_nosql: bool = False,
+    menu: Optional[MenuSnapshots] = None,
+    instrument: bool = False,
 ) -> ProductRepository:
+    """
+    Repository for the configured backend. With replica sessions (or the Mongo
+    read model) reads are split from writes by ReadWriteSplitRepository; with
+    menu, writes also patch the menu snapshots. instrument records metrics per
+    backend, below the cache so only real backend calls are counted.
+    """
     if repository_type == RepositoryType.SQL:
         if not db_session:
             raise ValueError("DB session is required for SQL repository")
-        return SQLProductRepository(db_session)
+        track = _tracker(InstrumentedProductRepository, instrument)
+        repository = track(SQLProductRepository(db_session), "sql")
+        readers = [track(SQLProductRepository(session), "sql_replica") for session in replica_sessions]
+        if read_from_nosql:
+            readers.append(track(NoSQLProductRepository(), "nosql"))
+        if readers:
+            repository = ReadWriteSplitRepository(repository, readers)
     else:
-        return NoSQLProductRepository()
+        repository = _tracker(InstrumentedProductRepository, instrument)(NoSQLProductRepository(), "nosql")
+
+    if menu is not None:
+        repository = MenuSnapshotRepository(repository, menu)
+    if cache is not None:
+        return CachedProductRepository(repository, cache)
+    return repository
+
+
+def get_async_product_repository(
+    repository_type: RepositoryType,
+    db_session: Optional[AsyncSession] = None,
+    cache: Optional[ProductCache] = None,
+    replica_sessions: Sequence[AsyncSession] = (),
+    read_from_nosql: bool = False,
+    menu: Optional[MenuSnapshots] = None,
+    instrument: bool = False,
+) -> AsyncProductRepository:
+    # Imported here so the sync mode never loads motor and the async repositories
+    from .async_nosql_product_repository import AsyncNoSQLProductRepository
+    from .async_sql_product_repository import AsyncSQLProductRepository
+
+    if repository_type == RepositoryType.SQL:
+        if not db_session:
+            raise ValueError("DB session is required for SQL repository")
+        track = _tracker(AsyncInstrumentedProductRepository, instrument)
+        repository = track(AsyncSQLProductRepository(db_session), "sql")
+        readers = [track(AsyncSQLProductRepository(session), "sql_replica") for session in replica_sessions]
+        if read_from_nosql:
+            readers.append(track(AsyncNoSQLProductRepository(), "nosql"))
+        if readers:
+            repository = AsyncReadWriteSplitRepository(repository, readers)
+    else:
+        repository = _tracker(AsyncInstrumentedProductRepository, instrument)(AsyncNoSQLProductRepository(), "nosql")
+
+    if menu is not None:
+        repository = AsyncMenuSnapshotRepository(repository, menu)
+    if cache is not None:
+        return AsyncCachedProductRepository(repository, cache)
+    return repository
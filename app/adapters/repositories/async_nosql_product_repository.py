@@ -0,0 +1,250 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Union
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
+
+from app.adapters.models.nosql.async_connection import get_async_product_collection
+from app.adapters.models.nosql.indexes import INDEX_NOT_FOUND, ensure_async_product_indexes
+from app.adapters.repositories.nosql_ids import AsyncIdAllocator, get_async_product_id_allocator
+from app.adapters.repositories.nosql_queries import (
+    TEXT_SCORE,
+    adjust_quantity_update,
+    build_page,
+    map_to_entity,
+    page_query,
+    product_document,
+    product_fields,
+    search_queries,
+    term_fields,
+    version_filter,
+)
+from app.adapters.search.trie_index import tokenize
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+    check_version,
+    product_changes,
+)
+from app.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+
+
+class AsyncNoSQLProductRepository(AsyncProductRepository):
+    def __init__(
+        self,
+        collection: Optional[AsyncIOMotorCollection] = None,
+        ids: Optional[AsyncIdAllocator] = None,
+    ):
+        if collection is None:
+            self.collection = get_async_product_collection()
+            self.ids = ids or get_async_product_id_allocator()
+        else:
+            self.collection = collection
+            self.ids = ids or AsyncIdAllocator(collection)
+
+    async def get_all(self) -> List[ProductDb]:
+        products = await self.collection.find().to_list(length=None)
+        return [map_to_entity(product) for product in products]
+
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        query, sort = page_query(filters, sort_by, order, cursor)
+        documents = self.collection.find(query, sort=sort)
+        # Fetch one extra document to know whether another page exists
+        if limit is not None:
+            documents = documents.limit(limit + 1)
+        return build_page(await documents.to_list(length=None), sort_by, order, limit)
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        documents = self.collection.find(sort=[("_id", ASCENDING)]).batch_size(batch_size)
+        try:
+            async for product in documents:
+                yield map_to_entity(product)
+        finally:
+            await documents.close()
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        latest = await self.collection.find_one({}, {"updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        return CatalogStamp(
+            count=await self.collection.estimated_document_count(),
+            last_modified=latest["updated_at"] if latest else None
+        )
+
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        text_query, prefix_query = search_queries(terms)
+
+        try:
+            documents = await self._text_search(text_query, limit)
+        except OperationFailure as error:
+            if error.code != INDEX_NOT_FOUND:
+                raise
+            await ensure_async_product_indexes(self.collection)
+            documents = await self._text_search(text_query, limit)
+
+        if len(documents) < limit:
+            prefix_query["_id"] = {"$nin": [document["_id"] for document in documents]}
+            cursor = self.collection.find(prefix_query).sort("_id", ASCENDING)
+            documents += await cursor.limit(limit - len(documents)).to_list(length=None)
+        return [map_to_entity(document) for document in documents]
+
+    async def _text_search(self, text_query: dict, limit: int) -> List[dict]:
+        cursor = self.collection.find(text_query, TEXT_SCORE).sort([("score", TEXT_SCORE["score"])])
+        return await cursor.limit(limit).to_list(length=None)
+
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        product = await self.collection.find_one({"_id": product_id})
+        return map_to_entity(product) if product else None
+
+    async def create(self, product: Product) -> ProductDb:
+        # The id comes from the atomic counter, assigned by the allocator on insert
+        product_dict = product_document(None, product, datetime.utcnow())
+        await self.ids.insert([product_dict])
+        return map_to_entity(product_dict)
+
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        changes = product_changes(product)
+        if not changes:
+            return check_version(await self.get_by_id(product_id), expected_version)
+
+        document = await self.collection.find_one_and_update(
+            version_filter(product_id, expected_version),
+            {
+                "$set": {**changes, **term_fields(changes), "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        if document is None and expected_version is not None:
+            check_version(await self.get_by_id(product_id), expected_version)
+        return map_to_entity(document) if document else None
+
+    async def delete(self, product_id: int) -> bool:
+        result = await self.collection.delete_one({"_id": product_id})
+        return result.deleted_count > 0
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        product = await self.collection.find_one_and_update(
+            {"_id": product_id},
+            adjust_quantity_update(delta, floor, datetime.utcnow()),
+            return_document=ReturnDocument.AFTER
+        )
+        return map_to_entity(product) if product else None
+
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        ids = [adjustment.product_id for adjustment in adjustments]
+        existing = {
+            document["_id"]
+            async for document in self.collection.find({"_id": {"$in": ids}}, {"_id": 1})
+        }
+        for product_id in ids:
+            if product_id not in existing:
+                raise ProductNotFoundError(product_id)
+
+        if not reject_if_insufficient:
+            # Clamped adjustments only fail if the product was deleted since the check above
+            updated = []
+            for adjustment in adjustments:
+                product = await self.adjust_quantity(adjustment.product_id, adjustment.delta)
+                if product is None:
+                    raise ProductNotFoundError(adjustment.product_id)
+                updated.append(product)
+            return updated
+
+        # Without a replica set there are no multi-document transactions, so apply
+        # guarded $inc updates and compensate the applied ones if any is rejected
+        applied = []
+        updated = []
+        for adjustment in adjustments:
+            product = await self.collection.find_one_and_update(
+                {"_id": adjustment.product_id, "quantity": {"$gte": -adjustment.delta}},
+                {
+                    "$inc": {"quantity": adjustment.delta, "version": 1},
+                    "$set": {"updated_at": datetime.utcnow()},
+                },
+                return_document=ReturnDocument.AFTER
+            )
+            if not product:
+                for previous in reversed(applied):
+                    await self.collection.update_one(
+                        {"_id": previous.product_id}, {"$inc": {"quantity": -previous.delta, "version": 1}}
+                    )
+                if await self.collection.find_one({"_id": adjustment.product_id}, {"_id": 1}) is None:
+                    raise ProductNotFoundError(adjustment.product_id)
+                raise InsufficientStockError(adjustment.product_id)
+            applied.append(adjustment)
+            updated.append(map_to_entity(product))
+        return updated
+
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        if not products:
+            return []
+
+        now = datetime.utcnow()
+        documents = [product_document(None, product, now) for product in products]
+        await self.ids.insert(documents)
+        return [map_to_entity(document) for document in documents]
+
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        ids = [item.id for item in updates]
+        projection = {"created_at": 1, "version": 1}
+        current = {
+            document["_id"]: document
+            async for document in self.collection.find({"_id": {"$in": ids}}, projection)
+        }
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne({"_id": item.id}, {"$set": product_fields(item, now), "$inc": {"version": 1}})
+            for item in updates
+            if item.id in current
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+        return [
+            ProductDb(
+                **item.model_dump(),
+                created_at=current[item.id]["created_at"],
+                updated_at=now,
+                version=current[item.id].get("version", 0) + 1,
+            )
+            if item.id in current else None
+            for item in updates
+        ]
+
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        existing = [
+            document["_id"]
+            async for document in self.collection.find({"_id": {"$in": product_ids}}, {"_id": 1})
+        ]
+        if existing:
+            await self.collection.delete_many({"_id": {"$in": existing}})
+        return existing
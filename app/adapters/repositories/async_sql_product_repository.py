@@ -0,0 +1,253 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import Row, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.models.sql.product_model import ProductModel
+from app.adapters.models.sql.search_index import has_search_index
+from app.adapters.repositories.sql_statements import (
+    adjust_quantity_statement,
+    build_page,
+    bulk_update_rows,
+    bulk_update_statement,
+    catalog_stamp_statement,
+    chunks,
+    insert_products_statement,
+    map_row,
+    map_to_entity,
+    outbox_insert_statement,
+    outbox_rows,
+    page_statement,
+    product_rows,
+    product_select,
+    search_statement,
+    update_product_statement,
+)
+from app.adapters.search.trie_index import product_search_index, tokenize
+from app.config import settings
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+    check_version,
+    product_changes,
+)
+from app.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+
+
+class AsyncSQLProductRepository(AsyncProductRepository):
+    def __init__(self, db_session: AsyncSession, record_changes: bool = settings.OUTBOX_ENABLED):
+        self.db_session = db_session
+        self.record_changes = record_changes
+
+    async def get_all(self) -> List[ProductDb]:
+        rows = await self.db_session.execute(product_select())
+        return [map_row(row) for row in rows]
+
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        statement = page_statement(filters, sort_by, order, limit, cursor)
+        rows = (await self.db_session.execute(statement)).all()
+        return build_page(rows, sort_by, order, limit)
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        statement = product_select().order_by(ProductModel.id).execution_options(yield_per=batch_size)
+        rows = await self.db_session.stream(statement)
+        async for row in rows:
+            yield map_row(row)
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        result = await self.db_session.execute(catalog_stamp_statement())
+        count, last_modified = result.one()
+        return CatalogStamp(count=count, last_modified=last_modified)
+
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        connection = await self.db_session.connection()
+        if await connection.run_sync(has_search_index):
+            statement = search_statement(connection.dialect.name, terms, limit)
+            return [map_row(row) for row in await self.db_session.execute(statement)]
+
+        stamp = await self.get_catalog_stamp()
+        key = (str(connection.engine.url), stamp.count, stamp.last_modified)
+        if product_search_index.stamp != key:
+            products = [product async for product in self.stream_all()]
+            product_search_index.rebuild(products, key)
+        return product_search_index.search(terms, limit)
+
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        result = await self.db_session.execute(product_select().where(ProductModel.id == product_id))
+        row = result.first()
+        return map_row(row) if row else None
+
+    async def create(self, product: Product) -> ProductDb:
+        db_product = ProductModel(
+            name=product.name,
+            description=product.description,
+            category=product.category,
+            price=product.price,
+            quantity=product.quantity
+        )
+        self.db_session.add(db_product)
+        if self.record_changes:
+            await self.db_session.flush()
+            await self._record_changes([db_product.id])
+        await self.db_session.commit()
+        await self.db_session.refresh(db_product)
+        return map_to_entity(db_product)
+
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        changes = product_changes(product)
+        if not changes:
+            return check_version(await self.get_by_id(product_id), expected_version)
+
+        result = await self.db_session.execute(
+            update_product_statement(product_id, changes, expected_version),
+            execution_options={"synchronize_session": False},
+        )
+        row = result.first()
+        if row:
+            await self._record_changes([product_id])
+        await self.db_session.commit()
+        if row is None and expected_version is not None:
+            # Missing, or moved past expected_version: only then is the extra read worth it
+            check_version(await self.get_by_id(product_id), expected_version)
+        return map_row(row) if row else None
+
+    async def delete(self, product_id: int) -> bool:
+        db_product = await self.db_session.get(ProductModel, product_id)
+        if not db_product:
+            return False
+
+        await self.db_session.delete(db_product)
+        await self._record_changes([product_id])
+        await self.db_session.commit()
+        return True
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        result = await self.db_session.scalars(
+            adjust_quantity_statement(product_id, delta, floor),
+            execution_options={"synchronize_session": False},
+        )
+        product = result.one_or_none()
+        entity = map_to_entity(product) if product else None
+        if entity:
+            await self._record_changes([entity.id])
+        await self.db_session.commit()
+        return entity
+
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        # Lock rows in id order so concurrent reservations cannot deadlock
+        ordered = sorted(adjustments, key=lambda adjustment: adjustment.product_id)
+        # The savepoint lets a rejected reservation undo only its own changes
+        savepoint = await self.db_session.begin_nested()
+        updated = {}
+        for adjustment in ordered:
+            statement = adjust_quantity_statement(
+                adjustment.product_id,
+                adjustment.delta,
+                floor=None if reject_if_insufficient else 0,
+                minimum=0 if reject_if_insufficient else None,
+            )
+            result = await self.db_session.scalars(
+                statement, execution_options={"synchronize_session": False}
+            )
+            product = result.one_or_none()
+            if not product:
+                exists = await self.db_session.scalar(
+                    select(ProductModel.id).where(ProductModel.id == adjustment.product_id)
+                )
+                await savepoint.rollback()
+                if not exists:
+                    raise ProductNotFoundError(adjustment.product_id)
+                raise InsufficientStockError(adjustment.product_id)
+            updated[product.id] = map_to_entity(product)
+
+        await self._record_changes(updated)
+        await savepoint.commit()
+        await self.db_session.commit()
+        return [updated[adjustment.product_id] for adjustment in adjustments]
+
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        if not products:
+            return []
+        created = await self.db_session.scalars(insert_products_statement(), product_rows(products))
+        entities = [map_to_entity(product) for product in created.all()]
+        await self._record_changes([entity.id for entity in entities])
+        await self.db_session.commit()
+        return entities
+
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        current = await self._get_current([item.id for item in updates])
+        existing = [item for item in updates if item.id in current]
+        now = datetime.utcnow()
+        if existing:
+            await self.db_session.execute(bulk_update_statement(), bulk_update_rows(existing, now))
+            await self._record_changes([item.id for item in existing])
+            await self.db_session.commit()
+
+        return [
+            ProductDb(
+                **item.model_dump(),
+                created_at=current[item.id].created_at,
+                updated_at=now,
+                version=current[item.id].version + 1,
+            )
+            if item.id in current else None
+            for item in updates
+        ]
+
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        deleted = []
+        for chunk in chunks(product_ids):
+            result = await self.db_session.execute(
+                delete(ProductModel).where(ProductModel.id.in_(chunk)).returning(ProductModel.id),
+                execution_options={"synchronize_session": False},
+            )
+            deleted.extend(result.scalars().all())
+        await self._record_changes(deleted)
+        await self.db_session.commit()
+        return deleted
+
+    async def _record_changes(self, product_ids: Iterable[int]) -> None:
+        rows = outbox_rows(product_ids) if self.record_changes else []
+        if rows:
+            await self.db_session.execute(outbox_insert_statement(), rows)
+
+    async def _get_current(self, product_ids: List[int]) -> Dict[int, Row]:
+        """(created_at, version) of the existing products, by id"""
+        current = {}
+        for chunk in chunks(product_ids):
+            rows = await self.db_session.execute(
+                select(ProductModel.id, ProductModel.created_at, ProductModel.version)
+                .where(ProductModel.id.in_(chunk))
+            )
+            current.update({row.id: row for row in rows})
+        return current
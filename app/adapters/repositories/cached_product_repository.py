@@ -0,0 +1,301 @@
+import threading
+from typing import AsyncIterator, Hashable, Iterable, Iterator, List, Optional, Union
+
+from app.adapters.cache.ttl_cache import TTLCache
+from app.config import settings
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+)
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+from app.domain.interfaces.product_repository import ProductRepository
+
+
+class ProductCache:
+    """Process-wide cache shared by every CachedProductRepository instance"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.products = TTLCache(maxsize, ttl)
+        self.listings = TTLCache(maxsize, ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def store_product(self, product: ProductDb, generation: int) -> None:
+        # Skip values loaded before a concurrent write invalidated the cache. The
+        # check and the set share the lock that invalidate bumps the generation
+        # under, so an invalidation either rejects the value or drops it after.
+        with self._lock:
+            if generation == self._generation:
+                self.products.set(product.id, product)
+
+    def store_listing(self, key: Hashable, value, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self.listings.set(key, value)
+
+    def invalidate(self, product_ids: Iterable[int] = ()) -> None:
+        # Any write may change any listing, so listings are always dropped
+        with self._lock:
+            self._generation += 1
+        for product_id in product_ids:
+            self.products.delete(product_id)
+        self.listings.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self.products.clear()
+        self.listings.clear()
+
+    def stats(self) -> dict:
+        return {"products": self.products.stats(), "listings": self.listings.stats()}
+
+
+product_cache = ProductCache(maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+
+
+class CachedProductRepository(ProductRepository):
+    """Read-through caching decorator for any ProductRepository"""
+
+    def __init__(self, repository: ProductRepository, cache: ProductCache = product_cache):
+        self.repository = repository
+        self.cache = cache
+
+    def get_all(self) -> List[ProductDb]:
+        cached = self.cache.listings.get("all")
+        if cached is not None:
+            return list(cached)
+        generation = self.cache.generation
+        products = self.repository.get_all()
+        self.cache.store_listing("all", tuple(products), generation)
+        return products
+
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        key = ("page", tuple(filters.model_dump().items()), sort_by, order, limit, cursor)
+        cached = self.cache.listings.get(key)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        page = self.repository.get_page(filters, sort_by, order, limit, cursor)
+        self.cache.store_listing(key, page, generation)
+        return page
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        return self.repository.stream_all(batch_size)
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        cached = self.cache.listings.get("stamp")
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        stamp = self.repository.get_catalog_stamp()
+        self.cache.store_listing("stamp", stamp, generation)
+        return stamp
+
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        key = ("search", query, limit)
+        cached = self.cache.listings.get(key)
+        if cached is not None:
+            return list(cached)
+        generation = self.cache.generation
+        products = self.repository.search(query, limit)
+        self.cache.store_listing(key, tuple(products), generation)
+        return products
+
+    def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        cached = self.cache.products.get(product_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        product = self.repository.get_by_id(product_id)
+        if product:
+            self.cache.store_product(product, generation)
+        return product
+
+    def create(self, product: Product) -> ProductDb:
+        created = self.repository.create(product)
+        self.cache.invalidate([created.id])
+        return created
+
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        try:
+            return self.repository.update(product_id, product, expected_version)
+        finally:
+            # Also on a version conflict: the cached copy is then likely stale
+            self.cache.invalidate([product_id])
+
+    def delete(self, product_id: int) -> bool:
+        deleted = self.repository.delete(product_id)
+        self.cache.invalidate([product_id])
+        return deleted
+
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        updated = self.repository.adjust_quantity(product_id, delta, floor)
+        self.cache.invalidate([product_id])
+        return updated
+
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        try:
+            return self.repository.adjust_quantities(adjustments, reject_if_insufficient)
+        finally:
+            self.cache.invalidate([adjustment.product_id for adjustment in adjustments])
+
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        created = self.repository.create_many(products)
+        self.cache.invalidate([product.id for product in created])
+        return created
+
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        updated = self.repository.update_many(updates)
+        self.cache.invalidate([update.id for update in updates])
+        return updated
+
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        deleted = self.repository.delete_many(product_ids)
+        self.cache.invalidate(product_ids)
+        return deleted
+
+
+class AsyncCachedProductRepository(AsyncProductRepository):
+    """Async variant of CachedProductRepository sharing the same ProductCache"""
+
+    def __init__(self, repository: AsyncProductRepository, cache: ProductCache = product_cache):
+        self.repository = repository
+        self.cache = cache
+
+    async def get_all(self) -> List[ProductDb]:
+        cached = self.cache.listings.get("all")
+        if cached is not None:
+            return list(cached)
+        generation = self.cache.generation
+        products = await self.repository.get_all()
+        self.cache.store_listing("all", tuple(products), generation)
+        return products
+
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        key = ("page", tuple(filters.model_dump().items()), sort_by, order, limit, cursor)
+        cached = self.cache.listings.get(key)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        page = await self.repository.get_page(filters, sort_by, order, limit, cursor)
+        self.cache.store_listing(key, page, generation)
+        return page
+
+    def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        return self.repository.stream_all(batch_size)
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        cached = self.cache.listings.get("stamp")
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        stamp = await self.repository.get_catalog_stamp()
+        self.cache.store_listing("stamp", stamp, generation)
+        return stamp
+
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        key = ("search", query, limit)
+        cached = self.cache.listings.get(key)
+        if cached is not None:
+            return list(cached)
+        generation = self.cache.generation
+        products = await self.repository.search(query, limit)
+        self.cache.store_listing(key, tuple(products), generation)
+        return products
+
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        cached = self.cache.products.get(product_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        product = await self.repository.get_by_id(product_id)
+        if product:
+            self.cache.store_product(product, generation)
+        return product
+
+    async def create(self, product: Product) -> ProductDb:
+        created = await self.repository.create(product)
+        self.cache.invalidate([created.id])
+        return created
+
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        try:
+            return await self.repository.update(product_id, product, expected_version)
+        finally:
+            self.cache.invalidate([product_id])
+
+    async def delete(self, product_id: int) -> bool:
+        deleted = await self.repository.delete(product_id)
+        self.cache.invalidate([product_id])
+        return deleted
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        updated = await self.repository.adjust_quantity(product_id, delta, floor)
+        self.cache.invalidate([product_id])
+        return updated
+
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        try:
+            return await self.repository.adjust_quantities(adjustments, reject_if_insufficient)
+        finally:
+            self.cache.invalidate([adjustment.product_id for adjustment in adjustments])
+
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        created = await self.repository.create_many(products)
+        self.cache.invalidate([product.id for product in created])
+        return created
+
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        updated = await self.repository.update_many(updates)
+        self.cache.invalidate([update.id for update in updates])
+        return updated
+
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        deleted = await self.repository.delete_many(product_ids)
+        self.cache.invalidate(product_ids)
+        return deleted
@@ -0,0 +1,204 @@
+import time
+from typing import AsyncIterator, Iterator, List, Optional, Union
+
+from app.adapters.metrics.instrumentation import record_repository_call, repository_errors
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+)
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+from app.domain.interfaces.product_repository import ProductRepository
+
+
+def returned_rows(result) -> Optional[int]:
+    """Products carried by a repository result; None for counts, flags and stamps"""
+    if isinstance(result, list):
+        return sum(item is not None and not isinstance(item, int) for item in result)
+    if isinstance(result, ProductPage):
+        return len(result.items)
+    if isinstance(result, ProductDb):
+        return 1
+    return None
+
+
+class InstrumentedProductRepository(ProductRepository):
+    """Decorator recording latency, returned rows and errors of every call, per backend"""
+
+    def __init__(self, repository: ProductRepository, backend: str):
+        self.repository = repository
+        self.backend = backend
+
+    def _call(self, operation: str, *args):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = getattr(self.repository, operation)(*args)
+            return result
+        except Exception:
+            repository_errors.inc(self.backend, operation)
+            raise
+        finally:
+            record_repository_call(
+                self.backend, operation, time.perf_counter() - started, returned_rows(result)
+            )
+
+    def get_all(self) -> List[ProductDb]:
+        return self._call("get_all")
+
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return self._call("get_page", filters, sort_by, order, limit, cursor)
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        # Timed until the stream is exhausted or closed
+        started = time.perf_counter()
+        rows = 0
+        try:
+            for product in self.repository.stream_all(batch_size):
+                rows += 1
+                yield product
+        finally:
+            record_repository_call(self.backend, "stream_all", time.perf_counter() - started, rows)
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        return self._call("get_catalog_stamp")
+
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return self._call("search", query, limit)
+
+    def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return self._call("get_by_id", product_id)
+
+    def create(self, product: Product) -> ProductDb:
+        return self._call("create", product)
+
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        return self._call("update", product_id, product, expected_version)
+
+    def delete(self, product_id: int) -> bool:
+        return self._call("delete", product_id)
+
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        return self._call("adjust_quantity", product_id, delta, floor)
+
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        return self._call("adjust_quantities", adjustments, reject_if_insufficient)
+
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        return self._call("create_many", products)
+
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        return self._call("update_many", updates)
+
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        return self._call("delete_many", product_ids)
+
+
+class AsyncInstrumentedProductRepository(AsyncProductRepository):
+    """Async variant of InstrumentedProductRepository"""
+
+    def __init__(self, repository: AsyncProductRepository, backend: str):
+        self.repository = repository
+        self.backend = backend
+
+    async def _call(self, operation: str, *args):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await getattr(self.repository, operation)(*args)
+            return result
+        except Exception:
+            repository_errors.inc(self.backend, operation)
+            raise
+        finally:
+            record_repository_call(
+                self.backend, operation, time.perf_counter() - started, returned_rows(result)
+            )
+
+    async def get_all(self) -> List[ProductDb]:
+        return await self._call("get_all")
+
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return await self._call("get_page", filters, sort_by, order, limit, cursor)
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        started = time.perf_counter()
+        rows = 0
+        try:
+            async for product in self.repository.stream_all(batch_size):
+                rows += 1
+                yield product
+        finally:
+            record_repository_call(self.backend, "stream_all", time.perf_counter() - started, rows)
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        return await self._call("get_catalog_stamp")
+
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return await self._call("search", query, limit)
+
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return await self._call("get_by_id", product_id)
+
+    async def create(self, product: Product) -> ProductDb:
+        return await self._call("create", product)
+
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        return await self._call("update", product_id, product, expected_version)
+
+    async def delete(self, product_id: int) -> bool:
+        return await self._call("delete", product_id)
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        return await self._call("adjust_quantity", product_id, delta, floor)
+
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        return await self._call("adjust_quantities", adjustments, reject_if_insufficient)
+
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        return await self._call("create_many", products)
+
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        return await self._call("update_many", updates)
+
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        return await self._call("delete_many", product_ids)
@@ -0,0 +1,183 @@
+from typing import AsyncIterator, Iterator, List, Optional, Union
+
+from app.adapters.cache.menu_snapshots import MenuSnapshots, menu_snapshots
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+)
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+from app.domain.interfaces.product_repository import ProductRepository
+
+
+class MenuSnapshotRepository(ProductRepository):
+    """Decorator patching the menu snapshots with the result of every write"""
+
+    def __init__(self, repository: ProductRepository, snapshots: MenuSnapshots = menu_snapshots):
+        self.repository = repository
+        self.snapshots = snapshots
+
+    def get_all(self) -> List[ProductDb]:
+        return self.repository.get_all()
+
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return self.repository.get_page(filters, sort_by, order, limit, cursor)
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        return self.repository.stream_all(batch_size)
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        return self.repository.get_catalog_stamp()
+
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return self.repository.search(query, limit)
+
+    def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return self.repository.get_by_id(product_id)
+
+    def create(self, product: Product) -> ProductDb:
+        created = self.repository.create(product)
+        self.snapshots.apply([created])
+        return created
+
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        updated = self.repository.update(product_id, product, expected_version)
+        self.snapshots.apply([updated])
+        return updated
+
+    def delete(self, product_id: int) -> bool:
+        deleted = self.repository.delete(product_id)
+        if deleted:
+            self.snapshots.apply(deleted=[product_id])
+        return deleted
+
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        updated = self.repository.adjust_quantity(product_id, delta, floor)
+        self.snapshots.apply([updated])
+        return updated
+
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        updated = self.repository.adjust_quantities(adjustments, reject_if_insufficient)
+        self.snapshots.apply(updated)
+        return updated
+
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        created = self.repository.create_many(products)
+        self.snapshots.apply(created)
+        return created
+
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        updated = self.repository.update_many(updates)
+        self.snapshots.apply(updated)
+        return updated
+
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        deleted = self.repository.delete_many(product_ids)
+        self.snapshots.apply(deleted=deleted)
+        return deleted
+
+
+class AsyncMenuSnapshotRepository(AsyncProductRepository):
+    """Async variant of MenuSnapshotRepository sharing the same MenuSnapshots"""
+
+    def __init__(self, repository: AsyncProductRepository, snapshots: MenuSnapshots = menu_snapshots):
+        self.repository = repository
+        self.snapshots = snapshots
+
+    async def get_all(self) -> List[ProductDb]:
+        return await self.repository.get_all()
+
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return await self.repository.get_page(filters, sort_by, order, limit, cursor)
+
+    def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        return self.repository.stream_all(batch_size)
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        return await self.repository.get_catalog_stamp()
+
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return await self.repository.search(query, limit)
+
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return await self.repository.get_by_id(product_id)
+
+    async def create(self, product: Product) -> ProductDb:
+        created = await self.repository.create(product)
+        self.snapshots.apply([created])
+        return created
+
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        updated = await self.repository.update(product_id, product, expected_version)
+        self.snapshots.apply([updated])
+        return updated
+
+    async def delete(self, product_id: int) -> bool:
+        deleted = await self.repository.delete(product_id)
+        if deleted:
+            self.snapshots.apply(deleted=[product_id])
+        return deleted
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        updated = await self.repository.adjust_quantity(product_id, delta, floor)
+        self.snapshots.apply([updated])
+        return updated
+
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        updated = await self.repository.adjust_quantities(adjustments, reject_if_insufficient)
+        self.snapshots.apply(updated)
+        return updated
+
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        created = await self.repository.create_many(products)
+        self.snapshots.apply(created)
+        return created
+
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        updated = await self.repository.update_many(updates)
+        self.snapshots.apply(updated)
+        return updated
+
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        deleted = await self.repository.delete_many(product_ids)
+        self.snapshots.apply(deleted=deleted)
+        return deleted
@@ -0,0 +1,202 @@
+"""Atomic id allocation for the Mongo repositories, backed by a counters collection"""
+import asyncio
+import threading
+from functools import lru_cache
+from typing import List, Optional
+
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.adapters.models.nosql.connection import get_product_collection
+from app.config import settings
+
+COUNTERS_COLLECTION = "counters"
+DUPLICATE_KEY_ERROR = 11000
+MAX_INSERT_ATTEMPTS = 5
+
+
+class IdBlock:
+    """Range of ids already reserved on the counter, handed out without a round trip"""
+
+    def __init__(self):
+        self.next_id = 0
+        self.end = 0
+
+    def take(self, count: int) -> Optional[int]:
+        if self.end - self.next_id < count:
+            return None
+        first = self.next_id
+        self.next_id += count
+        return first
+
+    def reset(self, next_id: int = 0, end: int = 0) -> None:
+        self.next_id = next_id
+        self.end = end
+
+
+def _reserve_range(block: IdBlock, count: int, seq: int, reserved: int) -> int:
+    # The counter now stores the last id of the reserved range
+    first = seq - reserved + 1
+    block.reset(first + count, seq + 1)
+    return first
+
+
+def _assign_ids(documents: List[dict], first_id: int) -> None:
+    for offset, document in enumerate(documents):
+        document["_id"] = first_id + offset
+
+
+def _remaining_after_conflict(documents: List[dict], error: Exception) -> List[dict]:
+    """Documents still to insert after a duplicate key, or raise if the failure was something else"""
+    if isinstance(error, DuplicateKeyError):
+        return documents
+    write_errors = error.details.get("writeErrors", [])
+    if any(write_error["code"] != DUPLICATE_KEY_ERROR for write_error in write_errors):
+        raise error
+    # insert_many is ordered, so everything before the first error was written
+    return documents[error.details["nInserted"]:]
+
+
+class IdAllocator:
+    """
+    Hands out integer _ids for a collection from a `$inc` counter document.
+
+    Each reservation takes `block_size` ids at once so most inserts in a process
+    need no counter round trip. A duplicate key (e.g. ids written by an older
+    deployment) re-syncs the counter past the highest existing _id and retries.
+    """
+
+    def __init__(self, collection, block_size: int = settings.NOSQL_ID_BLOCK_SIZE):
+        self.collection = collection
+        self.counters = collection.database[COUNTERS_COLLECTION]
+        self.name = collection.name
+        self.block_size = max(1, block_size)
+        self._block = IdBlock()
+        self._lock = threading.Lock()
+        self._synced = False
+
+    def allocate(self, count: int = 1) -> int:
+        """Return the first of `count` consecutive unused ids"""
+        with self._lock:
+            first = self._block.take(count)
+            if first is not None:
+                return first
+            if not self._synced:
+                self._sync()
+            reserved = max(count, self.block_size)
+            counter = self.counters.find_one_and_update(
+                {"_id": self.name},
+                {"$inc": {"seq": reserved}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return _reserve_range(self._block, count, counter["seq"], reserved)
+
+    def resync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def insert(self, documents: List[dict]) -> List[dict]:
+        """Assign ids to `documents` and insert them, retrying with fresh ids on conflicts"""
+        pending = documents
+        for attempt in range(MAX_INSERT_ATTEMPTS):
+            _assign_ids(pending, self.allocate(len(pending)))
+            try:
+                if len(pending) == 1:
+                    self.collection.insert_one(pending[0])
+                else:
+                    self.collection.insert_many(pending)
+                return documents
+            except (DuplicateKeyError, BulkWriteError) as error:
+                if attempt == MAX_INSERT_ATTEMPTS - 1:
+                    raise
+                pending = _remaining_after_conflict(pending, error)
+                self.resync()
+
+    def _sync(self) -> None:
+        # Never move the counter backwards; $max keeps concurrent syncs safe
+        last = self.collection.find_one({}, {"_id": 1}, sort=[("_id", DESCENDING)])
+        update = {"$max": {"seq": last["_id"] if last else 0}}
+        try:
+            self.counters.update_one({"_id": self.name}, update, upsert=True)
+        except DuplicateKeyError:
+            # Another process created the counter first; it exists now
+            self.counters.update_one({"_id": self.name}, update)
+        self._block.reset()
+        self._synced = True
+
+
+class AsyncIdAllocator:
+    """Motor counterpart of IdAllocator"""
+
+    def __init__(self, collection, block_size: int = settings.NOSQL_ID_BLOCK_SIZE):
+        self.collection = collection
+        self.counters = collection.database[COUNTERS_COLLECTION]
+        self.name = collection.name
+        self.block_size = max(1, block_size)
+        self._block = IdBlock()
+        self._lock = asyncio.Lock()
+        self._synced = False
+
+    async def allocate(self, count: int = 1) -> int:
+        """Return the first of `count` consecutive unused ids"""
+        async with self._lock:
+            first = self._block.take(count)
+            if first is not None:
+                return first
+            if not self._synced:
+                await self._sync()
+            reserved = max(count, self.block_size)
+            counter = await self.counters.find_one_and_update(
+                {"_id": self.name},
+                {"$inc": {"seq": reserved}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return _reserve_range(self._block, count, counter["seq"], reserved)
+
+    async def resync(self) -> None:
+        async with self._lock:
+            await self._sync()
+
+    async def insert(self, documents: List[dict]) -> List[dict]:
+        """Assign ids to `documents` and insert them, retrying with fresh ids on conflicts"""
+        pending = documents
+        for attempt in range(MAX_INSERT_ATTEMPTS):
+            _assign_ids(pending, await self.allocate(len(pending)))
+            try:
+                if len(pending) == 1:
+                    await self.collection.insert_one(pending[0])
+                else:
+                    await self.collection.insert_many(pending)
+                return documents
+            except (DuplicateKeyError, BulkWriteError) as error:
+                if attempt == MAX_INSERT_ATTEMPTS - 1:
+                    raise
+                pending = _remaining_after_conflict(pending, error)
+                await self.resync()
+
+    async def _sync(self) -> None:
+        last = await self.collection.find_one({}, {"_id": 1}, sort=[("_id", DESCENDING)])
+        update = {"$max": {"seq": last["_id"] if last else 0}}
+        try:
+            await self.counters.update_one({"_id": self.name}, update, upsert=True)
+        except DuplicateKeyError:
+            await self.counters.update_one({"_id": self.name}, update)
+        self._block.reset()
+        self._synced = True
+
+
+# One allocator per process for the default collections, so id blocks are shared
+# by every repository instance instead of being dropped after each request
+@lru_cache(maxsize=None)
+def get_product_id_allocator() -> IdAllocator:
+    return IdAllocator(get_product_collection())
+
+
+@lru_cache(maxsize=None)
+def get_async_product_id_allocator() -> AsyncIdAllocator:
+    # Imported here so the sync repository never loads motor
+    from app.adapters.models.nosql.async_connection import get_async_product_collection
+
+    return AsyncIdAllocator(get_async_product_collection())
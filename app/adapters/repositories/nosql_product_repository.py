@@ -1,77 +1,248 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
 
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 from pymongo.collection import Collection
 
-from app.adapters.models.nosql.connection import product_collection
-from app.domain.entities.product import Product, ProductDb
+from app.adapters.models.nosql.connection import get_product_collection
+from app.adapters.models.nosql.indexes import INDEX_NOT_FOUND, ensure_product_indexes
+from app.adapters.repositories.nosql_ids import IdAllocator, get_product_id_allocator
+from app.adapters.repositories.nosql_queries import (
+    TEXT_SCORE,
+    adjust_quantity_update,
+    build_page,
+    map_to_entity,
+    page_query,
+    product_document,
+    product_fields,
+    search_queries,
+    term_fields,
+    version_filter,
+)
+from app.adapters.search.trie_index import tokenize
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+    check_version,
+    product_changes,
+)
+from app.domain.exceptions import InsufficientStockError, ProductNotFoundError
 from app.domain.interfaces.product_repository import ProductRepository
 
 
 class NoSQLProductRepository(ProductRepository):
-    def __init__(self, collection: Collection = product_collection):
-        self.collection = collection
+    def __init__(self, collection: Optional[Collection] = None, ids: Optional[IdAllocator] = None):
+        if collection is None:
+            self.collection = get_product_collection()
+            self.ids = ids or get_product_id_allocator()
+        else:
+            self.collection = collection
+            self.ids = ids or IdAllocator(collection)
 
     def get_all(self) -> List[ProductDb]:
         products = list(self.collection.find())
         return [self._map_to_entity(product) for product in products]
 
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        query, sort = page_query(filters, sort_by, order, cursor)
+        documents = self.collection.find(query, sort=sort)
+        # Fetch one extra document to know whether another page exists
+        if limit is not None:
+            documents = documents.limit(limit + 1)
+        return build_page(list(documents), sort_by, order, limit)
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        documents = self.collection.find(sort=[("_id", ASCENDING)]).batch_size(batch_size)
+        try:
+            for product in documents:
+                yield self._map_to_entity(product)
+        finally:
+            documents.close()
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        latest = self.collection.find_one({}, {"updated_at": 1}, sort=[("updated_at", DESCENDING)])
+        return CatalogStamp(
+            count=self.collection.estimated_document_count(),
+            last_modified=latest["updated_at"] if latest else None
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        text_query, prefix_query = search_queries(terms)
+
+        try:
+            documents = self._text_search(text_query, limit)
+        except OperationFailure as error:
+            if error.code != INDEX_NOT_FOUND:
+                raise
+            # Indexes are created on first use so deployments need no extra setup step
+            ensure_product_indexes(self.collection)
+            documents = self._text_search(text_query, limit)
+
+        # $text only matches whole words; top up with products where the last word is a prefix
+        if len(documents) < limit:
+            prefix_query["_id"] = {"$nin": [document["_id"] for document in documents]}
+            cursor = self.collection.find(prefix_query).sort("_id", ASCENDING)
+            documents += list(cursor.limit(limit - len(documents)))
+        return [self._map_to_entity(document) for document in documents]
+
+    def _text_search(self, text_query: dict, limit: int) -> List[dict]:
+        cursor = self.collection.find(text_query, TEXT_SCORE).sort([("score", TEXT_SCORE["score"])])
+        return list(cursor.limit(limit))
+
     def get_by_id(self, product_id: int) -> Optional[ProductDb]:
         product = self.collection.find_one({"_id": product_id})
         return self._map_to_entity(product) if product else None
 
     def create(self, product: Product) -> ProductDb:
-        # Find the highest id to simulate auto-increment
-        last_product = self.collection.find_one(sort=[("_id", -1)])
-        next_id = 1 if not last_product else last_product["_id"] + 1
-        
-        now = datetime.utcnow()
-        product_dict = {
-            "_id": next_id,
-            "name": product.name,
-            "description": product.description,
-            "category": product.category,
-            "price": product.price,
-            "quantity": product.quantity,
-            "created_at": now,
-            "updated_at": now
-        }
-        
-        self.collection.insert_one(product_dict)
+        # The id comes from the atomic counter, assigned by the allocator on insert
+        product_dict = product_document(None, product, datetime.utcnow())
+        self.ids.insert([product_dict])
         return self._map_to_entity(product_dict)
 
-    def update(self, product_id: int, product: Product) -> Optional[ProductDb]:
-        now = datetime.utcnow()
-        result = self.collection.update_one(
-            {"_id": product_id},
-            {"$set": {
-                "name": product.name,
-                "description": product.description,
-                "category": product.category,
-                "price": product.price,
-                "quantity": product.quantity,
-                "updated_at": now
-            }}
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        changes = product_changes(product)
+        if not changes:
+            return check_version(self.get_by_id(product_id), expected_version)
+
+        document = self.collection.find_one_and_update(
+            version_filter(product_id, expected_version),
+            {
+                "$set": {**changes, **term_fields(changes), "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            },
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 0:
-            return None
-            
-        return self.get_by_id(product_id)
+        if document is None and expected_version is not None:
+            check_version(self.get_by_id(product_id), expected_version)
+        return self._map_to_entity(document) if document else None
 
     def delete(self, product_id: int) -> bool:
         result = self.collection.delete_one({"_id": product_id})
         return result.deleted_count > 0
     
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        change = adjust_quantity_update(delta, floor, datetime.utcnow())
+        product = self.collection.find_one_and_update(
+            {"_id": product_id}, change, return_document=ReturnDocument.AFTER
+        )
+        return self._map_to_entity(product) if product else None
+
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        ids = [adjustment.product_id for adjustment in adjustments]
+        existing = {document["_id"] for document in self.collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+        for product_id in ids:
+            if product_id not in existing:
+                raise ProductNotFoundError(product_id)
+
+        if not reject_if_insufficient:
+            # Clamped adjustments only fail if the product was deleted since the check above
+            updated = []
+            for adjustment in adjustments:
+                product = self.adjust_quantity(adjustment.product_id, adjustment.delta)
+                if product is None:
+                    raise ProductNotFoundError(adjustment.product_id)
+                updated.append(product)
+            return updated
+
+        # Without a replica set there are no multi-document transactions, so apply
+        # guarded $inc updates and compensate the applied ones if any is rejected
+        applied = []
+        updated = []
+        for adjustment in adjustments:
+            product = self.collection.find_one_and_update(
+                {"_id": adjustment.product_id, "quantity": {"$gte": -adjustment.delta}},
+                {
+                    "$inc": {"quantity": adjustment.delta, "version": 1},
+                    "$set": {"updated_at": datetime.utcnow()},
+                },
+                return_document=ReturnDocument.AFTER
+            )
+            if not product:
+                for previous in reversed(applied):
+                    self.collection.update_one(
+                        {"_id": previous.product_id}, {"$inc": {"quantity": -previous.delta, "version": 1}}
+                    )
+                if self.collection.find_one({"_id": adjustment.product_id}, {"_id": 1}) is None:
+                    raise ProductNotFoundError(adjustment.product_id)
+                raise InsufficientStockError(adjustment.product_id)
+            applied.append(adjustment)
+            updated.append(self._map_to_entity(product))
+        return updated
+
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        if not products:
+            return []
+
+        now = datetime.utcnow()
+        documents = [product_document(None, product, now) for product in products]
+        self.ids.insert(documents)
+        return [self._map_to_entity(document) for document in documents]
+
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        ids = [item.id for item in updates]
+        projection = {"created_at": 1, "version": 1}
+        current = {
+            document["_id"]: document
+            for document in self.collection.find({"_id": {"$in": ids}}, projection)
+        }
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne({"_id": item.id}, {"$set": product_fields(item, now), "$inc": {"version": 1}})
+            for item in updates
+            if item.id in current
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+        return [
+            ProductDb(
+                **item.model_dump(),
+                created_at=current[item.id]["created_at"],
+                updated_at=now,
+                version=current[item.id].get("version", 0) + 1,
+            )
+            if item.id in current else None
+            for item in updates
+        ]
+
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        existing = [
+            document["_id"]
+            for document in self.collection.find({"_id": {"$in": product_ids}}, {"_id": 1})
+        ]
+        if existing:
+            self.collection.delete_many({"_id": {"$in": existing}})
+        return existing
+
     def _map_to_entity(self, data: dict) -> ProductDb:
-        return ProductDb(
-            id=data["_id"],
-            name=data["name"],
-            description=data["description"],
-            category=data["category"],
-            price=data["price"],
-            quantity=data["quantity"],
-            created_at=data["created_at"],
-            updated_at=data["updated_at"]
-        ) 
\ No newline at end of file
+        return map_to_entity(data)
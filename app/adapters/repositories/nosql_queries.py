@@ -0,0 +1,186 @@
+"""Mongo query builders shared by the sync and async NoSQL product repositories"""
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+from app.adapters.repositories.pagination import decode_cursor, encode_cursor
+from app.adapters.search.trie_index import tokenize
+from app.domain.entities.product import (
+    Product,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    SortOrder,
+)
+
+# Projection/sort on the $text relevance score
+TEXT_SCORE = {"score": {"$meta": "textScore"}}
+
+
+def build_filter(filters: ProductFilter) -> dict:
+    query = {}
+    if filters.category is not None:
+        query["category"] = filters.category.value
+    price = {}
+    if filters.min_price is not None:
+        price["$gte"] = filters.min_price
+    if filters.max_price is not None:
+        price["$lte"] = filters.max_price
+    if price:
+        query["price"] = price
+    if filters.in_stock is True:
+        query["quantity"] = {"$gt": 0}
+    elif filters.in_stock is False:
+        query["quantity"] = {"$lte": 0}
+    return query
+
+
+def page_query(
+    filters: ProductFilter,
+    sort_by: ProductSortField,
+    order: SortOrder,
+    cursor: Optional[str],
+) -> Tuple[dict, List[Tuple[str, int]]]:
+    """Return the (filter, sort) pair for a keyset page"""
+    sort_field = _sort_field(sort_by)
+    direction = DESCENDING if order == SortOrder.DESC else ASCENDING
+    comparison = "$lt" if order == SortOrder.DESC else "$gt"
+    query = build_filter(filters)
+
+    keyset = decode_cursor(cursor, sort_by, order)
+    if keyset:
+        last_value, last_id = keyset
+        if sort_field == "_id":
+            query["_id"] = {comparison: last_id}
+        else:
+            query["$or"] = [
+                {sort_field: {comparison: last_value}},
+                {sort_field: last_value, "_id": {comparison: last_id}},
+            ]
+
+    sort = [(sort_field, direction)]
+    if sort_field != "_id":
+        sort.append(("_id", direction))
+    return query, sort
+
+
+def build_page(
+    documents: List[dict],
+    sort_by: ProductSortField,
+    order: SortOrder,
+    limit: Optional[int],
+) -> ProductPage:
+    next_cursor = None
+    if limit is not None and len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(sort_by, order, last[_sort_field(sort_by)], last["_id"])
+
+    return ProductPage(
+        items=[map_to_entity(document) for document in documents],
+        next_cursor=next_cursor,
+    )
+
+
+def search_terms(text: str) -> List[str]:
+    """Distinct lowercased words of a field, stored next to it for prefix lookups"""
+    return sorted(set(tokenize(text)))
+
+
+def term_fields(changes: dict) -> dict:
+    """The *_terms fields to rewrite along with changed name/description fields"""
+    return {
+        f"{field}_terms": search_terms(changes[field])
+        for field in ("name", "description")
+        if field in changes
+    }
+
+
+def _term_match(condition) -> dict:
+    return {"$or": [{"name_terms": condition}, {"description_terms": condition}]}
+
+
+def search_queries(terms: List[str]) -> Tuple[dict, dict]:
+    """
+    $text query requiring every word (quoted terms are ANDed), ranked by text
+    score, and the query used to top it up while the last word is still being
+    typed ($text only matches whole words). Like the SQL search, every word
+    must match and only the last one as a prefix; an anchored case-sensitive
+    regex on the lowercased *_terms arrays can use their indexes
+    """
+    text_query = {"$text": {"$search": " ".join(f'"{term}"' for term in terms)}}
+    prefix = {"$regex": f"^{re.escape(terms[-1])}"}
+    prefix_query = {"$and": [*(_term_match(term) for term in terms[:-1]), _term_match(prefix)]}
+    return text_query, prefix_query
+
+
+def adjust_quantity_update(delta: int, floor: Optional[int], now: datetime):
+    if floor is None:
+        return {"$inc": {"quantity": delta, "version": 1}, "$set": {"updated_at": now}}
+    # $inc cannot clamp, so use an update pipeline to stay a single atomic operation
+    return [{"$set": {
+        "quantity": {"$max": [{"$add": ["$quantity", delta]}, floor]},
+        "updated_at": now,
+        "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+    }}]
+
+
+def version_filter(product_id: int, expected_version: Optional[int] = None) -> dict:
+    """Match the product, and with expected_version only while it still has that version"""
+    if expected_version is None:
+        return {"_id": product_id}
+    # Documents written before versioning have no version field and read as version 0
+    return {"_id": product_id, "version": expected_version if expected_version else {"$in": [0, None]}}
+
+
+def product_fields(product: Product, now: datetime) -> dict:
+    return {
+        "name": product.name,
+        "description": product.description,
+        "category": product.category,
+        "price": product.price,
+        "quantity": product.quantity,
+        "updated_at": now,
+        **term_fields({"name": product.name, "description": product.description}),
+    }
+
+
+def product_document(product_id: Optional[int], product: Product, now: datetime) -> dict:
+    return {"_id": product_id, **product_fields(product, now), "created_at": now, "version": 1}
+
+
+def entity_document(product: ProductDb) -> dict:
+    """Document mirroring a product of the SQL store, as projected into the read model"""
+    return {
+        "_id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "category": product.category,
+        "price": product.price,
+        "quantity": product.quantity,
+        "created_at": product.created_at,
+        "updated_at": product.updated_at,
+        "version": product.version,
+        **term_fields({"name": product.name, "description": product.description}),
+    }
+
+
+def map_to_entity(data: dict) -> ProductDb:
+    return ProductDb(
+        id=data["_id"],
+        name=data["name"],
+        description=data["description"],
+        category=data["category"],
+        price=data["price"],
+        quantity=data["quantity"],
+        created_at=data["created_at"],
+        updated_at=data["updated_at"],
+        version=data.get("version", 0),
+    )
+
+
+def _sort_field(sort_by: ProductSortField) -> str:
+    return "_id" if sort_by == ProductSortField.ID else sort_by.value
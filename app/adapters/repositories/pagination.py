@@ -0,0 +1,33 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+from app.domain.entities.product import ProductSortField, SortOrder
+
+
+def encode_cursor(
+    sort_by: ProductSortField, order: SortOrder, last_value: Any, last_id: int
+) -> str:
+    """Build an opaque continuation token pointing right after the given row"""
+    payload = {"s": sort_by.value, "o": order.value, "v": last_value, "i": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], sort_by: ProductSortField, order: SortOrder
+) -> Optional[Tuple[Any, int]]:
+    """Return the (sort value, id) keyset encoded in the token, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        token_sort, token_order = payload["s"], payload["o"]
+        last_value, last_id = payload["v"], int(payload["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+    if token_sort != sort_by.value or token_order != order.value:
+        raise ValueError("Pagination cursor does not match the requested sort")
+    return last_value, last_id
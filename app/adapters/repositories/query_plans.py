@@ -0,0 +1,112 @@
+"""
+Print the database query plans for the product repository's main access paths,
+to check that filtered listings are served by indexes rather than full scans.
+
+    python -m app.adapters.repositories.query_plans --backend sql
+    python -m app.adapters.repositories.query_plans --backend nosql
+"""
+import argparse
+import json
+from typing import Dict, List
+
+from sqlalchemy import Select
+from sqlalchemy.engine import Connection
+
+from app.adapters.models.sql.search_index import has_search_index
+from app.adapters.repositories.nosql_queries import page_query
+from app.adapters.repositories.sql_statements import (
+    catalog_stamp_statement,
+    page_statement,
+    search_statement,
+)
+from app.domain.entities.product import (
+    ProductCategory,
+    ProductFilter,
+    ProductSortField,
+    SortOrder,
+)
+
+PAGE_SIZE = 50
+
+# name -> (filters, sort_by, order) for the listings the API serves most
+LISTINGS = {
+    "list_by_id": (ProductFilter(), ProductSortField.ID, SortOrder.ASC),
+    "category_by_price": (
+        ProductFilter(category=ProductCategory.MAIN_ITEM, max_price=20),
+        ProductSortField.PRICE,
+        SortOrder.ASC,
+    ),
+    "category_in_stock": (
+        ProductFilter(category=ProductCategory.MAIN_ITEM, in_stock=True),
+        ProductSortField.ID,
+        SortOrder.ASC,
+    ),
+}
+
+
+def _sql_statements(connection: Connection) -> Dict[str, Select]:
+    statements = {
+        name: page_statement(filters, sort_by, order, PAGE_SIZE, None)
+        for name, (filters, sort_by, order) in LISTINGS.items()
+    }
+    statements["catalog_stamp"] = catalog_stamp_statement()
+    if has_search_index(connection):
+        statements["search"] = search_statement(connection.dialect.name, ["burger"], PAGE_SIZE)
+    return statements
+
+
+def sql_query_plans(connection: Connection) -> Dict[str, dict]:
+    """EXPLAIN output per access path, as {"query": ..., "plan": [lines]}"""
+    sqlite = connection.dialect.name == "sqlite"
+    plans = {}
+    for name, statement in _sql_statements(connection).items():
+        query = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+        rows = connection.exec_driver_sql(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + query).all()
+        # SQLite rows are (id, parent, notused, detail); other databases return one text column
+        plans[name] = {"query": query, "plan": [row[-1] for row in rows]}
+    return plans
+
+
+def _plan_stages(stage: dict) -> List[str]:
+    line = stage["stage"] + (f" {stage['indexName']}" if "indexName" in stage else "")
+    children = stage.get("inputStages", [])
+    if "inputStage" in stage:
+        children = [stage["inputStage"], *children]
+    return [line] + [child_line for child in children for child_line in _plan_stages(child)]
+
+
+def mongo_query_plans(collection) -> Dict[str, dict]:
+    """Winning plan stages per access path, e.g. ["FETCH", "IXSCAN category_price"]"""
+    plans = {}
+    for name, (filters, sort_by, order) in LISTINGS.items():
+        query, sort = page_query(filters, sort_by, order, None)
+        explain = collection.find(query).sort(sort).limit(PAGE_SIZE + 1).explain()
+        plans[name] = {"query": query, "plan": _plan_stages(explain["queryPlanner"]["winningPlan"])}
+    explain = collection.find({}, {"updated_at": 1}).sort("updated_at", -1).limit(1).explain()
+    plans["catalog_stamp"] = {"query": {}, "plan": _plan_stages(explain["queryPlanner"]["winningPlan"])}
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", choices=["sql", "nosql"], default="sql")
+    args = parser.parse_args()
+
+    if args.backend == "sql":
+        from app.adapters.models.sql.session import get_engine
+
+        with get_engine().connect() as connection:
+            plans = sql_query_plans(connection)
+    else:
+        from app.adapters.models.nosql.connection import get_product_collection
+        from app.adapters.models.nosql.indexes import ensure_product_indexes
+
+        collection = get_product_collection()
+        ensure_product_indexes(collection)
+        plans = mongo_query_plans(collection)
+
+    print(json.dumps(plans, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+from pymongo.errors import PyMongoError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+)
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+from app.domain.interfaces.product_repository import ProductRepository
+
+# Reader failures that fall back to the primary; anything else (e.g. a bad cursor) propagates
+READ_ERRORS = (SQLAlchemyError, PyMongoError)
+# BSON dates keep milliseconds, so the Mongo read model's stamp is up to 1ms behind
+STAMP_PRECISION = timedelta(milliseconds=1)
+
+
+class ReplicaMonitor:
+    """
+    Process-wide freshness state of the read replicas, shared by every request.
+
+    A reader is checked at most once per check_interval by comparing its catalog
+    stamp with the primary's. It is stale when its newest change is more than
+    max_lag seconds behind the primary's, however recently the primary was
+    written. Readers that raise are skipped until the next check.
+    """
+
+    def __init__(
+        self,
+        max_lag: float,
+        check_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._clock = clock
+        self._fresh: Dict[int, bool] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+
+    def rotation(self, count: int) -> List[int]:
+        """Reader indexes in round-robin order, starting one further each call"""
+        start = next(self._rotation) % count
+        return [(start + offset) % count for offset in range(count)]
+
+    def needs_check(self, index: int) -> bool:
+        checked_at = self._checked_at.get(index)
+        return checked_at is None or self._clock() - checked_at >= self.check_interval
+
+    def record_check(self, index: int, fresh: bool) -> None:
+        with self._lock:
+            self._fresh[index] = fresh
+            self._checked_at[index] = self._clock()
+
+    def is_fresh(self, index: int) -> bool:
+        return self._fresh.get(index, False)
+
+    def mark_failed(self, index: int) -> None:
+        self.record_check(index, False)
+
+    def is_within_lag(self, primary: CatalogStamp, replica: CatalogStamp) -> bool:
+        if primary.last_modified is None:
+            return True
+        if replica.last_modified is None:
+            return False
+        behind = primary.last_modified - replica.last_modified
+        if behind < STAMP_PRECISION:
+            if replica.count == primary.count:
+                return True
+            # Only deletions are missing and they leave no stamp: bound them by the primary's last change
+            behind = datetime.utcnow() - primary.last_modified
+        return behind.total_seconds() <= self.max_lag
+
+    def reset(self) -> None:
+        with self._lock:
+            self._fresh.clear()
+            self._checked_at.clear()
+
+
+replica_monitor = ReplicaMonitor(
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+
+class ReadWriteSplitRepository(ProductRepository):
+    """
+    Sends writes to the primary and reads to the readers (SQL replicas or the
+    Mongo read model). Reads go to the primary when no reader is fresh, when a
+    reader fails, and for the rest of the request after a write, so a request
+    always reads its own writes.
+    """
+
+    def __init__(
+        self,
+        primary: ProductRepository,
+        readers: List[ProductRepository],
+        monitor: ReplicaMonitor = replica_monitor,
+    ):
+        self.primary = primary
+        self.readers = readers
+        self.monitor = monitor
+        self._wrote = False
+
+    def _choose_reader(self) -> Optional[int]:
+        if self._wrote or not self.readers:
+            return None
+        for index in self.monitor.rotation(len(self.readers)):
+            if self.monitor.needs_check(index):
+                self.monitor.record_check(index, self._check(self.readers[index]))
+            if self.monitor.is_fresh(index):
+                return index
+        return None
+
+    def _check(self, reader: ProductRepository) -> bool:
+        try:
+            replica = reader.get_catalog_stamp()
+        except READ_ERRORS:
+            return False
+        return self.monitor.is_within_lag(self.primary.get_catalog_stamp(), replica)
+
+    def _read(self, method: str, *args):
+        index = self._choose_reader()
+        if index is not None:
+            try:
+                return getattr(self.readers[index], method)(*args)
+            except READ_ERRORS:
+                self.monitor.mark_failed(index)
+        return getattr(self.primary, method)(*args)
+
+    def _write(self, method: str, *args):
+        self._wrote = True
+        return getattr(self.primary, method)(*args)
+
+    def get_all(self) -> List[ProductDb]:
+        return self._read("get_all")
+
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return self._read("get_page", filters, sort_by, order, limit, cursor)
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        # Errors surface while streaming, after the reader was chosen
+        index = self._choose_reader()
+        source = self.primary if index is None else self.readers[index]
+        return source.stream_all(batch_size)
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        return self._read("get_catalog_stamp")
+
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return self._read("search", query, limit)
+
+    def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return self._read("get_by_id", product_id)
+
+    def create(self, product: Product) -> ProductDb:
+        return self._write("create", product)
+
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        return self._write("update", product_id, product, expected_version)
+
+    def delete(self, product_id: int) -> bool:
+        return self._write("delete", product_id)
+
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        return self._write("adjust_quantity", product_id, delta, floor)
+
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        return self._write("adjust_quantities", adjustments, reject_if_insufficient)
+
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        return self._write("create_many", products)
+
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        return self._write("update_many", updates)
+
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        return self._write("delete_many", product_ids)
+
+
+class AsyncReadWriteSplitRepository(AsyncProductRepository):
+    """Async variant of ReadWriteSplitRepository sharing the same ReplicaMonitor"""
+
+    def __init__(
+        self,
+        primary: AsyncProductRepository,
+        readers: List[AsyncProductRepository],
+        monitor: ReplicaMonitor = replica_monitor,
+    ):
+        self.primary = primary
+        self.readers = readers
+        self.monitor = monitor
+        self._wrote = False
+
+    async def _choose_reader(self) -> Optional[int]:
+        if self._wrote or not self.readers:
+            return None
+        for index in self.monitor.rotation(len(self.readers)):
+            if self.monitor.needs_check(index):
+                self.monitor.record_check(index, await self._check(self.readers[index]))
+            if self.monitor.is_fresh(index):
+                return index
+        return None
+
+    async def _check(self, reader: AsyncProductRepository) -> bool:
+        try:
+            replica = await reader.get_catalog_stamp()
+        except READ_ERRORS:
+            return False
+        return self.monitor.is_within_lag(await self.primary.get_catalog_stamp(), replica)
+
+    async def _read(self, method: str, *args):
+        index = await self._choose_reader()
+        if index is not None:
+            try:
+                return await getattr(self.readers[index], method)(*args)
+            except READ_ERRORS:
+                self.monitor.mark_failed(index)
+        return await getattr(self.primary, method)(*args)
+
+    async def _write(self, method: str, *args):
+        self._wrote = True
+        return await getattr(self.primary, method)(*args)
+
+    async def get_all(self) -> List[ProductDb]:
+        return await self._read("get_all")
+
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return await self._read("get_page", filters, sort_by, order, limit, cursor)
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        index = await self._choose_reader()
+        source = self.primary if index is None else self.readers[index]
+        async for product in source.stream_all(batch_size):
+            yield product
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        return await self._read("get_catalog_stamp")
+
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return await self._read("search", query, limit)
+
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return await self._read("get_by_id", product_id)
+
+    async def create(self, product: Product) -> ProductDb:
+        return await self._write("create", product)
+
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        return await self._write("update", product_id, product, expected_version)
+
+    async def delete(self, product_id: int) -> bool:
+        return await self._write("delete", product_id)
+
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        return await self._write("adjust_quantity", product_id, delta, floor)
+
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        return await self._write("adjust_quantities", adjustments, reject_if_insufficient)
+
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        return await self._write("create_many", products)
+
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        return await self._write("update_many", updates)
+
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        return await self._write("delete_many", product_ids)
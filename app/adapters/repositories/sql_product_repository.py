@@ -1,23 +1,101 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
+from sqlalchemy import Row, delete, select
 from sqlalchemy.orm import Session
 
 from app.adapters.models.sql.product_model import ProductModel
-from app.domain.entities.product import Product, ProductDb
+from app.adapters.models.sql.search_index import has_search_index
+from app.adapters.repositories.sql_statements import (
+    adjust_quantity_statement,
+    build_page,
+    bulk_update_rows,
+    bulk_update_statement,
+    catalog_stamp_statement,
+    chunks,
+    insert_products_statement,
+    map_row,
+    map_to_entity,
+    outbox_insert_statement,
+    outbox_rows,
+    page_statement,
+    product_rows,
+    product_select,
+    search_statement,
+    update_product_statement,
+)
+from app.adapters.search.trie_index import product_search_index, tokenize
+from app.config import settings
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+    check_version,
+    product_changes,
+)
+from app.domain.exceptions import InsufficientStockError, ProductNotFoundError
 from app.domain.interfaces.product_repository import ProductRepository
 
 
 class SQLProductRepository(ProductRepository):
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, record_changes: bool = settings.OUTBOX_ENABLED):
         self.db_session = db_session
+        # Write change events to the outbox for the Mongo read model projector
+        self.record_changes = record_changes
 
     def get_all(self) -> List[ProductDb]:
-        products = self.db_session.query(ProductModel).all()
-        return [self._map_to_entity(product) for product in products]
+        rows = self.db_session.execute(product_select()).all()
+        return [map_row(row) for row in rows]
+
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        statement = page_statement(filters, sort_by, order, limit, cursor)
+        rows = self.db_session.execute(statement).all()
+        return build_page(rows, sort_by, order, limit)
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        # yield_per streams rows through a server-side cursor in fixed-size batches
+        statement = product_select().order_by(ProductModel.id).execution_options(yield_per=batch_size)
+        for row in self.db_session.execute(statement):
+            yield map_row(row)
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        count, last_modified = self.db_session.execute(catalog_stamp_statement()).one()
+        return CatalogStamp(count=count, last_modified=last_modified)
+
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        connection = self.db_session.connection()
+        if has_search_index(connection):
+            statement = search_statement(connection.dialect.name, terms, limit)
+            return [map_row(row) for row in self.db_session.execute(statement)]
+
+        # No full-text support: search the in-memory index, rebuilt when the catalog changes
+        stamp = self.get_catalog_stamp()
+        key = (str(connection.engine.url), stamp.count, stamp.last_modified)
+        if product_search_index.stamp != key:
+            product_search_index.rebuild(self.stream_all(), key)
+        return product_search_index.search(terms, limit)
 
     def get_by_id(self, product_id: int) -> Optional[ProductDb]:
-        product = self.db_session.query(ProductModel).filter(ProductModel.id == product_id).first()
-        return self._map_to_entity(product) if product else None
+        row = self.db_session.execute(product_select().where(ProductModel.id == product_id)).first()
+        return map_row(row) if row else None
 
     def create(self, product: Product) -> ProductDb:
         db_product = ProductModel(
@@ -28,24 +106,35 @@ class SQLProductRepository(ProductRepository):
             quantity=product.quantity
         )
         self.db_session.add(db_product)
+        if self.record_changes:
+            self.db_session.flush()
+            self._record_changes([db_product.id])
         self.db_session.commit()
         self.db_session.refresh(db_product)
         return self._map_to_entity(db_product)
 
-    def update(self, product_id: int, product: Product) -> Optional[ProductDb]:
-        db_product = self.db_session.query(ProductModel).filter(ProductModel.id == product_id).first()
-        if not db_product:
-            return None
-        
-        db_product.name = product.name
-        db_product.description = product.description
-        db_product.category = product.category
-        db_product.price = product.price
-        db_product.quantity = product.quantity
-        
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        changes = product_changes(product)
+        if not changes:
+            return check_version(self.get_by_id(product_id), expected_version)
+
+        result = self.db_session.execute(
+            update_product_statement(product_id, changes, expected_version),
+            execution_options={"synchronize_session": False},
+        )
+        row = result.first()
+        if row:
+            self._record_changes([product_id])
         self.db_session.commit()
-        self.db_session.refresh(db_product)
-        return self._map_to_entity(db_product)
+        if row is None and expected_version is not None:
+            # Missing, or moved past expected_version: only then is the extra read worth it
+            check_version(self.get_by_id(product_id), expected_version)
+        return map_row(row) if row else None
 
     def delete(self, product_id: int) -> bool:
         db_product = self.db_session.query(ProductModel).filter(ProductModel.id == product_id).first()
@@ -53,17 +142,117 @@ class SQLProductRepository(ProductRepository):
             return False
         
         self.db_session.delete(db_product)
+        self._record_changes([product_id])
         self.db_session.commit()
         return True
     
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        product = self.db_session.scalars(
+            adjust_quantity_statement(product_id, delta, floor),
+            execution_options={"synchronize_session": False},
+        ).one_or_none()
+        entity = self._map_to_entity(product) if product else None
+        if entity:
+            self._record_changes([entity.id])
+        self.db_session.commit()
+        return entity
+
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        # Lock rows in id order so concurrent reservations cannot deadlock
+        ordered = sorted(adjustments, key=lambda adjustment: adjustment.product_id)
+        # The savepoint lets a rejected reservation undo only its own changes
+        savepoint = self.db_session.begin_nested()
+        updated = {}
+        for adjustment in ordered:
+            statement = adjust_quantity_statement(
+                adjustment.product_id,
+                adjustment.delta,
+                floor=None if reject_if_insufficient else 0,
+                minimum=0 if reject_if_insufficient else None,
+            )
+            product = self.db_session.scalars(
+                statement, execution_options={"synchronize_session": False}
+            ).one_or_none()
+            if not product:
+                exists = self.db_session.query(ProductModel.id).filter(
+                    ProductModel.id == adjustment.product_id
+                ).first()
+                savepoint.rollback()
+                if not exists:
+                    raise ProductNotFoundError(adjustment.product_id)
+                raise InsufficientStockError(adjustment.product_id)
+            updated[product.id] = self._map_to_entity(product)
+
+        self._record_changes(updated)
+        savepoint.commit()
+        self.db_session.commit()
+        return [updated[adjustment.product_id] for adjustment in adjustments]
+
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        if not products:
+            return []
+        statement = insert_products_statement()
+        created = self.db_session.scalars(statement, product_rows(products)).all()
+        # Map before committing, otherwise the expired instances are reloaded one by one
+        entities = [self._map_to_entity(product) for product in created]
+        self._record_changes([entity.id for entity in entities])
+        self.db_session.commit()
+        return entities
+
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        current = self._get_current([item.id for item in updates])
+        existing = [item for item in updates if item.id in current]
+        now = datetime.utcnow()
+        if existing:
+            # executemany UPDATE by primary key in a single transaction
+            self.db_session.execute(bulk_update_statement(), bulk_update_rows(existing, now))
+            self._record_changes([item.id for item in existing])
+            self.db_session.commit()
+
+        return [
+            ProductDb(
+                **item.model_dump(),
+                created_at=current[item.id].created_at,
+                updated_at=now,
+                # As of the lookup; a concurrent write in between makes it higher
+                version=current[item.id].version + 1,
+            )
+            if item.id in current else None
+            for item in updates
+        ]
+
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        deleted = []
+        for chunk in chunks(product_ids):
+            result = self.db_session.execute(
+                delete(ProductModel).where(ProductModel.id.in_(chunk)).returning(ProductModel.id),
+                execution_options={"synchronize_session": False},
+            )
+            deleted.extend(result.scalars().all())
+        self._record_changes(deleted)
+        self.db_session.commit()
+        return deleted
+
+    def _record_changes(self, product_ids: Iterable[int]) -> None:
+        # Same transaction as the change, so a committed write always has its event
+        rows = outbox_rows(product_ids) if self.record_changes else []
+        if rows:
+            self.db_session.execute(outbox_insert_statement(), rows)
+
+    def _get_current(self, product_ids: List[int]) -> Dict[int, Row]:
+        """(created_at, version) of the existing products, by id"""
+        current = {}
+        for chunk in chunks(product_ids):
+            rows = self.db_session.execute(
+                select(ProductModel.id, ProductModel.created_at, ProductModel.version)
+                .where(ProductModel.id.in_(chunk))
+            )
+            current.update({row.id: row for row in rows})
+        return current
+
     def _map_to_entity(self, model: ProductModel) -> ProductDb:
-        return ProductDb(
-            id=model.id,
-            name=model.name,
-            description=model.description,
-            category=model.category,
-            price=model.price,
-            quantity=model.quantity,
-            created_at=model.created_at,
-            updated_at=model.updated_at
-        ) 
\ No newline at end of file
+        return map_to_entity(model)
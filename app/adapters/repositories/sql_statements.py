@@ -0,0 +1,303 @@
+"""SQL statement builders shared by the sync and async SQL product repositories"""
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import (
+    Row,
+    Select,
+    and_,
+    bindparam,
+    case,
+    column,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+
+from app.adapters.models.sql.outbox_model import ProductOutboxModel
+from app.adapters.models.sql.product_model import ProductModel
+from app.adapters.models.sql.search_index import FTS_TABLE, SEARCH_VECTOR_COLUMN
+from app.adapters.repositories.pagination import decode_cursor, encode_cursor
+from app.domain.entities.product import (
+    Product,
+    ProductBulkUpdate,
+    ProductCategory,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    SortOrder,
+)
+
+# Keeps IN (...) lists below the bound-parameter limits of SQLite/Postgres
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+# Read paths select these columns and get plain Row tuples back, skipping ORM
+# instance hydration (identity map, instance state, attribute instrumentation)
+PRODUCT_COLUMNS = (
+    ProductModel.id,
+    ProductModel.name,
+    ProductModel.description,
+    ProductModel.category,
+    ProductModel.price,
+    ProductModel.quantity,
+    ProductModel.created_at,
+    ProductModel.updated_at,
+    ProductModel.version,
+)
+
+
+def product_select() -> Select:
+    return select(*PRODUCT_COLUMNS)
+
+
+def chunks(values: List[int]) -> Iterator[List[int]]:
+    for start in range(0, len(values), IN_CLAUSE_CHUNK_SIZE):
+        yield values[start:start + IN_CLAUSE_CHUNK_SIZE]
+
+
+def apply_filters(statement: Select, filters: ProductFilter) -> Select:
+    if filters.category is not None:
+        statement = statement.where(ProductModel.category == filters.category.value)
+    if filters.min_price is not None:
+        statement = statement.where(ProductModel.price >= filters.min_price)
+    if filters.max_price is not None:
+        statement = statement.where(ProductModel.price <= filters.max_price)
+    if filters.in_stock is True:
+        statement = statement.where(ProductModel.quantity > 0)
+    elif filters.in_stock is False:
+        statement = statement.where(ProductModel.quantity <= 0)
+    return statement
+
+
+def page_statement(
+    filters: ProductFilter,
+    sort_by: ProductSortField,
+    order: SortOrder,
+    limit: Optional[int],
+    cursor: Optional[str],
+) -> Select:
+    sort_column = getattr(ProductModel, sort_by.value)
+    descending = order == SortOrder.DESC
+    statement = apply_filters(product_select(), filters)
+
+    keyset = decode_cursor(cursor, sort_by, order)
+    if keyset:
+        last_value, last_id = keyset
+        if sort_by == ProductSortField.ID:
+            statement = statement.where(ProductModel.id < last_id if descending else ProductModel.id > last_id)
+        elif descending:
+            statement = statement.where(or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, ProductModel.id < last_id),
+            ))
+        else:
+            statement = statement.where(or_(
+                sort_column > last_value,
+                and_(sort_column == last_value, ProductModel.id > last_id),
+            ))
+
+    if sort_by == ProductSortField.ID:
+        ordering = [ProductModel.id.desc() if descending else ProductModel.id.asc()]
+    elif descending:
+        ordering = [sort_column.desc(), ProductModel.id.desc()]
+    else:
+        ordering = [sort_column.asc(), ProductModel.id.asc()]
+    statement = statement.order_by(*ordering)
+
+    # Fetch one extra row to know whether another page exists
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+    return statement
+
+
+def catalog_stamp_statement() -> Select:
+    return select(func.count(ProductModel.id), func.max(ProductModel.updated_at))
+
+
+def build_page(
+    products: Sequence[Row],
+    sort_by: ProductSortField,
+    order: SortOrder,
+    limit: Optional[int],
+) -> ProductPage:
+    next_cursor = None
+    if limit is not None and len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        next_cursor = encode_cursor(sort_by, order, getattr(last, sort_by.value), last.id)
+
+    return ProductPage(
+        items=[map_row(product) for product in products],
+        next_cursor=next_cursor,
+    )
+
+
+def search_statement(dialect: str, terms: List[str], limit: int) -> Select:
+    """
+    Ranked full-text query; every term must match and the last one also matches
+    as a prefix so partially typed words find results. Terms come from tokenize(),
+    so they only contain word characters
+    """
+    if dialect == "sqlite":
+        fts = table(FTS_TABLE, column("rowid"))
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        # bm25 is lower for better matches; name hits weigh 10x description hits
+        rank = func.bm25(literal_column(FTS_TABLE), 10.0, 1.0)
+        return (
+            product_select()
+            .join(fts, fts.c.rowid == ProductModel.id)
+            .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=match))
+            .order_by(rank, ProductModel.id)
+            .limit(limit)
+        )
+
+    vector = literal_column(f"{ProductModel.__tablename__}.{SEARCH_VECTOR_COLUMN}")
+    query = func.to_tsquery("simple", " & ".join(terms) + ":*")
+    return (
+        product_select()
+        .where(vector.op("@@")(query))
+        .order_by(func.ts_rank(vector, query).desc(), ProductModel.id)
+        .limit(limit)
+    )
+
+
+def adjust_quantity_statement(
+    product_id: int,
+    delta: int,
+    floor: Optional[int] = 0,
+    minimum: Optional[int] = None,
+):
+    """
+    Single UPDATE ... RETURNING adding delta to the stock. floor clamps the
+    result, minimum makes the row not match when the result would be lower
+    """
+    new_quantity = ProductModel.quantity + delta
+    condition = ProductModel.id == product_id
+    if minimum is not None:
+        condition = and_(condition, new_quantity >= minimum)
+    if floor is not None:
+        # Portable max(quantity + delta, floor); GREATEST is not available on SQLite
+        new_quantity = case((new_quantity < floor, floor), else_=new_quantity)
+
+    return (
+        update(ProductModel)
+        .where(condition)
+        .values(quantity=new_quantity, updated_at=datetime.utcnow(), version=ProductModel.version + 1)
+        .returning(ProductModel)
+    )
+
+
+def update_product_statement(product_id: int, changes: dict, expected_version: Optional[int] = None):
+    """
+    Single UPDATE ... RETURNING of the changed columns, returning PRODUCT_COLUMNS
+    rows. With expected_version it is a compare-and-swap: no row matches once
+    another write has bumped the version
+    """
+    condition = ProductModel.id == product_id
+    if expected_version is not None:
+        condition = and_(condition, ProductModel.version == expected_version)
+    return (
+        update(ProductModel)
+        .where(condition)
+        .values(**changes, updated_at=datetime.utcnow(), version=ProductModel.version + 1)
+        .returning(*PRODUCT_COLUMNS)
+    )
+
+
+def insert_products_statement():
+    # A single INSERT ... RETURNING batched by SQLAlchemy's insertmanyvalues
+    return insert(ProductModel).returning(ProductModel, sort_by_parameter_order=True)
+
+
+def outbox_insert_statement():
+    return insert(ProductOutboxModel)
+
+
+def outbox_rows(product_ids: Iterable[int]) -> List[dict]:
+    return [{"product_id": product_id} for product_id in product_ids]
+
+
+def product_rows(products: List[Product]) -> List[dict]:
+    return [
+        {
+            "name": product.name,
+            "description": product.description,
+            "category": product.category,
+            "price": product.price,
+            "quantity": product.quantity,
+        }
+        for product in products
+    ]
+
+
+def bulk_update_statement():
+    """
+    UPDATE by primary key for executemany; a Core statement rather than the ORM
+    bulk update so the version is incremented by the database
+    """
+    products = ProductModel.__table__
+    return (
+        update(products)
+        .where(products.c.id == bindparam("product_id"))
+        .values(
+            name=bindparam("name"),
+            description=bindparam("description"),
+            category=bindparam("category"),
+            price=bindparam("price"),
+            quantity=bindparam("quantity"),
+            updated_at=bindparam("updated_at"),
+            version=products.c.version + 1,
+        )
+    )
+
+
+def bulk_update_rows(updates: List[ProductBulkUpdate], now: datetime) -> List[dict]:
+    return [
+        {
+            "product_id": item.id,
+            "name": item.name,
+            "description": item.description,
+            "category": item.category,
+            "price": item.price,
+            "quantity": item.quantity,
+            "updated_at": now,
+        }
+        for item in updates
+    ]
+
+
+def map_to_entity(model: ProductModel) -> ProductDb:
+    return ProductDb(
+        id=model.id,
+        name=model.name,
+        description=model.description,
+        category=model.category,
+        price=model.price,
+        quantity=model.quantity,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+        version=model.version,
+    )
+
+
+def map_row(row: Row) -> ProductDb:
+    """Entity from a PRODUCT_COLUMNS row; the columns are already typed, so validation is skipped"""
+    product_id, name, description, category, price, quantity, created_at, updated_at, version = row
+    return ProductDb.model_construct(
+        id=product_id,
+        name=name,
+        description=description,
+        category=ProductCategory(category),
+        price=price,
+        quantity=quantity,
+        created_at=created_at,
+        updated_at=updated_at,
+        version=version,
+    )
@@ -0,0 +1,111 @@
+import re
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from app.domain.entities.product import ProductDb
+
+# Matches in the name rank above matches in the description
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# Whole-word matches rank above prefix-only matches
+EXACT_BONUS = 0.5
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class _Node:
+    __slots__ = ("children", "postings")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # product id -> weight of the token ending at this node
+        self.postings: Dict[int, float] = {}
+
+
+class TrieIndex:
+    """
+    In-memory prefix index over product names and descriptions, used as the
+    search fallback for SQL backends without a full-text index.
+
+    Every query term matches as a prefix and all terms must match; results are
+    ranked by the summed field weights. The whole index is rebuilt when the
+    catalog stamp it was built from changes.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._products: Dict[int, ProductDb] = {}
+        self._lock = threading.Lock()
+        self.stamp: Optional[Hashable] = None
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def rebuild(self, products: Iterable[ProductDb], stamp: Hashable) -> None:
+        root = _Node()
+        catalog = {}
+        for product in products:
+            catalog[product.id] = product
+            for token in tokenize(product.name):
+                self._insert(root, token, product.id, NAME_WEIGHT)
+            for token in tokenize(product.description):
+                self._insert(root, token, product.id, DESCRIPTION_WEIGHT)
+        # Readers keep using the previous index until the new one is complete
+        with self._lock:
+            self._root, self._products, self.stamp = root, catalog, stamp
+
+    def search(self, terms: List[str], limit: int) -> List[ProductDb]:
+        with self._lock:
+            root, catalog = self._root, self._products
+
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            matches = self._prefix_matches(root, term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    product_id: score + matches[product_id]
+                    for product_id, score in scores.items()
+                    if product_id in matches
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [catalog[product_id] for product_id, _ in ranked[:limit]]
+
+    @staticmethod
+    def _insert(root: _Node, token: str, product_id: int, weight: float) -> None:
+        node = root
+        for char in token:
+            node = node.children.setdefault(char, _Node())
+        node.postings[product_id] = max(node.postings.get(product_id, 0.0), weight)
+
+    @staticmethod
+    def _prefix_matches(root: _Node, prefix: str) -> Dict[int, float]:
+        node = root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+
+        scores: Dict[int, float] = {}
+        for product_id, weight in node.postings.items():
+            scores[product_id] = weight + EXACT_BONUS
+        stack = list(node.children.values())
+        while stack:
+            current = stack.pop()
+            for product_id, weight in current.postings.items():
+                if weight > scores.get(product_id, 0.0):
+                    scores[product_id] = weight
+            stack.extend(current.children.values())
+        return scores
+
+
+# Shared by every repository instance in the process
+product_search_index = TrieIndex()
@@ -0,0 +1,91 @@
+from typing import AsyncIterator, List, Optional, Union
+
+from app.application.use_cases.product_use_cases import (
+    bulk_delete_result,
+    bulk_update_result,
+    merge_adjustments,
+    split_duplicates,
+)
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkDeleteResult,
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    SortOrder,
+    StockReservation,
+)
+from app.domain.interfaces.async_product_repository import AsyncProductRepository
+
+
+class AsyncProductUseCases:
+    def __init__(self, repository: AsyncProductRepository):
+        self.repository = repository
+
+    async def get_all_products(self) -> List[ProductDb]:
+        return await self.repository.get_all()
+
+    async def list_products(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return await self.repository.get_page(filters, sort_by, order, limit, cursor)
+
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        return await self.repository.get_catalog_stamp()
+
+    def export_products(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        return self.repository.stream_all(batch_size)
+
+    async def search_products(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return await self.repository.search(query, limit)
+
+    async def get_product_by_id(self, product_id: int) -> Optional[ProductDb]:
+        return await self.repository.get_by_id(product_id)
+
+    async def create_product(self, product: Product) -> ProductDb:
+        return await self.repository.create(product)
+
+    async def update_product(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        return await self.repository.update(product_id, product, expected_version)
+
+    async def delete_product(self, product_id: int) -> bool:
+        return await self.repository.delete(product_id)
+
+    async def create_products(self, products: List[Product]) -> ProductBulkResult:
+        return ProductBulkResult(items=await self.repository.create_many(products))
+
+    async def update_products(self, updates: List[ProductBulkUpdate]) -> ProductBulkResult:
+        batch, errors = split_duplicates(updates, [update.id for update in updates])
+        results = await self.repository.update_many([update for _, update in batch])
+        return bulk_update_result(batch, results, errors)
+
+    async def delete_products(self, product_ids: List[int]) -> ProductBulkDeleteResult:
+        batch, errors = split_duplicates(product_ids, product_ids)
+        deleted = await self.repository.delete_many([product_id for _, product_id in batch])
+        return bulk_delete_result(batch, deleted, errors)
+
+    async def update_product_quantity(self, product_id: int, quantity_change: int) -> Optional[ProductDb]:
+        """Update product quantity by adding quantity_change (negative for decreasing)"""
+        # Single atomic statement; the stock never goes below 0
+        return await self.repository.adjust_quantity(product_id, quantity_change, floor=0)
+
+    async def reserve_stock(self, reservation: StockReservation) -> List[ProductDb]:
+        """Apply all quantity changes of an order at once (all-or-nothing)"""
+        return await self.repository.adjust_quantities(
+            merge_adjustments(reservation), reservation.reject_if_insufficient
+        )
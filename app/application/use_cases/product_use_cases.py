@@ -1,9 +1,84 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple, Union
 
-from app.domain.entities.product import Product, ProductDb
+from app.domain.entities.product import (
+    BulkItemError,
+    CatalogStamp,
+    Product,
+    ProductBulkDeleteResult,
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+    StockReservation,
+)
 from app.domain.interfaces.product_repository import ProductRepository
 
 
+def split_duplicates(items: list, product_ids: List[int]) -> Tuple[List[tuple], List[BulkItemError]]:
+    """Pair items with their index, reporting repeated product IDs as errors"""
+    seen = set()
+    batch = []
+    errors = []
+    for index, (item, product_id) in enumerate(zip(items, product_ids)):
+        if product_id in seen:
+            errors.append(BulkItemError(
+                index=index, id=product_id, detail=f"Duplicate product ID {product_id} in batch"
+            ))
+        else:
+            batch.append((index, item))
+        seen.add(product_id)
+    return batch, errors
+
+
+def bulk_update_result(
+    batch: List[Tuple[int, ProductBulkUpdate]],
+    results: List[Optional[ProductDb]],
+    errors: List[BulkItemError],
+) -> ProductBulkResult:
+    items = []
+    for (index, update), result in zip(batch, results):
+        if result is None:
+            errors.append(BulkItemError(
+                index=index, id=update.id, detail=f"Product with ID {update.id} not found"
+            ))
+        else:
+            items.append(result)
+    return ProductBulkResult(items=items, errors=sorted(errors, key=lambda error: error.index))
+
+
+def bulk_delete_result(
+    batch: List[Tuple[int, int]], deleted: List[int], errors: List[BulkItemError]
+) -> ProductBulkDeleteResult:
+    deleted = set(deleted)
+    deleted_ids = []
+    for index, product_id in batch:
+        if product_id in deleted:
+            deleted_ids.append(product_id)
+        else:
+            errors.append(BulkItemError(
+                index=index, id=product_id, detail=f"Product with ID {product_id} not found"
+            ))
+    return ProductBulkDeleteResult(
+        deleted_ids=deleted_ids, errors=sorted(errors, key=lambda error: error.index)
+    )
+
+
+def merge_adjustments(reservation: StockReservation) -> List[QuantityAdjustment]:
+    # Merge repeated products so each row is touched once
+    deltas = {}
+    for item in reservation.items:
+        deltas[item.product_id] = deltas.get(item.product_id, 0) + item.delta
+    return [
+        QuantityAdjustment(product_id=product_id, delta=delta)
+        for product_id, delta in deltas.items()
+    ]
+
+
 class ProductUseCases:
     def __init__(self, repository: ProductRepository):
         self.repository = repository
@@ -11,36 +86,68 @@ class ProductUseCases:
     def get_all_products(self) -> List[ProductDb]:
         return self.repository.get_all()
 
+    def list_products(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        return self.repository.get_page(filters, sort_by, order, limit, cursor)
+
+    def get_catalog_stamp(self) -> CatalogStamp:
+        return self.repository.get_catalog_stamp()
+
+    def export_products(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        return self.repository.stream_all(batch_size)
+
+    def search_products(self, query: str, limit: int = 20) -> List[ProductDb]:
+        return self.repository.search(query, limit)
+
     def get_product_by_id(self, product_id: int) -> Optional[ProductDb]:
         return self.repository.get_by_id(product_id)
 
     def create_product(self, product: Product) -> ProductDb:
         return self.repository.create(product)
 
-    def update_product(self, product_id: int, product: Product) -> Optional[ProductDb]:
-        # Check if product exists
-        existing = self.repository.get_by_id(product_id)
-        if not existing:
-            return None
-        
-        return self.repository.update(product_id, product)
+    def update_product(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        """
+        Full (Product) or partial (ProductUpdate) update; None when the product
+        does not exist. With expected_version, raises VersionConflictError when
+        the product was changed since that version
+        """
+        # The repository reports a missing product itself, no existence check round trip
+        return self.repository.update(product_id, product, expected_version)
 
     def delete_product(self, product_id: int) -> bool:
         return self.repository.delete(product_id)
         
+    def create_products(self, products: List[Product]) -> ProductBulkResult:
+        return ProductBulkResult(items=self.repository.create_many(products))
+
+    def update_products(self, updates: List[ProductBulkUpdate]) -> ProductBulkResult:
+        batch, errors = split_duplicates(updates, [update.id for update in updates])
+        results = self.repository.update_many([update for _, update in batch])
+        return bulk_update_result(batch, results, errors)
+
+    def delete_products(self, product_ids: List[int]) -> ProductBulkDeleteResult:
+        batch, errors = split_duplicates(product_ids, product_ids)
+        deleted = self.repository.delete_many([product_id for _, product_id in batch])
+        return bulk_delete_result(batch, deleted, errors)
+
     def update_product_quantity(self, product_id: int, quantity_change: int) -> Optional[ProductDb]:
         """Update product quantity by adding quantity_change (negative for decreasing)"""
-        product = self.repository.get_by_id(product_id)
-        if not product:
-            return None
-        
-        # Create a copy of the product with updated quantity
-        updated_product = Product(
-            name=product.name,
-            description=product.description,
-            category=product.category,
-            price=product.price,
-            quantity=max(0, product.quantity + quantity_change)  # Ensure quantity doesn't go below 0
+        # Single atomic statement; the stock never goes below 0
+        return self.repository.adjust_quantity(product_id, quantity_change, floor=0)
+
+    def reserve_stock(self, reservation: StockReservation) -> List[ProductDb]:
+        """Apply all quantity changes of an order at once (all-or-nothing)"""
+        return self.repository.adjust_quantities(
+            merge_adjustments(reservation), reservation.reject_if_insufficient
         )
-        
-        return self.repository.update(product_id, updated_product) 
\ No newline at end of file
@@ -5,14 +5,100 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # SQL Database settings
     SQL_DATABASE_URL: str = os.getenv("SQL_DATABASE_URL", "sqlite:///./products_service.db")
+    # Derived from SQL_DATABASE_URL (aiosqlite/asyncpg) when empty
+    SQL_ASYNC_DATABASE_URL: str = os.getenv("SQL_ASYNC_DATABASE_URL", "")
+    # Disable when migrations own the schema
+    SQL_CREATE_SCHEMA: bool = os.getenv("SQL_CREATE_SCHEMA", "true").lower() == "true"
+    # Connections opened at startup so the first requests do not pay for connecting
+    SQL_POOL_WARMUP: int = int(os.getenv("SQL_POOL_WARMUP", "1"))
+    SQL_POOL_SIZE: int = int(os.getenv("SQL_POOL_SIZE", "5"))
+    SQL_MAX_OVERFLOW: int = int(os.getenv("SQL_MAX_OVERFLOW", "10"))
+    SQL_POOL_TIMEOUT: float = float(os.getenv("SQL_POOL_TIMEOUT", "30"))
+    # Seconds before a pooled connection is replaced; -1 keeps connections forever
+    SQL_POOL_RECYCLE: int = int(os.getenv("SQL_POOL_RECYCLE", "-1"))
+    SQL_POOL_PRE_PING: bool = os.getenv("SQL_POOL_PRE_PING", "false").lower() == "true"
+    SQL_STATEMENT_CACHE_SIZE: int = int(os.getenv("SQL_STATEMENT_CACHE_SIZE", "500"))
+    # Comma-separated read replica URLs; reads go to them while they keep up with the primary
+    SQL_REPLICA_URLS: str = os.getenv("SQL_REPLICA_URLS", "")
+    
+    # SQLite pragmas applied to every new connection; empty keeps SQLite's default
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: str = os.getenv("SQLITE_MMAP_SIZE", "")
+    SQLITE_CACHE_SIZE: str = os.getenv("SQLITE_CACHE_SIZE", "")
+    SQLITE_BUSY_TIMEOUT_MS: str = os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
     
     # NoSQL Database settings (MongoDB)
     NOSQL_HOST: str = os.getenv("NOSQL_HOST", "localhost")
     NOSQL_PORT: int = int(os.getenv("NOSQL_PORT", "27017"))
     NOSQL_DB: str = os.getenv("NOSQL_DB", "products_service")
+    # Ids reserved per counter round trip; above 1 each process hands out its own block
+    NOSQL_ID_BLOCK_SIZE: int = int(os.getenv("NOSQL_ID_BLOCK_SIZE", "1"))
+    # Create the products indexes at startup (they are also created on first search)
+    NOSQL_ENSURE_INDEXES: bool = os.getenv("NOSQL_ENSURE_INDEXES", "false").lower() == "true"
+    NOSQL_MAX_POOL_SIZE: int = int(os.getenv("NOSQL_MAX_POOL_SIZE", "100"))
+    NOSQL_MIN_POOL_SIZE: int = int(os.getenv("NOSQL_MIN_POOL_SIZE", "0"))
+    # Timeouts in milliseconds; 0 keeps the driver default
+    NOSQL_CONNECT_TIMEOUT_MS: int = int(os.getenv("NOSQL_CONNECT_TIMEOUT_MS", "0"))
+    NOSQL_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("NOSQL_SERVER_SELECTION_TIMEOUT_MS", "0"))
+    NOSQL_SOCKET_TIMEOUT_MS: int = int(os.getenv("NOSQL_SOCKET_TIMEOUT_MS", "0"))
+    NOSQL_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("NOSQL_WAIT_QUEUE_TIMEOUT_MS", "0"))
+    
+    # Product cache settings
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "false").lower() == "true"
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    # Menu snapshots are patched on local writes and fully reloaded after this age
+    MENU_MAX_AGE_SECONDS: float = float(os.getenv("MENU_MAX_AGE_SECONDS", "30"))
+    
+    # Repository settings
+    # "sql" or "nosql": where the products are written (and read when no reader is configured)
+    PRODUCT_BACKEND: str = os.getenv("PRODUCT_BACKEND", "sql")
+    # Serve reads from the Mongo products collection as a read model of the SQL primary
+    READ_FROM_NOSQL: bool = os.getenv("READ_FROM_NOSQL", "false").lower() == "true"
+    # A reader whose newest change trails the primary's by more than this is skipped
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "1"))
+    # SQL writes record change events in the product_outbox table
+    OUTBOX_ENABLED: bool = os.getenv("OUTBOX_ENABLED", "false").lower() == "true"
+    # Run the outbox -> Mongo projector inside this process (enable it on a single instance)
+    OUTBOX_PROJECTOR_ENABLED: bool = os.getenv("OUTBOX_PROJECTOR_ENABLED", "false").lower() == "true"
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+    OUTBOX_POLL_INTERVAL_SECONDS: float = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1"))
+    
+    # Metrics settings
+    # Request, repository and SQL statement metrics exposed at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # Diagnostics settings
+    # Profile the requests sent with PROFILING_HEADER, plus a PROFILING_SAMPLE_RATE share of
+    # all requests, into collapsed stack files (flamegraph.pl, speedscope) under PROFILING_DIR
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_HEADER: str = os.getenv("PROFILING_HEADER", "X-Profile")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+    # Log SQL statements and Mongo commands slower than this, with the route they served (0 = off)
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "0"))
+    SLOW_QUERY_LOG_PARAMETERS: bool = os.getenv("SLOW_QUERY_LOG_PARAMETERS", "true").lower() == "true"
+    
+    # Idempotency settings
+    # Store of Idempotency-Key responses for write requests: "memory" (per process),
+    # "sql" or "nosql" (shared by every instance), or "" to ignore the header
+    IDEMPOTENCY_STORE: str = os.getenv("IDEMPOTENCY_STORE", "memory")
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # A claim whose request has not completed within this lease (e.g. its worker
+    # crashed) can be taken over by a retry; keep it above the slowest request
+    IDEMPOTENCY_LEASE_SECONDS: float = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
     
     # API settings
     API_PREFIX: str = "/api/v1"
+    # "sync" serves routes from the threadpool, "async" uses the async drivers
+    API_MODE: str = os.getenv("API_MODE", "sync")
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "500"))
+    MAX_BULK_SIZE: int = int(os.getenv("MAX_BULK_SIZE", "50000"))
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
 
 
 settings = Settings() 
\ No newline at end of file
@@ -1,8 +1,10 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from app.domain.exceptions import VersionConflictError
 
 
 class ProductCategory(str, Enum):
@@ -12,6 +14,17 @@ class ProductCategory(str, Enum):
     DESSERT = "Dessert"
 
 
+class ProductSortField(str, Enum):
+    ID = "id"
+    NAME = "name"
+    PRICE = "price"
+
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
 class Product(BaseModel):
     name: str
     description: str
@@ -20,10 +33,89 @@ class Product(BaseModel):
     quantity: int
 
 
+class ProductUpdate(BaseModel):
+    """Partial update: only the fields that are set are changed"""
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[ProductCategory] = None
+    price: Optional[float] = None
+    quantity: Optional[int] = None
+
+    @field_validator("*")
+    @classmethod
+    def not_null(cls, value):
+        # Omitted fields are left unchanged; an explicit null is not a value
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+def product_changes(product: Union[Product, ProductUpdate]) -> dict:
+    """The Product fields to write: all of them for a Product, the set ones for a ProductUpdate"""
+    return product.model_dump(include=set(Product.model_fields), exclude_unset=True)
+
+
 class ProductDb(Product):
     id: int
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    # Incremented by every write; compare-and-swap updates expect a given version
+    version: int = 1
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class ProductFilter(BaseModel):
+    category: Optional[ProductCategory] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    in_stock: Optional[bool] = None
+
+
+class ProductPage(BaseModel):
+    items: List[ProductDb]
+    next_cursor: Optional[str] = None
+
+
+class ProductBulkUpdate(Product):
+    id: int
+
+
+class BulkItemError(BaseModel):
+    index: int
+    id: Optional[int] = None
+    detail: str
+
+
+class ProductBulkResult(BaseModel):
+    items: List[ProductDb] = []
+    errors: List[BulkItemError] = []
+
+
+class ProductBulkDeleteResult(BaseModel):
+    deleted_ids: List[int] = []
+    errors: List[BulkItemError] = []
+
+
+class QuantityAdjustment(BaseModel):
+    product_id: int
+    delta: int
+
+
+class StockReservation(BaseModel):
+    items: List[QuantityAdjustment]
+    # Fail the whole reservation instead of clamping stock at 0
+    reject_if_insufficient: bool = False
+
+
+class CatalogStamp(BaseModel):
+    count: int
+    last_modified: Optional[datetime] = None
+
+
+def check_version(current: Optional[ProductDb], expected_version: Optional[int]) -> Optional[ProductDb]:
+    """current, unless expected_version is given and current has moved past it"""
+    if current is not None and expected_version is not None and current.version != expected_version:
+        raise VersionConflictError(current.id, expected_version)
+    return current
@@ -0,0 +1,19 @@
+class ProductNotFoundError(Exception):
+    def __init__(self, product_id: int):
+        self.product_id = product_id
+        super().__init__(f"Product with ID {product_id} not found")
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, product_id: int):
+        self.product_id = product_id
+        super().__init__(f"Insufficient stock for product with ID {product_id}")
+
+
+class VersionConflictError(Exception):
+    def __init__(self, product_id: int, expected_version: int):
+        self.product_id = product_id
+        self.expected_version = expected_version
+        super().__init__(
+            f"Product with ID {product_id} was modified since version {expected_version}"
+        )
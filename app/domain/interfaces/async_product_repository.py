@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional, Union
+
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+)
+
+
+class AsyncProductRepository(ABC):
+    """Async counterpart of ProductRepository, used when API_MODE is async"""
+
+    @abstractmethod
+    async def get_all(self) -> List[ProductDb]:
+        pass
+
+    @abstractmethod
+    async def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        pass
+
+    @abstractmethod
+    def stream_all(self, batch_size: int = 1000) -> AsyncIterator[ProductDb]:
+        pass
+
+    @abstractmethod
+    async def get_catalog_stamp(self) -> CatalogStamp:
+        """Product count and latest updated_at, computed without loading rows"""
+        pass
+
+    @abstractmethod
+    async def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        """Products whose name or description match every word of query, best match first"""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, product_id: int) -> Optional[ProductDb]:
+        pass
+
+    @abstractmethod
+    async def create(self, product: Product) -> ProductDb:
+        pass
+
+    @abstractmethod
+    async def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        pass
+
+    @abstractmethod
+    async def delete(self, product_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    async def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        """Atomically add delta to the stock, clamping the result at floor (None disables it)"""
+        pass
+
+    @abstractmethod
+    async def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        """
+        Apply every adjustment or none of them. Raises ProductNotFoundError, or
+        InsufficientStockError when reject_if_insufficient is set
+        """
+        pass
+
+    @abstractmethod
+    async def create_many(self, products: List[Product]) -> List[ProductDb]:
+        pass
+
+    @abstractmethod
+    async def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        """Return one entry per update, None where the product does not exist"""
+        pass
+
+    @abstractmethod
+    async def delete_many(self, product_ids: List[int]) -> List[int]:
+        """Return the ids that were actually deleted"""
+        pass
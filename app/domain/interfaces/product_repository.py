@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
 
-from app.domain.entities.product import Product, ProductDb
+from app.domain.entities.product import (
+    CatalogStamp,
+    Product,
+    ProductBulkUpdate,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    ProductUpdate,
+    QuantityAdjustment,
+    SortOrder,
+)
 
 
 class ProductRepository(ABC):
@@ -9,6 +20,31 @@ class ProductRepository(ABC):
     def get_all(self) -> List[ProductDb]:
         pass
 
+    @abstractmethod
+    def get_page(
+        self,
+        filters: ProductFilter,
+        sort_by: ProductSortField = ProductSortField.ID,
+        order: SortOrder = SortOrder.ASC,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ProductPage:
+        pass
+
+    @abstractmethod
+    def stream_all(self, batch_size: int = 1000) -> Iterator[ProductDb]:
+        pass
+
+    @abstractmethod
+    def get_catalog_stamp(self) -> CatalogStamp:
+        """Product count and latest updated_at, computed without loading rows"""
+        pass
+
+    @abstractmethod
+    def search(self, query: str, limit: int = 20) -> List[ProductDb]:
+        """Products whose name or description match every word of query, best match first"""
+        pass
+
     @abstractmethod
     def get_by_id(self, product_id: int) -> Optional[ProductDb]:
         pass
@@ -18,9 +54,51 @@ class ProductRepository(ABC):
         pass
 
     @abstractmethod
-    def update(self, product_id: int, product: Product) -> Optional[ProductDb]:
+    def update(
+        self,
+        product_id: int,
+        product: Union[Product, ProductUpdate],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ProductDb]:
+        """
+        Replace the product, or only the fields set on a ProductUpdate, in a
+        single round trip. None when the product does not exist. With
+        expected_version the write only applies to that version of the product,
+        otherwise VersionConflictError is raised
+        """
         pass
 
     @abstractmethod
     def delete(self, product_id: int) -> bool:
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def adjust_quantity(
+        self, product_id: int, delta: int, floor: Optional[int] = 0
+    ) -> Optional[ProductDb]:
+        """Atomically add delta to the stock, clamping the result at floor (None disables it)"""
+        pass
+
+    @abstractmethod
+    def adjust_quantities(
+        self, adjustments: List[QuantityAdjustment], reject_if_insufficient: bool = False
+    ) -> List[ProductDb]:
+        """
+        Apply every adjustment or none of them. Raises ProductNotFoundError, or
+        InsufficientStockError when reject_if_insufficient is set
+        """
+        pass
+
+    @abstractmethod
+    def create_many(self, products: List[Product]) -> List[ProductDb]:
+        pass
+
+    @abstractmethod
+    def update_many(self, updates: List[ProductBulkUpdate]) -> List[Optional[ProductDb]]:
+        """Return one entry per update, None where the product does not exist"""
+        pass
+
+    @abstractmethod
+    def delete_many(self, product_ids: List[int]) -> List[int]:
+        """Return the ids that were actually deleted"""
+        pass
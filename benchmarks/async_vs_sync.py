@@ -0,0 +1,141 @@
+"""
+Compare throughput of the sync (threadpool) and async product routes.
+
+Both apps are driven in-process through httpx's ASGI transport with the same
+number of concurrent clients, against the same database.
+
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters.api.async_product_router import router as async_product_router
+from app.adapters.api.product_router import router as product_router
+from app.adapters.models.sql.async_session import get_async_db, to_async_url
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.session import get_db
+from app.adapters.repositories.sql_product_repository import SQLProductRepository
+from app.domain.entities.product import Product, ProductCategory
+
+
+def build_sync_app(database_url: str, pool_size: int) -> FastAPI:
+    engine = create_engine(
+        database_url, pool_size=pool_size, connect_args={"check_same_thread": False}
+    )
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(product_router, prefix="/products")
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+def build_async_app(database_url: str, pool_size: int) -> FastAPI:
+    # aiosqlite opens one connection per session (NullPool), so only size real pools
+    options = {} if database_url.startswith("sqlite") else {"pool_size": pool_size}
+    engine = create_async_engine(to_async_url(database_url), **options)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False)
+
+    async def override_get_async_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(async_product_router, prefix="/products")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app
+
+
+def seed(database_url: str, size: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        categories = list(ProductCategory)
+        SQLProductRepository(session).create_many([
+            Product(
+                name=f"Product {index}",
+                description="Benchmark product",
+                category=categories[index % len(categories)],
+                price=1 + index % 50,
+                quantity=index % 20,
+            )
+            for index in range(size)
+        ])
+    engine.dispose()
+
+
+async def run(app: FastAPI, paths: list, concurrency: int) -> dict:
+    latencies = []
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                path = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": round(len(paths) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+        database_url = f"sqlite:///{path}"
+        seed(database_url, args.products)
+
+    # Alternate hot single-product reads with paged listings
+    paths = [
+        f"/products/{1 + index % args.products}" if index % 2 else "/products/?limit=50"
+        for index in range(args.requests)
+    ]
+    # Pools are sized to the concurrency so neither mode waits on connections; with
+    # the default pool the sync mode can deadlock once the threadpool is saturated
+    apps = {
+        "sync": build_sync_app(database_url, args.concurrency),
+        "async": build_async_app(database_url, args.concurrency),
+    }
+    for mode, app in apps.items():
+        print(mode, asyncio.run(run(app, paths, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare two benchmark reports and flag latency regressions.
+
+Every p50/p95/p99 of the candidate is compared with the baseline; the exit
+status is 1 when one grew by more than --threshold percent, so the script can
+gate CI between commits.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import Iterator, Tuple
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def latencies(results: dict, path: Tuple[str, ...] = ()) -> Iterator[Tuple[str, str, float]]:
+    """(operation path, metric, value) for every latency summary in the results"""
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        if any(metric in value for metric in METRICS):
+            for metric in METRICS:
+                if metric in value:
+                    yield "/".join(path + (key,)), metric, value[metric]
+        else:
+            yield from latencies(value, path + (key,))
+
+
+def compare(baseline: dict, candidate: dict, threshold: float, metrics=METRICS) -> list:
+    """Rows of (operation, metric, baseline, candidate, change %, regressed)"""
+    before = {(name, metric): value for name, metric, value in latencies(baseline["results"])}
+    rows = []
+    for name, metric, value in latencies(candidate["results"]):
+        previous = before.get((name, metric))
+        if metric not in metrics or not previous:
+            continue
+        change = (value - previous) / previous * 100
+        rows.append((name, metric, previous, value, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed growth in percent")
+    # p99 of short runs is noisy; gate on p50/p95 unless the runs are long
+    parser.add_argument("--metrics", nargs="+", choices=METRICS, default=list(METRICS))
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline, open(args.candidate) as candidate:
+        baseline_report, candidate_report = json.load(baseline), json.load(candidate)
+
+    print(f"baseline {baseline_report.get('commit')} -> candidate {candidate_report.get('commit')}")
+    rows = compare(baseline_report, candidate_report, args.threshold, args.metrics)
+    for name, metric, previous, value, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:45} {metric:7} {previous:10.3f} -> {value:10.3f} ({change:+6.1f}%){flag}")
+    sys.exit(1 if any(row[-1] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
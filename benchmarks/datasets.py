@@ -0,0 +1,40 @@
+"""Deterministic product datasets of configurable size for the benchmarks"""
+import random
+from typing import List
+
+from app.domain.entities.product import Product, ProductCategory
+
+# Category mix of a typical fast-food menu: mostly main items and drinks
+CATEGORY_WEIGHTS = {
+    ProductCategory.MAIN_ITEM: 4,
+    ProductCategory.SIDE: 2,
+    ProductCategory.DRINK: 3,
+    ProductCategory.DESSERT: 1,
+}
+ADJECTIVES = ["Classic", "Double", "Spicy", "Crispy", "Smoky", "Veggie", "Cheesy", "Mini", "Large", "Grilled"]
+NOUNS = {
+    ProductCategory.MAIN_ITEM: ["Burger", "Chicken Sandwich", "Wrap", "Hot Dog", "Salad"],
+    ProductCategory.SIDE: ["Fries", "Onion Rings", "Nuggets", "Coleslaw"],
+    ProductCategory.DRINK: ["Soda", "Lemonade", "Iced Tea", "Milkshake", "Coffee"],
+    ProductCategory.DESSERT: ["Sundae", "Brownie", "Apple Pie", "Cookie"],
+}
+WORDS = ["fresh", "bread", "cheddar", "bacon", "lettuce", "tomato", "sauce", "ice", "sugar", "vanilla"]
+
+
+def generate_products(size: int, seed: int = 0) -> List[Product]:
+    """`size` products; the same seed always yields the same dataset"""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_WEIGHTS)
+    weights = list(CATEGORY_WEIGHTS.values())
+    products = []
+    for index in range(size):
+        category = rng.choices(categories, weights)[0]
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS[category])} {index}"
+        products.append(Product(
+            name=name,
+            description=" ".join(rng.choices(WORDS, k=rng.randint(3, 12))),
+            category=category,
+            price=round(rng.uniform(1, 40), 2),
+            quantity=rng.randint(0, 200),
+        ))
+    return products
@@ -0,0 +1,164 @@
+"""
+Drive HTTP load scenarios against the products API and report p50/p95/p99.
+
+Scenarios: catalog_read (paged category listings), menu_read, hot_product_read
+(every client reads the same product), quantity_contention (every client
+decrements the same product's stock, then lost updates are counted) and
+bulk_import (POST /bulk batches).
+
+By default the app runs in-process on a temporary SQLite file; --base-url
+targets a running server instead.
+
+    python -m benchmarks.load --products 5000 --requests 2000 --concurrency 50 --output load.json
+    python -m benchmarks.load --base-url http://localhost:8009 --scenarios hot_product_read
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.datasets import generate_products
+from benchmarks.stats import latency_summary, report, write_report
+
+PREFIX = "/api/v1/products"
+SCENARIOS = ["catalog_read", "menu_read", "hot_product_read", "quantity_contention", "bulk_import"]
+SEED_BATCH_SIZE = 1000
+
+# (method, path, json body)
+Request = Tuple[str, str, Optional[object]]
+
+
+async def drive(client: AsyncClient, requests: List[Request], concurrency: int) -> dict:
+    """Send the requests from `concurrency` clients; latency of every response"""
+    samples = []
+    statuses = Counter()
+    pending = iter(requests)
+
+    async def worker():
+        for method, path, body in pending:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            samples.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = latency_summary(samples, time.perf_counter() - started)
+    summary["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return summary
+
+
+def payload(product) -> dict:
+    return product.model_dump(mode="json")
+
+
+async def seed(client: AsyncClient, size: int, seed_value: int) -> List[int]:
+    ids = []
+    products = generate_products(size, seed_value)
+    for start in range(0, size, SEED_BATCH_SIZE):
+        batch = [payload(product) for product in products[start:start + SEED_BATCH_SIZE]]
+        response = await client.post(f"{PREFIX}/bulk", json=batch)
+        response.raise_for_status()
+        ids.extend(item["id"] for item in response.json()["items"])
+    return ids
+
+
+def scenario_requests(name: str, args, ids: List[int], hot_id: int, rng: random.Random) -> List[Request]:
+    if name == "catalog_read":
+        categories = ["Main Item", "Side", "Drink", "Dessert"]
+        return [
+            ("GET", f"{PREFIX}/?limit=50&sort_by=price&category={rng.choice(categories)}", None)
+            for _ in range(args.requests)
+        ]
+    if name == "menu_read":
+        return [("GET", f"{PREFIX}/menu", None)] * args.requests
+    if name == "hot_product_read":
+        return [("GET", f"{PREFIX}/{hot_id}", None)] * args.requests
+    if name == "quantity_contention":
+        return [("PATCH", f"{PREFIX}/{hot_id}/quantity/-1", None)] * args.requests
+    if name == "bulk_import":
+        products = generate_products(args.bulk_batches * args.bulk_size, args.seed + 1)
+        return [
+            ("POST", f"{PREFIX}/bulk", [payload(product) for product in products[start:start + args.bulk_size]])
+            for start in range(0, len(products), args.bulk_size)
+        ]
+    raise ValueError(f"Unknown scenario '{name}'")
+
+
+async def run_scenarios(client: AsyncClient, args) -> dict:
+    rng = random.Random(args.seed)
+    ids = await seed(client, args.products, args.seed)
+    hot_id = ids[0]
+    hot = (await client.get(f"{PREFIX}/{hot_id}")).json()
+    # Enough stock that no decrement is clamped at zero
+    stock = args.requests + 1
+    (await client.put(f"{PREFIX}/{hot_id}", json={**hot, "quantity": stock})).raise_for_status()
+
+    results = {}
+    for name in args.scenarios:
+        requests = scenario_requests(name, args, ids, hot_id, rng)
+        results[name] = await drive(client, requests, args.concurrency)
+
+    if "quantity_contention" in results:
+        decrements = results["quantity_contention"]["statuses"].get("200", 0)
+        quantity = (await client.get(f"{PREFIX}/{hot_id}")).json()["quantity"]
+        results["quantity_contention"]["lost_updates"] = quantity - (stock - decrements)
+    if "bulk_import" in results:
+        summary = results["bulk_import"]
+        if "ops_per_second" in summary:
+            summary["products_per_second"] = round(summary["ops_per_second"] * args.bulk_size, 1)
+    return results
+
+
+@asynccontextmanager
+async def client_for(args):
+    if args.base_url:
+        async with AsyncClient(base_url=args.base_url, timeout=60) as client:
+            yield client
+        return
+
+    # Set before importing the app so its settings pick them up
+    os.environ["SQL_DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}"
+    os.environ["API_MODE"] = args.api_mode
+    from main import app, lifespan
+
+    async with lifespan(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+async def measure(args) -> dict:
+    async with client_for(args) as client:
+        return await run_scenarios(client, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", help="running server to target (default: in-process app)")
+    parser.add_argument("--api-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--bulk-size", type=int, default=500)
+    parser.add_argument("--bulk-batches", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    parameters = {
+        key: value for key, value in vars(args).items() if key not in ("output", "base_url")
+    }
+    parameters["target"] = args.base_url or "in-process"
+    write_report(report("load", parameters, asyncio.run(measure(args))), args.output)
+
+
+if __name__ == "__main__":
+    main()
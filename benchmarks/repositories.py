@@ -0,0 +1,158 @@
+"""
+Microbenchmark the product repositories operation by operation.
+
+SQLProductRepository runs on a temporary SQLite file unless --database-url is
+given. NoSQLProductRepository runs against --mongo-url, or against mongomock
+when it is installed; mongomock is in-memory and lacks $text, so it only
+compares code paths, not the server.
+
+    python -m benchmarks.repositories --products 10000 --iterations 300 --output repositories.json
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.engine import engine_options, install_engine_hooks
+from app.adapters.repositories.nosql_product_repository import NoSQLProductRepository
+from app.adapters.repositories.sql_product_repository import SQLProductRepository
+from app.domain.entities.product import (
+    Product,
+    ProductCategory,
+    ProductFilter,
+    ProductSortField,
+    SortOrder,
+)
+from app.domain.interfaces.product_repository import ProductRepository
+from benchmarks.datasets import generate_products
+from benchmarks.stats import latency_summary, report, write_report
+
+BULK_SIZE = 100
+
+
+def operations(
+    repository: ProductRepository, products: List[Product], product_ids: List[int], rng: random.Random
+) -> Dict[str, Callable[[], object]]:
+    categories = list(ProductCategory)
+    return {
+        "get_by_id": lambda: repository.get_by_id(rng.choice(product_ids)),
+        "get_page_by_category": lambda: repository.get_page(
+            ProductFilter(category=rng.choice(categories)), ProductSortField.PRICE, SortOrder.ASC, 50
+        ),
+        "get_catalog_stamp": repository.get_catalog_stamp,
+        "search": lambda: repository.search("spicy burger", 20),
+        "adjust_quantity": lambda: repository.adjust_quantity(rng.choice(product_ids), -1),
+        "create": lambda: repository.create(rng.choice(products)),
+    }
+
+
+def bulk_operations(
+    repository: ProductRepository, products: List[Product], rng: random.Random
+) -> Dict[str, Callable[[], object]]:
+    return {
+        "get_all": repository.get_all,
+        f"create_many_{BULK_SIZE}": lambda: repository.create_many(rng.sample(products, BULK_SIZE)),
+    }
+
+
+def measure(operation: Callable[[], object], iterations: int) -> dict:
+    try:
+        operation()  # warm-up: statement caches, query plans, connections
+        samples = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call_started = time.perf_counter()
+            operation()
+            samples.append(time.perf_counter() - call_started)
+        return latency_summary(samples, time.perf_counter() - started)
+    except Exception as exc:  # e.g. $text on mongomock; report it and keep going
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+
+def benchmark(repository: ProductRepository, args) -> dict:
+    rng = random.Random(args.seed)
+    products = generate_products(args.products, args.seed)
+    product_ids = [product.id for product in repository.create_many(products)]
+
+    results = {
+        name: measure(operation, args.iterations)
+        for name, operation in operations(repository, products, product_ids, rng).items()
+    }
+    # Whole-catalog operations are orders of magnitude slower; fewer rounds suffice
+    bulk_iterations = max(3, args.iterations // 50)
+    results.update(
+        (name, measure(operation, bulk_iterations))
+        for name, operation in bulk_operations(repository, products, rng).items()
+    )
+    return results
+
+
+def sql_results(args) -> dict:
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'repositories.db')}"
+    engine = create_engine(url, **engine_options(url))
+    install_engine_hooks(engine, url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        with sessionmaker(autocommit=False, autoflush=False, bind=engine)() as session:
+            return benchmark(SQLProductRepository(session, record_changes=False), args)
+    finally:
+        engine.dispose()
+
+
+def nosql_results(args) -> dict:
+    if args.mongo_url:
+        from pymongo import MongoClient
+
+        client = MongoClient(args.mongo_url)
+    else:
+        try:
+            import mongomock
+        except ImportError:
+            return {"skipped": "pass --mongo-url or install mongomock"}
+        client = mongomock.MongoClient()
+
+    database = client["products_benchmark"]
+    for name in ("products", "counters"):
+        database.drop_collection(name)
+    try:
+        return benchmark(NoSQLProductRepository(collection=database["products"]), args)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", choices=["sql", "nosql", "all"], default="all")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--mongo-url", help="MongoDB URL (default: mongomock when installed)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    results = {}
+    if args.backend in ("sql", "all"):
+        results["sql"] = sql_results(args)
+    if args.backend in ("nosql", "all"):
+        results["nosql"] = nosql_results(args)
+
+    parameters = {
+        "products": args.products,
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "database": "custom" if args.database_url else "sqlite",
+        "mongo": "custom" if args.mongo_url else "mongomock",
+    }
+    write_report(report("repositories", parameters, results), args.output)
+
+
+if __name__ == "__main__":
+    main()
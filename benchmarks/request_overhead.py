@@ -0,0 +1,74 @@
+"""
+Measure per-request framework overhead of the product routes.
+
+Requests are sent one at a time through the ASGI app, so the numbers reflect
+dependency resolution, threadpool hops and serialization rather than
+throughput. A bare Starlette route returning the same body is the baseline.
+
+    python -m benchmarks.request_overhead --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def build_raw_app(categories: list) -> Starlette:
+    async def raw_categories(request):
+        return JSONResponse(categories)
+
+    return Starlette(routes=[Route("/raw/categories", raw_categories)])
+
+
+async def run(app, path: str, requests: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):  # warm-up
+            (await client.get(path)).raise_for_status()
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+    return round(elapsed / requests * 1_000_000, 1)
+
+
+async def measure(requests: int) -> dict:
+    # Imported here so the database settings above apply
+    from app.adapters.repositories.sql_product_repository import SQLProductRepository
+    from app.adapters.models.sql.session import get_sessionmaker
+    from app.domain.entities.product import Product, ProductCategory
+    from main import app, lifespan
+
+    async with lifespan(app):
+        with get_sessionmaker()() as session:
+            product = SQLProductRepository(session).create(Product(
+                name="Benchmark", description="Benchmark product",
+                category=ProductCategory.MAIN_ITEM, price=1.0, quantity=1,
+            ))
+        raw_app = build_raw_app([category.value for category in ProductCategory])
+        return {
+            "raw_starlette_categories_us": await run(raw_app, "/raw/categories", requests),
+            "categories_us": await run(app, "/api/v1/products/categories", requests),
+            "get_by_id_us": await run(app, f"/api/v1/products/{product.id}", requests),
+            "list_limit_10_us": await run(app, "/api/v1/products/?limit=10", requests),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    os.environ["SQL_DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/overhead.db"
+    print(asyncio.run(measure(args.requests)))
+
+
+if __name__ == "__main__":
+    main()
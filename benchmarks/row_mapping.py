@@ -0,0 +1,72 @@
+"""
+Compare per-row CPU time and peak memory of ORM hydration against the column
+projection used by SQLProductRepository's read paths.
+
+    python -m benchmarks.row_mapping --products 20000
+"""
+import argparse
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.product_model import ProductModel
+from app.adapters.repositories.sql_product_repository import SQLProductRepository
+from app.adapters.repositories.sql_statements import map_row, map_to_entity, product_select
+from app.domain.entities.product import Product, ProductCategory
+
+
+def orm_entities(session):
+    return [map_to_entity(product) for product in session.scalars(select(ProductModel))]
+
+
+def projected_entities(session):
+    return [map_row(row) for row in session.execute(product_select())]
+
+
+def measure(session_factory, load, size: int, rounds: int = 3) -> dict:
+    best = float("inf")
+    for _ in range(rounds):
+        with session_factory() as session:
+            started = time.perf_counter()
+            load(session)
+            best = min(best, time.perf_counter() - started)
+
+    with session_factory() as session:
+        tracemalloc.start()
+        load(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {"us_per_row": round(best / size * 1_000_000, 2), "peak_bytes_per_row": peak // size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--products", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    categories = list(ProductCategory)
+    with session_factory() as session:
+        SQLProductRepository(session).create_many([
+            Product(
+                name=f"Product {index}",
+                description="Benchmark product",
+                category=categories[index % len(categories)],
+                price=1 + index % 50,
+                quantity=index % 20,
+            )
+            for index in range(args.products)
+        ])
+
+    for name, load in (("orm", orm_entities), ("projection", projected_entities)):
+        print(name, measure(session_factory, load, args.products))
+
+
+if __name__ == "__main__":
+    main()
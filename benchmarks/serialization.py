@@ -0,0 +1,83 @@
+"""
+Measure the per-item cost of serializing a product listing.
+
+Compares FastAPI's response_model path (validate + jsonable_encoder + json.dumps)
+with the TypeAdapter.dump_json path used by the list endpoints, both served
+through the ASGI app so the framework overhead is included.
+
+    python -m benchmarks.serialization --products 10000 --requests 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.adapters.api.common import products_json_response
+from app.domain.entities.product import ProductCategory, ProductDb
+
+
+def build_products(size: int) -> List[ProductDb]:
+    categories = list(ProductCategory)
+    now = datetime.utcnow()
+    return [
+        ProductDb(
+            id=index + 1,
+            name=f"Product {index}",
+            description="Benchmark product",
+            category=categories[index % len(categories)],
+            price=1 + index % 50,
+            quantity=index % 20,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(size)
+    ]
+
+
+def build_app(products: List[ProductDb]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response-model", response_model=List[ProductDb])
+    def response_model():
+        return products
+
+    @app.get("/type-adapter", response_model=List[ProductDb])
+    def type_adapter():
+        return products_json_response(products)
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, size: int) -> dict:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        body = (await client.get(path)).content  # warm-up
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+
+    return {
+        "ms_per_request": round(elapsed / requests * 1000, 2),
+        "us_per_item": round(elapsed / (requests * size) * 1_000_000, 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    app = build_app(build_products(args.products))
+    for path in ("/response-model", "/type-adapter"):
+        print(path.strip("/"), asyncio.run(run(app, path, args.requests, args.products)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Latency summaries and JSON reports shared by the benchmark scripts"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples: List[float], elapsed: Optional[float] = None) -> dict:
+    """p50/p95/p99 in milliseconds of samples given in seconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    summary = {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+    if elapsed:
+        summary["ops_per_second"] = round(len(ordered) / elapsed, 1)
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(benchmark: str, parameters: dict, results: dict) -> dict:
+    return {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+
+def write_report(data: dict, path: Optional[str]) -> None:
+    """Write the report to path, or print it when no path is given"""
+    text = json.dumps(data, indent=2)
+    if path:
+        with open(path, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
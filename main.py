@@ -1,15 +1,94 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.adapters.api.async_product_router import router as async_product_router
 from app.adapters.api.product_router import router as product_router
-from app.adapters.models.sql.base import Base
-from app.adapters.models.sql.session import engine
+from app.adapters.diagnostics.profiler import ProfilingMiddleware
+from app.adapters.diagnostics.request_context import RequestContextMiddleware
+from app.adapters.idempotency import (
+    IdempotencyMiddleware,
+    NoSQLIdempotencyStore,
+    SQLIdempotencyStore,
+    get_idempotency_store,
+)
+from app.adapters.metrics.instrumentation import MetricsMiddleware, metrics_registry
+from app.adapters.models.nosql.connection import close_mongo_client, get_product_collection
+from app.adapters.models.nosql.indexes import ensure_async_product_indexes, ensure_product_indexes
+from app.adapters.models.pool_metrics import mongo_pool_metrics
+from app.adapters.projection.product_projector import ProductProjector, ProjectorWorker
+from app.adapters.models.sql.async_session import (
+    dispose_async_engine,
+    get_async_engine,
+    init_async_db,
+)
+from app.adapters.models.sql.engine import pool_status
+from app.adapters.models.sql.idempotency_model import IdempotencyKeyModel
+from app.adapters.models.sql.session import (
+    dispose_engine,
+    get_engine,
+    get_sessionmaker,
+    init_db,
+)
 from app.config import settings
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Products Service API")
+# Connects lazily, on the first keyed request
+idempotency_store = get_idempotency_store(settings.IDEMPOTENCY_STORE)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Database work happens here rather than at import, once per worker
+    uses_sql = settings.PRODUCT_BACKEND == "sql"
+    uses_nosql = not uses_sql or settings.READ_FROM_NOSQL
+    warmup = min(settings.SQL_POOL_WARMUP, settings.SQL_POOL_SIZE)
+    if settings.API_MODE == "async":
+        # Imported here so the sync mode never loads motor
+        from app.adapters.models.nosql.async_connection import get_async_product_collection
+
+        if uses_sql:
+            await init_async_db(settings.SQL_CREATE_SCHEMA, warmup)
+        if uses_nosql and settings.NOSQL_ENSURE_INDEXES:
+            await ensure_async_product_indexes(get_async_product_collection())
+    else:
+        if uses_sql:
+            init_db(settings.SQL_CREATE_SCHEMA, warmup)
+        if uses_nosql and settings.NOSQL_ENSURE_INDEXES:
+            ensure_product_indexes(get_product_collection())
+    # Idempotency stores use the sync drivers in both API modes
+    if isinstance(idempotency_store, SQLIdempotencyStore) and settings.SQL_CREATE_SCHEMA:
+        IdempotencyKeyModel.__table__.create(get_engine(), checkfirst=True)
+    if isinstance(idempotency_store, NoSQLIdempotencyStore):
+        idempotency_store.ensure_indexes()
+
+    projector = None
+    if settings.OUTBOX_PROJECTOR_ENABLED:
+        # Uses the sync drivers in both API modes; it runs on its own thread
+        projector = ProjectorWorker(
+            ProductProjector(get_sessionmaker(), get_product_collection(), settings.OUTBOX_BATCH_SIZE),
+            settings.OUTBOX_POLL_INTERVAL_SECONDS,
+        )
+        projector.start()
+    yield
+    if projector is not None:
+        projector.stop()
+    dispose_engine()
+    await dispose_async_engine()
+    close_mongo_client()
+    if settings.API_MODE == "async":
+        from app.adapters.models.nosql.async_connection import close_async_mongo_client
+
+        close_async_mongo_client()
+
+
+app = FastAPI(title="Products Service API", lifespan=lifespan)
+
+# Innermost, so replayed responses still go through CORS and the metrics
+if idempotency_store is not None:
+    app.add_middleware(IdempotencyMiddleware, store=idempotency_store)
 
 # CORS configuration
 app.add_middleware(
@@ -20,9 +99,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
+# Opt-in diagnostics: slow queries are attributed to the route through the request context
+if settings.SLOW_QUERY_MS > 0:
+    app.add_middleware(RequestContextMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        interval=settings.PROFILING_INTERVAL_MS / 1000,
+        header=settings.PROFILING_HEADER,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+    )
+
+# Outermost, so the timing includes the other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Include routers; API_MODE picks the threadpool (sync) or async driver routes
 app.include_router(
-    product_router,
+    async_product_router if settings.API_MODE == "async" else product_router,
     prefix=f"{settings.API_PREFIX}/products",
     tags=["products"],
 )
@@ -30,4 +125,17 @@ app.include_router(
 
 @app.get("/", tags=["health"])
 def health_check():
-    return {"status": "ok", "service": "products-service"} 
\ No newline at end of file
+    return {"status": "ok", "service": "products-service"}
+
+
+@app.get("/health/pool", tags=["health"])
+def pool_health():
+    """Connection pool usage, to size SQL_POOL_SIZE / NOSQL_MAX_POOL_SIZE per deployment"""
+    engine = get_async_engine().sync_engine if settings.API_MODE == "async" else get_engine()
+    return {"sql": pool_status(engine), "nosql": mongo_pool_metrics.snapshot()}
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of request, repository, SQL statement and pool metrics"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,5 @@
+-- Category listings filtered/sorted by price or by stock, and max(updated_at)
+-- for the catalog stamp. Databases created by create_all already have them.
+CREATE INDEX IF NOT EXISTS ix_products_category_price ON products (category, price);
+CREATE INDEX IF NOT EXISTS ix_products_category_quantity ON products (category, quantity);
+CREATE INDEX IF NOT EXISTS ix_products_updated_at ON products (updated_at);
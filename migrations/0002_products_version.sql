@@ -0,0 +1,2 @@
+-- Optimistic concurrency: existing products start at version 1.
+ALTER TABLE products ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,7 @@
+-- Full-text search for Postgres (same DDL as create_all).
+ALTER TABLE products ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED;
+CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector);
@@ -0,0 +1,21 @@
+-- Full-text search for SQLite builds with FTS5 (same DDL as create_all).
+-- External-content table: the text lives in products, FTS5 only keeps the index.
+-- Statements contain trigger bodies: run the file as a script, not split on ";".
+CREATE VIRTUAL TABLE products_fts USING fts5(
+    name, description, content='products', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+    INSERT INTO products_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+END;
+-- Index the rows that existed before the FTS table.
+INSERT INTO products_fts(products_fts) VALUES ('rebuild');
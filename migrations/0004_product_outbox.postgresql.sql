@@ -0,0 +1,7 @@
+-- Outbox the Mongo read model is projected from (OUTBOX_ENABLED).
+CREATE TABLE IF NOT EXISTS product_outbox (
+    id SERIAL NOT NULL,
+    product_id INTEGER NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
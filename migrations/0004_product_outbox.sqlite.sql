@@ -0,0 +1,7 @@
+-- Outbox the Mongo read model is projected from (OUTBOX_ENABLED).
+CREATE TABLE IF NOT EXISTS product_outbox (
+    id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
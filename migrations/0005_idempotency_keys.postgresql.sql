@@ -0,0 +1,11 @@
+-- Stored responses for IDEMPOTENCY_STORE=sql.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    "key" VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    headers TEXT,
+    body BYTEA,
+    expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY ("key")
+);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
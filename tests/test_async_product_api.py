@@ -0,0 +1,123 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.adapters.api.async_product_router import router as async_product_router
+from app.adapters.cache.menu_snapshots import menu_snapshots
+from app.adapters.models.sql.async_session import get_async_db, to_async_url
+from app.adapters.models.sql.base import Base
+
+# Aplicação montada com as rotas assíncronas (API_MODE=async)
+app = FastAPI()
+app.include_router(async_product_router, prefix="/api/v1/products")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    # Banco em memória compartilhado entre as conexões do teste
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False)
+
+    async def override_get_async_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    menu_snapshots.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./products.db") == "sqlite+aiosqlite:///./products.db"
+    assert to_async_url("postgresql+psycopg2://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+    with pytest.raises(ValueError):
+        to_async_url("mysql://u:p@db/x")
+
+
+@pytest.mark.anyio
+async def test_async_product_crud(client):
+    # Cria produto
+    product = {
+        "name": "Async Burger",
+        "description": "Async burger",
+        "category": "Main Item",
+        "price": 11.0,
+        "quantity": 4
+    }
+    response = await client.post("/api/v1/products/", json=product)
+    assert response.status_code == 201
+    product_id = response.json()["id"]
+
+    # Busca, atualiza e ajusta a quantidade
+    response = await client.get(f"/api/v1/products/{product_id}")
+    assert response.json()["name"] == "Async Burger"
+    response = await client.put(f"/api/v1/products/{product_id}", json=dict(product, price=12.0))
+    assert response.json()["price"] == 12.0
+    response = await client.patch(f"/api/v1/products/{product_id}", json={"name": "Async Cheeseburger"})
+    assert response.json()["name"] == "Async Cheeseburger"
+    assert response.json()["price"] == 12.0
+    response = await client.patch("/api/v1/products/9999", json={"price": 1.0})
+    assert response.status_code == 404
+    response = await client.patch(f"/api/v1/products/{product_id}/quantity/-6")
+    assert response.json()["quantity"] == 0
+
+    # Deleta
+    response = await client.delete(f"/api/v1/products/{product_id}")
+    assert response.status_code == 204
+    response = await client.get(f"/api/v1/products/{product_id}")
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_async_listing_export_and_reservation(client):
+    # Cria produtos em lote
+    products = [
+        {
+            "name": f"Async {index}",
+            "description": "Async product",
+            "category": "Side",
+            "price": float(index + 1),
+            "quantity": 2,
+        }
+        for index in range(3)
+    ]
+    response = await client.post("/api/v1/products/bulk", json=products)
+    ids = [item["id"] for item in response.json()["items"]]
+
+    # Paginação
+    response = await client.get("/api/v1/products/", params={"limit": 2, "order": "desc"})
+    assert [item["id"] for item in response.json()] == ids[::-1][:2]
+    assert response.headers["X-Next-Cursor"]
+
+    # Busca por prefixo
+    response = await client.get("/api/v1/products/search", params={"q": "async 1"})
+    assert [item["id"] for item in response.json()] == [ids[1]]
+
+    # Cardápio por categoria
+    response = await client.get(f"/api/v1/products/menu/{products[0]['category']}")
+    assert [item["id"] for item in response.json()] == ids
+
+    # Exportação em NDJSON
+    response = await client.get("/api/v1/products/export")
+    assert len(response.text.strip().split("\n")) == 3
+
+    # Reserva com estoque insuficiente
+    response = await client.post("/api/v1/products/reservations", json={
+        "items": [{"product_id": ids[0], "delta": -1}, {"product_id": ids[1], "delta": -5}],
+        "reject_if_insufficient": True,
+    })
+    assert response.status_code == 409
+    response = await client.get(f"/api/v1/products/{ids[0]}")
+    assert response.json()["quantity"] == 2
@@ -0,0 +1,27 @@
+from benchmarks.compare import compare
+from benchmarks.datasets import generate_products
+from benchmarks.stats import latency_summary
+
+
+def test_dataset_is_deterministic():
+    assert generate_products(20, seed=1) == generate_products(20, seed=1)
+    assert generate_products(20, seed=1) != generate_products(20, seed=2)
+
+
+def test_latency_summary_percentiles():
+    summary = latency_summary([index / 1000 for index in range(1, 101)], elapsed=2.0)
+
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert summary["ops_per_second"] == 50.0
+
+
+def test_compare_flags_regressions_above_threshold():
+    baseline = {"results": {"sql": {"get_by_id": {"p50_ms": 1.0, "p95_ms": 2.0}}}}
+    candidate = {"results": {"sql": {"get_by_id": {"p50_ms": 1.05, "p95_ms": 3.0}, "new": {"p50_ms": 1}}}}
+
+    rows = compare(baseline, candidate, threshold=10)
+    # Operações novas não têm base de comparação
+    assert [(name, metric, regressed) for name, metric, *_, regressed in rows] == [
+        ("sql/get_by_id", "p50_ms", False),
+        ("sql/get_by_id", "p95_ms", True),
+    ]
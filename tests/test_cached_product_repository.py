@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+from app.adapters.cache.ttl_cache import TTLCache
+from app.adapters.repositories.cached_product_repository import (
+    CachedProductRepository,
+    ProductCache,
+)
+from app.domain.entities.product import Product, ProductCategory, ProductDb, ProductFilter, ProductPage
+from app.domain.interfaces.product_repository import ProductRepository
+
+
+def make_product(product_id: int, quantity: int = 10) -> ProductDb:
+    return ProductDb(
+        id=product_id, name="Burger", description="Tasty burger",
+        category=ProductCategory.MAIN_ITEM, price=15.99, quantity=quantity,
+        created_at=None, updated_at=None
+    )
+
+
+class TestTTLCache:
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.evictions == 1
+
+    def test_expires_entries_after_ttl(self):
+        now = [0.0]
+        cache = TTLCache(maxsize=10, ttl=5, clock=lambda: now[0])
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        now[0] = 5.0
+        assert cache.get("a") is None
+        assert cache.expirations == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestCachedProductRepository:
+    def setup_method(self):
+        self.mock_repo = MagicMock(spec=ProductRepository)
+        self.cache = ProductCache(maxsize=100, ttl=60)
+        self.repository = CachedProductRepository(self.mock_repo, self.cache)
+
+    def test_get_by_id_is_read_through(self):
+        self.mock_repo.get_by_id.return_value = make_product(1)
+
+        assert self.repository.get_by_id(1).id == 1
+        assert self.repository.get_by_id(1).id == 1
+
+        self.mock_repo.get_by_id.assert_called_once_with(1)
+        assert self.cache.stats()["products"]["hits"] == 1
+
+    def test_missing_products_are_not_cached(self):
+        self.mock_repo.get_by_id.return_value = None
+
+        assert self.repository.get_by_id(999) is None
+        assert self.repository.get_by_id(999) is None
+
+        assert self.mock_repo.get_by_id.call_count == 2
+
+    def test_get_page_is_cached_per_arguments(self):
+        self.mock_repo.get_page.return_value = ProductPage(items=[make_product(1)])
+
+        self.repository.get_page(ProductFilter(category=ProductCategory.MAIN_ITEM), limit=10)
+        self.repository.get_page(ProductFilter(category=ProductCategory.MAIN_ITEM), limit=10)
+        self.repository.get_page(ProductFilter(category=ProductCategory.SIDE), limit=10)
+
+        assert self.mock_repo.get_page.call_count == 2
+
+    def test_writes_invalidate_product_and_listings(self):
+        self.mock_repo.get_by_id.return_value = make_product(1)
+        self.mock_repo.get_all.return_value = [make_product(1)]
+        self.mock_repo.adjust_quantity.return_value = make_product(1, quantity=8)
+        self.repository.get_by_id(1)
+        self.repository.get_all()
+
+        self.repository.adjust_quantity(1, -2)
+        self.repository.get_by_id(1)
+        self.repository.get_all()
+
+        assert self.mock_repo.get_by_id.call_count == 2
+        assert self.mock_repo.get_all.call_count == 2
+
+    def test_read_racing_a_write_is_not_stored(self):
+        def get_by_id_during_write(product_id):
+            # A write lands while the value is being loaded
+            self.repository.create(Product(**make_product(2).model_dump()))
+            return make_product(product_id)
+
+        self.mock_repo.get_by_id.side_effect = get_by_id_during_write
+        self.mock_repo.create.return_value = make_product(2)
+
+        self.repository.get_by_id(1)
+
+        assert len(self.cache.products) == 0
@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.adapters.diagnostics.profiler import ProfilingMiddleware, StackSampler, collapsed
+from app.adapters.diagnostics.request_context import (
+    RequestContextMiddleware,
+    current_route,
+    current_scope,
+)
+from app.adapters.diagnostics.slow_queries import SlowCommandListener, install_slow_query_log
+
+TESTS_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_keeps_only_stacks_under_root():
+    release = threading.Event()
+    worker = threading.Thread(target=release.wait)
+    worker.start()
+    try:
+        sampler = StackSampler(interval=0.001, root=TESTS_ROOT)
+        sampler.sample()
+    finally:
+        release.set()
+        worker.join()
+
+    # A thread da própria amostragem roda código de teste; a thread parada em wait não
+    assert sampler.samples == 1
+    (stack,) = sampler.stacks
+    assert "tests.test_diagnostics:test_sampler_keeps_only_stacks_under_root;" in stack
+    assert stack.endswith("app.adapters.diagnostics.profiler:StackSampler.sample")
+    assert collapsed(sampler.stacks) == f"{stack} 1\n"
+
+
+def make_app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        busy_wait(0.05)
+        return {"id": item_id, "route": current_route()}
+
+    app.add_middleware(RequestContextMiddleware)
+    app.add_middleware(ProfilingMiddleware, interval=0.001, root=TESTS_ROOT, **options)
+    return app
+
+
+def test_profiles_requests_with_the_header(tmp_path):
+    client = TestClient(make_app(directory=str(tmp_path)))
+
+    assert "X-Profile-Id" not in client.get("/items/1").headers
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.get("/items/1", headers={"X-Profile": "1"})
+    profile_id = response.headers["X-Profile-Id"]
+    # A rota é resolvida também dentro do threadpool
+    assert response.json()["route"] == "GET /items/{item_id}"
+    (profile,) = tmp_path.iterdir()
+    assert profile.name.endswith(f"-GET-items_item_id-{profile_id}.folded")
+    lines = profile.read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("tests.test_diagnostics:busy_wait" in line for line in lines)
+
+
+def test_profiles_a_share_of_requests(tmp_path):
+    client = TestClient(make_app(directory=str(tmp_path), sample_rate=1.0))
+
+    assert "X-Profile-Id" in client.get("/items/1").headers
+    assert "X-Profile-Id" not in client.get("/items/1", headers={"X-Profile": "false"}).headers
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_sql_slow_query_log(caplog):
+    engine = create_engine("sqlite://")
+    install_slow_query_log(engine, threshold_ms=0)
+    token = current_scope.set({"method": "GET", "path": "/api/v1/products/"})
+    try:
+        with caplog.at_level(logging.WARNING), engine.connect() as connection:
+            connection.execute(text("SELECT :value"), {"value": 42})
+    finally:
+        current_scope.reset(token)
+
+    (record,) = caplog.records
+    assert record.route == "GET /api/v1/products/"
+    assert "SELECT ?" in record.getMessage()
+    assert "(42,)" in record.getMessage()
+
+
+def test_sql_slow_query_log_threshold_and_parameters(caplog):
+    engine = create_engine("sqlite://")
+    install_slow_query_log(engine, threshold_ms=10_000, log_parameters=False)
+    with caplog.at_level(logging.WARNING), engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert caplog.records == []
+
+    engine = create_engine("sqlite://")
+    install_slow_query_log(engine, threshold_ms=0, log_parameters=False)
+    with caplog.at_level(logging.WARNING), engine.connect() as connection:
+        connection.execute(text("SELECT :value"), {"value": 42})
+    assert "42" not in caplog.records[0].getMessage()
+    assert caplog.records[0].route is None
+
+
+def mongo_event(request_id: int, duration_micros: int = 0, **command):
+    return MagicMock(
+        connection_id=("localhost", 27017), request_id=request_id, command_name="find",
+        database_name="products_db", command={"find": "products", "lsid": {}, **command},
+        duration_micros=duration_micros,
+    )
+
+
+def test_mongo_slow_command_listener(caplog):
+    listener = SlowCommandListener(threshold_ms=100)
+    with caplog.at_level(logging.WARNING):
+        listener.started(mongo_event(1, filter={"category": "Drink"}))
+        listener.succeeded(mongo_event(1, duration_micros=50_000))
+        listener.started(mongo_event(2, filter={"category": "Side"}))
+        listener.failed(mongo_event(2, duration_micros=250_000))
+
+    (record,) = caplog.records
+    message = record.getMessage()
+    assert "(250.0 ms)" in message
+    assert "find products_db.products" in message
+    assert "'Side'" in message and "lsid" not in message
+    assert listener._started == {}
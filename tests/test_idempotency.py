@@ -0,0 +1,182 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app, idempotency_store
+from app.adapters.cache.menu_snapshots import menu_snapshots
+from app.adapters.idempotency import (
+    IdempotencyMiddleware,
+    MemoryIdempotencyStore,
+    NoSQLIdempotencyStore,
+    SQLIdempotencyStore,
+    StoredResponse,
+)
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.session import get_db
+
+PRODUCT = {"name": "Burger", "description": "Tasty", "category": "Main Item", "price": 10.0, "quantity": 5}
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(sqlite_engine):
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = override_get_db
+    menu_snapshots.clear()
+    idempotency_store.clear()
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+def test_repeated_create_returns_the_first_response(client):
+    headers = {"Idempotency-Key": "order-1"}
+    first = client.post("/api/v1/products/", json=PRODUCT, headers=headers)
+    repeat = client.post("/api/v1/products/", json=PRODUCT, headers=headers)
+
+    assert first.status_code == repeat.status_code == 201
+    assert repeat.json() == first.json()
+    assert repeat.headers["Idempotent-Replayed"] == "true"
+    assert repeat.headers["content-type"] == first.headers["content-type"]
+    # Só um produto foi criado
+    assert len(client.get("/api/v1/products/").json()) == 1
+
+    # Sem a chave cada requisição é nova
+    client.post("/api/v1/products/", json=PRODUCT)
+    assert len(client.get("/api/v1/products/").json()) == 2
+
+
+def test_repeated_quantity_change_is_applied_once(client):
+    product_id = client.post("/api/v1/products/", json=PRODUCT).json()["id"]
+
+    for _ in range(3):
+        response = client.patch(
+            f"/api/v1/products/{product_id}/quantity/-2", headers={"Idempotency-Key": "order-2"}
+        )
+        assert response.status_code == 200
+        assert response.json()["quantity"] == 3
+    assert client.get(f"/api/v1/products/{product_id}").json()["quantity"] == 3
+
+
+def test_key_reused_for_another_request(client):
+    headers = {"Idempotency-Key": "order-3"}
+    assert client.post("/api/v1/products/", json=PRODUCT, headers=headers).status_code == 201
+
+    response = client.post("/api/v1/products/", json={**PRODUCT, "quantity": 6}, headers=headers)
+    assert response.status_code == 422
+    response = client.post("/api/v1/products/", json=PRODUCT, headers={"Idempotency-Key": "x" * 256})
+    assert response.status_code == 400
+
+
+def test_client_errors_are_replayed(client):
+    headers = {"Idempotency-Key": "order-4"}
+    assert client.patch("/api/v1/products/999/quantity/1", headers=headers).status_code == 404
+    response = client.patch("/api/v1/products/999/quantity/1", headers=headers)
+    assert response.status_code == 404 and response.headers["Idempotent-Replayed"] == "true"
+
+
+def test_server_errors_release_the_key():
+    calls = []
+
+    async def failing_app(scope, receive, send):
+        calls.append((await receive())["body"])
+        await send({"type": "http.response.start", "status": 503, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    store = MemoryIdempotencyStore(10, 60, 5)
+    c = TestClient(IdempotencyMiddleware(failing_app, store))
+    for _ in range(2):
+        assert c.post("/", content=b"payload", headers={"Idempotency-Key": "order-5"}).status_code == 503
+    # O corpo chega ao app e a repetição é executada de novo
+    assert calls == [b"payload", b"payload"]
+    assert store.claim("order-5", "fingerprint") is None
+
+
+def test_memory_store_in_progress_and_expiry():
+    now = [0.0]
+    store = MemoryIdempotencyStore(1, 60, 5, clock=lambda: now[0])
+
+    assert store.claim("key", "a") is None
+    in_progress = store.claim("key", "a")
+    assert in_progress.fingerprint == "a" and in_progress.response is None
+    # A LRU cheia não descarta uma requisição em andamento
+    for other in ("b", "c"):
+        assert store.claim(other, other) is None
+        store.complete(other, StoredResponse(200, [], b""))
+    assert store.claim("key", "a").response is None
+
+    store.complete("key", StoredResponse(201, [("content-type", "application/json")], b"{}"))
+    assert store.claim("key", "a").response.status == 201
+
+    now[0] = 61
+    assert store.claim("key", "b") is None
+    # Uma requisição que nunca termina só segura a chave durante a lease
+    now[0] = 67
+    assert store.claim("key", "c") is None
+
+
+def test_sql_store_claims_completes_and_reclaims_expired_keys(sqlite_engine):
+    store = SQLIdempotencyStore(sessionmaker(bind=sqlite_engine), ttl=60, lease=5)
+
+    assert store.claim("key", "a") is None
+    assert store.claim("key", "a").response is None
+    store.complete("key", StoredResponse(200, [("etag", '"1-2"')], b"body"))
+    record = store.claim("key", "a")
+    response = record.response
+    assert (response.status, response.headers, response.body) == (200, [("etag", '"1-2"')], b"body")
+
+    store.release("key")
+    assert store.claim("key", "b") is None
+
+    # Uma lease vencida é retomada; ao completar, a chave vale pelo ttl inteiro
+    expired = SQLIdempotencyStore(sessionmaker(bind=sqlite_engine), ttl=60, lease=-1)
+    assert expired.claim("old", "a") is None
+    assert store.claim("old", "c") is None
+    assert store.claim("old", "c").fingerprint == "c"
+    assert expired.claim("done", "a") is None
+    expired.complete("done", StoredResponse(201, [], b""))
+    assert store.claim("done", "a").response.status == 201
+
+
+def test_nosql_store_returns_the_existing_record():
+    collection = MagicMock()
+    store = NoSQLIdempotencyStore(lambda: collection, ttl=60, lease=5)
+
+    assert store.claim("key", "a") is None
+    document = collection.insert_one.call_args.args[0]
+    assert document["_id"] == "key" and document["fingerprint"] == "a"
+    # A lease curta vira o ttl quando a resposta é guardada
+    store.complete("key", StoredResponse(201, [], b"{}"))
+    completed = collection.update_one.call_args.args[1]["$set"]["expires_at"]
+    assert completed - document["expires_at"] > timedelta(seconds=50)
+
+    collection.insert_one.side_effect = DuplicateKeyError("duplicate")
+    collection.find_one_and_update.return_value = None
+    collection.find_one.return_value = {
+        "_id": "key", "fingerprint": "a", "status": 201, "headers": [["location", "/1"]], "body": b"{}",
+    }
+    record = store.claim("key", "a")
+    assert record.response.status == 201 and record.response.headers == [("location", "/1")]
+    # Só chaves expiradas são retomadas
+    filter = collection.find_one_and_update.call_args.args[0]
+    assert set(filter) == {"_id", "expires_at"}
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime
+
+from app.adapters.cache.menu_snapshots import MenuSnapshots
+from app.domain.entities.product import ProductCategory, ProductDb
+
+
+def make_product(
+    product_id: int,
+    category: ProductCategory,
+    name: str = "Burger",
+    version: int = 1,
+    created_at: datetime = None,
+) -> ProductDb:
+    return ProductDb(
+        id=product_id, name=name, description="Tasty", category=category,
+        price=10, quantity=1, created_at=created_at, updated_at=None, version=version
+    )
+
+
+def names(body: bytes) -> list:
+    return [item["name"] for item in json.loads(body)]
+
+
+def test_snapshots_expire_after_max_age():
+    now = [0.0]
+    snapshots = MenuSnapshots(max_age=30, clock=lambda: now[0])
+    assert snapshots.get() is None
+
+    snapshots.load([make_product(1, ProductCategory.MAIN_ITEM)], snapshots.generation)
+    assert names(snapshots.get(ProductCategory.MAIN_ITEM)) == ["Burger"]
+    assert json.loads(snapshots.get())["Drink"] == []
+
+    now[0] = 30.0
+    assert snapshots.get() is None
+
+
+def test_writes_patch_only_the_loaded_snapshots():
+    snapshots = MenuSnapshots(max_age=30)
+    snapshots.load(
+        [make_product(2, ProductCategory.SIDE, "Fries"), make_product(1, ProductCategory.SIDE, "Rings")],
+        snapshots.generation,
+    )
+
+    # Produto muda de categoria e outro é removido
+    snapshots.apply([make_product(2, ProductCategory.DRINK, "Shake")], deleted=[1])
+
+    assert names(snapshots.get(ProductCategory.DRINK)) == ["Shake"]
+    assert names(snapshots.get(ProductCategory.SIDE)) == []
+
+
+def test_load_racing_a_write_is_not_kept():
+    snapshots = MenuSnapshots(max_age=30)
+    generation = snapshots.generation
+    snapshots.apply([make_product(1, ProductCategory.MAIN_ITEM)])
+
+    # O catálogo lido antes da escrita ainda é devolvido, mas não fica guardado
+    body = snapshots.load([], generation, ProductCategory.MAIN_ITEM)
+    assert names(body) == []
+    assert snapshots.get() is None
+
+
+def test_writes_applied_out_of_order_keep_the_newest_version():
+    snapshots = MenuSnapshots(max_age=30)
+    snapshots.load([make_product(1, ProductCategory.MAIN_ITEM, "Burger")], snapshots.generation)
+
+    # A escrita da v2 termina antes da v1
+    snapshots.apply([make_product(1, ProductCategory.SIDE, "Fries", version=2)])
+    snapshots.apply([make_product(1, ProductCategory.MAIN_ITEM, "Old burger", version=1)])
+
+    assert names(snapshots.get(ProductCategory.SIDE)) == ["Fries"]
+    assert names(snapshots.get(ProductCategory.MAIN_ITEM)) == []
+
+    # Um produto removido não volta com uma versão atrasada
+    snapshots.apply(deleted=[1])
+    snapshots.apply([make_product(1, ProductCategory.SIDE, "Fries", version=3)])
+    assert names(snapshots.get(ProductCategory.SIDE)) == []
+
+
+def test_reused_id_replaces_the_deleted_product():
+    snapshots = MenuSnapshots(max_age=30)
+    old = make_product(2, ProductCategory.SIDE, "Fries", version=3, created_at=datetime(2024, 1, 1))
+    snapshots.load([old], snapshots.generation)
+
+    snapshots.apply(deleted=[2])
+    # Novo produto com o mesmo id, criado depois da remoção
+    snapshots.apply([make_product(2, ProductCategory.SIDE, "New fries", created_at=datetime(2024, 1, 2))])
+    # Escrita atrasada do produto removido continua ignorada
+    snapshots.apply([old])
+
+    assert names(snapshots.get(ProductCategory.SIDE)) == ["New fries"]
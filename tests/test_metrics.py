@@ -0,0 +1,72 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.adapters.metrics.instrumentation import (
+    install_statement_metrics,
+    repository_call_duration,
+    repository_errors,
+    repository_rows,
+    sql_statement_duration,
+    statement_kind,
+)
+from app.adapters.metrics.registry import MetricsRegistry
+from app.adapters.repositories.instrumented_product_repository import InstrumentedProductRepository
+from app.domain.entities.product import ProductCategory, ProductDb
+from app.domain.interfaces.product_repository import ProductRepository
+
+
+def make_product(product_id: int) -> ProductDb:
+    return ProductDb(
+        id=product_id, name="Burger", description="Tasty burger",
+        category=ProductCategory.MAIN_ITEM, price=15.99, quantity=1,
+        created_at=None, updated_at=None
+    )
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, '/a"b')
+    histogram.observe(0.5, '/a"b')
+    histogram.observe(5, '/a"b')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a\\"b"} 3' in lines
+
+
+def test_statement_kind():
+    assert statement_kind("  select * from products") == "SELECT"
+    assert statement_kind("WITH ranked AS (...) SELECT 1") == "WITH"
+    assert statement_kind("PRAGMA journal_mode=WAL") == "OTHER"
+
+
+def test_statement_metrics():
+    engine = create_engine("sqlite://")
+    install_statement_metrics(engine)
+    before = sql_statement_duration.count("sqlite", "SELECT")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert sql_statement_duration.count("sqlite", "SELECT") == before + 1
+
+
+def test_instrumented_repository_records_calls_rows_and_errors():
+    mock_repo = MagicMock(spec=ProductRepository)
+    mock_repo.get_all.return_value = [make_product(1), make_product(2)]
+    mock_repo.get_by_id.side_effect = RuntimeError("boom")
+    repository = InstrumentedProductRepository(mock_repo, "test")
+
+    assert len(repository.get_all()) == 2
+    with pytest.raises(RuntimeError):
+        repository.get_by_id(1)
+
+    assert repository_call_duration.count("test", "get_all") == 1
+    assert repository_rows.value("test", "get_all") == 2
+    assert repository_errors.value("test", "get_by_id") == 1
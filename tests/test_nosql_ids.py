@@ -0,0 +1,56 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.adapters.repositories.nosql_ids import IdAllocator
+
+
+class TestIdAllocator:
+    def setup_method(self):
+        self.collection = MagicMock()
+        self.collection.name = "products"
+        self.counters = self.collection.database.__getitem__.return_value
+        self.seq = 0
+
+        def increment(filter, update, **kwargs):
+            self.seq += update["$inc"]["seq"]
+            return {"_id": "products", "seq": self.seq}
+
+        self.counters.find_one_and_update.side_effect = increment
+        # Existing documents go up to _id 7
+        self.collection.find_one.return_value = {"_id": 7}
+        self.counters.update_one.side_effect = lambda *args, **kwargs: setattr(
+            self, "seq", max(self.seq, 7)
+        )
+
+    def test_allocates_from_reserved_block(self):
+        allocator = IdAllocator(self.collection, block_size=3)
+
+        assert [allocator.allocate() for _ in range(4)] == [8, 9, 10, 11]
+        # One counter sync plus two block reservations
+        assert self.counters.update_one.call_count == 1
+        assert self.counters.find_one_and_update.call_count == 2
+
+    def test_bulk_allocation_reserves_whole_range(self):
+        allocator = IdAllocator(self.collection, block_size=1)
+
+        assert allocator.allocate(5) == 8
+        assert allocator.allocate() == 13
+
+    def test_insert_retries_with_fresh_ids_on_duplicate_key(self):
+        allocator = IdAllocator(self.collection)
+        self.collection.insert_one.side_effect = [DuplicateKeyError("dup"), None]
+        document = {"name": "Burger"}
+
+        allocator.insert([document])
+
+        assert document["_id"] == 9
+        assert self.counters.update_one.call_count == 2
+
+    def test_insert_gives_up_after_repeated_conflicts(self):
+        allocator = IdAllocator(self.collection)
+        self.collection.insert_one.side_effect = DuplicateKeyError("dup")
+
+        with pytest.raises(DuplicateKeyError):
+            allocator.insert([{"name": "Burger"}])
@@ -0,0 +1,97 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.adapters.repositories.nosql_product_repository import NoSQLProductRepository
+from app.domain.entities.product import ProductCategory, ProductUpdate, QuantityAdjustment
+from app.domain.exceptions import InsufficientStockError, ProductNotFoundError, VersionConflictError
+
+
+def document(version=None) -> dict:
+    data = {
+        "_id": 1, "name": "Burger", "description": "Tasty", "category": "Main Item",
+        "price": 10.0, "quantity": 3, "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1),
+    }
+    if version is not None:
+        data["version"] = version
+    return data
+
+
+@pytest.fixture
+def collection():
+    return MagicMock()
+
+
+def test_update_is_a_single_compare_and_swap(collection):
+    collection.find_one_and_update.return_value = {**document(4), "price": 12.0}
+    repository = NoSQLProductRepository(collection=collection, ids=MagicMock())
+
+    updated = repository.update(1, ProductUpdate(price=12.0), expected_version=3)
+
+    assert updated.price == 12.0 and updated.version == 4
+    filter, change = collection.find_one_and_update.call_args.args
+    assert filter == {"_id": 1, "version": 3}
+    assert change["$set"]["price"] == 12.0 and "name" not in change["$set"]
+    assert change["$inc"] == {"version": 1}
+    # Sem conflito não há leitura extra
+    collection.find_one.assert_not_called()
+
+
+def test_update_conflict_and_missing_product(collection):
+    repository = NoSQLProductRepository(collection=collection, ids=MagicMock())
+    collection.find_one_and_update.return_value = None
+
+    collection.find_one.return_value = document(5)
+    with pytest.raises(VersionConflictError):
+        repository.update(1, ProductUpdate(category=ProductCategory.SIDE), expected_version=3)
+
+    collection.find_one.return_value = None
+    assert repository.update(1, ProductUpdate(quantity=1), expected_version=3) is None
+
+
+def test_documents_without_version_read_as_version_zero(collection):
+    collection.find_one.return_value = document()
+    repository = NoSQLProductRepository(collection=collection, ids=MagicMock())
+
+    assert repository.get_by_id(1).version == 0
+    collection.find_one_and_update.return_value = document(1)
+    repository.update(1, ProductUpdate(quantity=1), expected_version=0)
+    filter = collection.find_one_and_update.call_args.args[0]
+    assert filter == {"_id": 1, "version": {"$in": [0, None]}}
+
+
+def test_search_top_up_matches_the_last_word_as_a_prefix(collection):
+    repository = NoSQLProductRepository(collection=collection, ids=MagicMock())
+
+    assert repository.search("Cheese BUR") == []
+    # Palavras anteriores inteiras, a última como prefixo, nos campos normalizados
+    prefix_query = collection.find.call_args.args[0]
+    assert prefix_query["$and"] == [
+        {"$or": [{"name_terms": "cheese"}, {"description_terms": "cheese"}]},
+        {"$or": [{"name_terms": {"$regex": "^bur"}}, {"description_terms": {"$regex": "^bur"}}]},
+    ]
+
+    # Uma atualização parcial só reescreve os termos do campo alterado
+    collection.find_one_and_update.return_value = document(2)
+    repository.update(1, ProductUpdate(name="Double Burger"))
+    change = collection.find_one_and_update.call_args.args[1]
+    assert change["$set"]["name_terms"] == ["burger", "double"]
+    assert "description_terms" not in change["$set"]
+
+
+def test_adjustments_of_a_product_deleted_meanwhile(collection):
+    # O produto existe na verificação, mas é removido antes do update
+    collection.find.return_value = [{"_id": 1}]
+    collection.find_one_and_update.return_value = None
+    repository = NoSQLProductRepository(collection=collection, ids=MagicMock())
+    adjustments = [QuantityAdjustment(product_id=1, delta=-2)]
+
+    with pytest.raises(ProductNotFoundError):
+        repository.adjust_quantities(adjustments)
+    collection.find_one.return_value = None
+    with pytest.raises(ProductNotFoundError):
+        repository.adjust_quantities(adjustments, reject_if_insufficient=True)
+    collection.find_one.return_value = {"_id": 1}
+    with pytest.raises(InsufficientStockError):
+        repository.adjust_quantities(adjustments, reject_if_insufficient=True)
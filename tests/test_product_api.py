@@ -1,11 +1,15 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from main import app
+from app.adapters.cache.menu_snapshots import menu_snapshots
 from app.adapters.models.sql.base import Base
-from app.adapters.models.sql.session import get_db
+from app.adapters.models.sql.session import get_db, get_replica_dbs
+from app.adapters.repositories.read_write_split import replica_monitor
 
 # Configuração do banco de dados em memória para testes
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -32,6 +36,8 @@ def client(db_session):
     def override_get_db():
         yield db_session
     app.dependency_overrides[get_db] = override_get_db
+    # Snapshots de outro teste não valem para este banco
+    menu_snapshots.clear()
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -41,6 +47,15 @@ def test_health_check(client):
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
 
+
+def test_pool_health(client):
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert "checkouts" in data["sql"]
+    assert "wait_seconds_max" in data["nosql"]
+
+
 def test_create_and_get_product(client):
     # Cria produto
     product = {
@@ -87,6 +102,37 @@ def test_update_product(client):
     assert response.json()["name"] == "Updated Fries"
     assert response.json()["price"] == 5.0
 
+
+def test_patch_product(client):
+    product = {
+        "name": "Test Nuggets",
+        "description": "Test nuggets",
+        "category": "Side",
+        "price": 6.0,
+        "quantity": 4
+    }
+    created = client.post("/api/v1/products/", json=product).json()
+
+    # Só os campos enviados mudam
+    response = client.patch(f"/api/v1/products/{created['id']}", json={"price": 6.5})
+    assert response.status_code == 200
+    assert response.json() == {
+        **created, "price": 6.5, "updated_at": response.json()["updated_at"], "version": 2
+    }
+
+    response = client.patch(f"/api/v1/products/{created['id']}", json={})
+    assert response.status_code == 200
+    assert response.json()["price"] == 6.5
+
+    # null não é um valor válido, e produto inexistente é 404
+    response = client.patch(f"/api/v1/products/{created['id']}", json={"name": None})
+    assert response.status_code == 422
+    response = client.patch("/api/v1/products/9999", json={"price": 1.0})
+    assert response.status_code == 404
+    response = client.put("/api/v1/products/9999", json=product)
+    assert response.status_code == 404
+
+
 def test_update_quantity(client):
     # Cria produto
     product = {
@@ -122,4 +168,359 @@ def test_delete_product(client):
 
     # Verifica que não existe mais
     response = client.get(f"/api/v1/products/{product_id}")
-    assert response.status_code == 404 
\ No newline at end of file
+    assert response.status_code == 404 
+
+
+def test_list_products_paginated_and_filtered(client):
+    # Cria produtos de categorias e preços variados
+    for index, (category, price, quantity) in enumerate([
+        ("Main Item", 12.0, 3),
+        ("Side", 4.0, 0),
+        ("Main Item", 9.0, 1),
+        ("Drink", 3.0, 7),
+        ("Main Item", 15.0, 0),
+    ]):
+        client.post("/api/v1/products/", json={
+            "name": f"Product {index}",
+            "description": "Paged product",
+            "category": category,
+            "price": price,
+            "quantity": quantity,
+        })
+
+    # Percorre as páginas ordenadas por preço
+    prices = []
+    cursor = None
+    while True:
+        params = {"sort_by": "price", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/products/", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        prices += [item["price"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert prices == [3.0, 4.0, 9.0, 12.0, 15.0]
+
+    # Filtra por categoria e estoque
+    response = client.get(
+        "/api/v1/products/",
+        params={"category": "Main Item", "in_stock": True, "sort_by": "price", "order": "desc"},
+    )
+    assert [item["price"] for item in response.json()] == [12.0, 9.0]
+
+    # Cursor inválido
+    response = client.get("/api/v1/products/", params={"limit": 2, "cursor": "invalid"})
+    assert response.status_code == 400
+
+
+def test_export_products(client):
+    # Cria produtos
+    for index in range(3):
+        client.post("/api/v1/products/", json={
+            "name": f"Export {index}",
+            "description": "Exported product",
+            "category": "Side",
+            "price": 1.0 + index,
+            "quantity": index,
+        })
+
+    # Exporta em NDJSON
+    response = client.get("/api/v1/products/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.strip().split("\n")
+    assert [json.loads(line)["name"] for line in lines] == ["Export 0", "Export 1", "Export 2"]
+
+    # Exporta como array JSON
+    response = client.get("/api/v1/products/export", params={"format": "json"})
+    assert response.status_code == 200
+    assert [item["price"] for item in response.json()] == [1.0, 2.0, 3.0]
+
+
+def test_export_from_replica_closes_its_session(client, db_session):
+    client.post("/api/v1/products/", json={
+        "name": "Replica", "description": "Read from replica", "category": "Side", "price": 1.0, "quantity": 1,
+    })
+    # Réplica no mesmo banco, portanto sempre atualizada
+    replica = TestingSessionLocal(bind=db_session.get_bind())
+
+    async def override_get_replica_dbs():
+        yield [replica]
+    app.dependency_overrides[get_replica_dbs] = override_get_replica_dbs
+    replica_monitor.reset()
+    try:
+        response = client.get("/api/v1/products/export")
+    finally:
+        replica_monitor.reset()
+
+    assert [json.loads(line)["name"] for line in response.text.strip().split("\n")] == ["Replica"]
+    # A exportação leu da réplica e a sessão foi fechada depois do último bloco
+    assert not replica.in_transaction()
+
+
+def test_bulk_create_update_delete(client):
+    # Cria produtos em lote
+    products = [
+        {
+            "name": f"Bulk {index}",
+            "description": "Bulk product",
+            "category": "Drink",
+            "price": 2.0,
+            "quantity": 10,
+        }
+        for index in range(3)
+    ]
+    response = client.post("/api/v1/products/bulk", json=products)
+    assert response.status_code == 201
+    created = response.json()["items"]
+    assert [item["name"] for item in created] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    ids = [item["id"] for item in created]
+
+    # Atualiza em lote, com um id inexistente
+    updates = [dict(products[0], id=ids[0], price=3.0), dict(products[1], id=9999)]
+    response = client.put("/api/v1/products/bulk", json=updates)
+    assert response.status_code == 200
+    assert [item["price"] for item in response.json()["items"]] == [3.0]
+    assert response.json()["errors"] == [
+        {"index": 1, "id": 9999, "detail": "Product with ID 9999 not found"}
+    ]
+    assert client.get(f"/api/v1/products/{ids[0]}").json()["price"] == 3.0
+
+    # Deleta em lote
+    response = client.request("DELETE", "/api/v1/products/bulk", json=ids[:2] + [9999])
+    assert response.status_code == 200
+    assert response.json()["deleted_ids"] == ids[:2]
+    assert response.json()["errors"][0]["id"] == 9999
+    assert len(client.get("/api/v1/products/").json()) == 1
+
+
+def test_update_quantity_not_below_zero(client):
+    # Cria produto
+    product = {
+        "name": "Test Shake",
+        "description": "Test shake",
+        "category": "Drink",
+        "price": 7.0,
+        "quantity": 2
+    }
+    response = client.post("/api/v1/products/", json=product)
+    product_id = response.json()["id"]
+
+    # Quantidade nunca fica negativa
+    response = client.patch(f"/api/v1/products/{product_id}/quantity/-5")
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0
+
+    # Produto inexistente
+    response = client.patch("/api/v1/products/9999/quantity/1")
+    assert response.status_code == 404
+
+
+def test_reserve_stock(client):
+    # Cria produtos
+    ids = []
+    for name, quantity in [("Reserve Burger", 5), ("Reserve Soda", 1)]:
+        response = client.post("/api/v1/products/", json={
+            "name": name,
+            "description": "Reserved product",
+            "category": "Main Item",
+            "price": 10.0,
+            "quantity": quantity,
+        })
+        ids.append(response.json()["id"])
+
+    # Reserva vários itens em uma única chamada
+    response = client.post("/api/v1/products/reservations", json={
+        "items": [
+            {"product_id": ids[0], "delta": -2},
+            {"product_id": ids[1], "delta": -3},
+            {"product_id": ids[0], "delta": -1},
+        ]
+    })
+    assert response.status_code == 200
+    assert [item["quantity"] for item in response.json()] == [2, 0]
+
+    # Estoque insuficiente rejeita a reserva inteira
+    response = client.post("/api/v1/products/reservations", json={
+        "items": [{"product_id": ids[0], "delta": -1}, {"product_id": ids[1], "delta": -1}],
+        "reject_if_insufficient": True,
+    })
+    assert response.status_code == 409
+    assert client.get(f"/api/v1/products/{ids[0]}").json()["quantity"] == 2
+
+    # Produto inexistente
+    response = client.post("/api/v1/products/reservations", json={
+        "items": [{"product_id": 9999, "delta": -1}]
+    })
+    assert response.status_code == 404
+
+
+def test_conditional_get(client):
+    # Cria produto
+    product = {
+        "name": "Test Wrap",
+        "description": "Test wrap",
+        "category": "Main Item",
+        "price": 8.0,
+        "quantity": 4
+    }
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+
+    # Produto não modificado retorna 304
+    response = client.get(f"/api/v1/products/{product_id}")
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    response = client.get(f"/api/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get(
+        f"/api/v1/products/{product_id}",
+        headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+    )
+    assert response.status_code == 304
+
+    # A ETag do catálogo só é calculada para requisições condicionais
+    assert "ETag" not in client.get("/api/v1/products/").headers
+    response = client.get("/api/v1/products/", headers={"If-None-Match": '"unknown"'})
+    assert response.status_code == 200 and "Last-Modified" not in response.headers
+    catalog_tag = response.headers["ETag"]
+    response = client.get("/api/v1/products/", headers={"If-None-Match": catalog_tag})
+    assert response.status_code == 304
+
+    # Alteração invalida as ETags
+    client.patch(f"/api/v1/products/{product_id}/quantity/-1")
+    response = client.get(f"/api/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    response = client.get("/api/v1/products/", headers={"If-None-Match": catalog_tag})
+    assert response.status_code == 200
+    assert response.json()[0]["quantity"] == 3
+
+    # Remoção não altera o maior updated_at, mas muda a ETag do catálogo
+    catalog_tag = response.headers["ETag"]
+    client.delete(f"/api/v1/products/{product_id}")
+    response = client.get(
+        "/api/v1/products/",
+        headers={"If-None-Match": catalog_tag, "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+    )
+    assert response.status_code == 200 and response.json() == []
+    response = client.get("/api/v1/products/", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert response.status_code == 200
+
+
+def test_optimistic_concurrency(client):
+    product = {
+        "name": "Test Bowl",
+        "description": "Test bowl",
+        "category": "Main Item",
+        "price": 9.0,
+        "quantity": 10
+    }
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    etag = client.get(f"/api/v1/products/{product_id}").headers["ETag"]
+    assert etag == f'"{product_id}-1"'
+
+    # Escrita com a versão atual é aplicada e devolve a nova ETag
+    response = client.put(
+        f"/api/v1/products/{product_id}", json={**product, "price": 9.5}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    etag = response.headers["ETag"]
+
+    # Uma baixa de estoque no meio do caminho faz a edição do admin falhar com 409
+    client.patch(f"/api/v1/products/{product_id}/quantity/-1")
+    response = client.put(
+        f"/api/v1/products/{product_id}", json={**product, "price": 10.0}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 409
+    response = client.patch(f"/api/v1/products/{product_id}", json={"price": 10.0}, headers={"If-Match": etag})
+    assert response.status_code == 409
+    assert client.get(f"/api/v1/products/{product_id}").json()["quantity"] == 9
+
+    # ETag fraca, de outro produto, ou inexistente nunca casa; "*" só exige que exista
+    for tag in (f'W/"{product_id}-3"', '"999999-3"'):
+        response = client.patch(f"/api/v1/products/{product_id}", json={"price": 10.0}, headers={"If-Match": tag})
+        assert response.status_code == 409
+    response = client.patch(f"/api/v1/products/{product_id}", json={"price": 10.0}, headers={"If-Match": "*"})
+    assert response.status_code == 200
+    response = client.patch("/api/v1/products/999999", json={"price": 10.0}, headers={"If-Match": '"999999-1"'})
+    assert response.status_code == 404
+
+
+def test_search_products(client):
+    # Cria produtos
+    products = [
+        {"name": "Cheese Burger", "description": "Beef with cheddar", "category": "Main Item", "price": 10.0, "quantity": 1},
+        {"name": "Fries", "description": "Great with a burger", "category": "Side", "price": 3.0, "quantity": 1},
+        {"name": "Soda", "description": "Cold drink", "category": "Drink", "price": 2.0, "quantity": 1},
+    ]
+    client.post("/api/v1/products/bulk", json=products)
+
+    # Busca por palavra completa: o nome pesa mais que a descrição
+    response = client.get("/api/v1/products/search", params={"q": "burger"})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()] == ["Cheese Burger", "Fries"]
+
+    # Busca por prefixo (typeahead) exige todas as palavras
+    response = client.get("/api/v1/products/search", params={"q": "cheese bur"})
+    assert [item["name"] for item in response.json()] == ["Cheese Burger"]
+    response = client.get("/api/v1/products/search", params={"q": "so", "limit": 1})
+    assert [item["name"] for item in response.json()] == ["Soda"]
+
+    # Índice acompanha as alterações
+    product_id = response.json()[0]["id"]
+    client.delete(f"/api/v1/products/{product_id}")
+    response = client.get("/api/v1/products/search", params={"q": "soda"})
+    assert response.json() == []
+
+    # Consulta vazia é rejeitada
+    response = client.get("/api/v1/products/search", params={"q": ""})
+    assert response.status_code == 422
+
+
+def test_menu_snapshots(client):
+    products = [
+        {"name": "Burger", "description": "Beef", "category": "Main Item", "price": 10.0, "quantity": 1},
+        {"name": "Fries", "description": "Crispy", "category": "Side", "price": 3.0, "quantity": 1},
+    ]
+    created = client.post("/api/v1/products/bulk", json=products).json()["items"]
+
+    response = client.get("/api/v1/products/menu")
+    assert response.status_code == 200
+    menu = response.json()
+    assert list(menu) == ["Main Item", "Side", "Drink", "Dessert"]
+    assert [item["name"] for item in menu["Main Item"]] == ["Burger"]
+    assert menu["Drink"] == []
+
+    # Escritas atualizam o snapshot sem recarregar o catálogo
+    fries_id = created[1]["id"]
+    client.put(f"/api/v1/products/{fries_id}", json={**products[1], "category": "Drink", "name": "Shake"})
+    client.patch(f"/api/v1/products/{created[0]['id']}/quantity/4")
+    response = client.get("/api/v1/products/menu/Drink")
+    assert [item["name"] for item in response.json()] == ["Shake"]
+    assert client.get("/api/v1/products/menu/Side").json() == []
+    assert client.get("/api/v1/products/menu/Main Item").json()[0]["quantity"] == 5
+
+    # O SQLite reaproveita o maior id removido no próximo insert
+    client.delete(f"/api/v1/products/{fries_id}")
+    new = client.post("/api/v1/products/", json={**products[1], "name": "New fries"}).json()
+    assert new["id"] == fries_id
+    assert [item["name"] for item in client.get("/api/v1/products/menu/Side").json()] == ["New fries"]
+
+    client.delete(f"/api/v1/products/{fries_id}")
+    assert client.get("/api/v1/products/menu").json()["Drink"] == []
+    assert client.get("/api/v1/products/menu/Unknown").status_code == 422
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/v1/products/1")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    # Rotas aparecem pelo template, não pelo id
+    assert 'route="/api/v1/products/{product_id}",status="404"' in response.text
+    assert 'repository_call_duration_seconds_count{backend="sql",operation="get_by_id"}' in response.text
+    assert 'db_pool_checkouts_total{pool="sql",name="primary"}' in response.text
@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.outbox_model import ProductOutboxModel
+from app.adapters.projection.product_projector import ProductProjector
+from app.adapters.repositories.sql_product_repository import SQLProductRepository
+from app.domain.entities.product import Product, ProductCategory
+
+
+def make_product(name: str) -> Product:
+    return Product(
+        name=name, description="Tasty", category=ProductCategory.MAIN_ITEM, price=10, quantity=5
+    )
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def outbox_ids(session_factory):
+    with session_factory() as session:
+        return session.scalars(select(ProductOutboxModel.product_id).order_by(ProductOutboxModel.id)).all()
+
+
+def test_writes_record_outbox_events(session_factory):
+    with session_factory() as session:
+        repository = SQLProductRepository(session, record_changes=True)
+        burger = repository.create(make_product("Burger"))
+        fries, soda = repository.create_many([make_product("Fries"), make_product("Soda")])
+        repository.adjust_quantity(fries.id, -1)
+        repository.delete(soda.id)
+        # Produto inexistente não gera evento
+        repository.update(999, make_product("Ghost"))
+
+    assert outbox_ids(session_factory) == [burger.id, fries.id, soda.id, fries.id, soda.id]
+
+
+def test_outbox_is_disabled_by_default(session_factory):
+    with session_factory() as session:
+        SQLProductRepository(session, record_changes=False).create(make_product("Burger"))
+        assert session.scalar(select(func.count()).select_from(ProductOutboxModel)) == 0
+
+
+def test_projector_applies_current_state_and_drains_outbox(session_factory):
+    with session_factory() as session:
+        repository = SQLProductRepository(session, record_changes=True)
+        burger = repository.create(make_product("Burger"))
+        fries = repository.create(make_product("Fries"))
+        repository.update(burger.id, make_product("Cheeseburger"))
+        repository.delete(fries.id)
+
+    collection = MagicMock()
+    projector = ProductProjector(session_factory, collection, batch_size=10)
+
+    assert projector.run_once() == 4
+    operations = collection.bulk_write.call_args.args[0]
+    # Um único upsert com o estado atual por produto, e delete para o removido
+    assert [type(operation) for operation in operations] == [ReplaceOne, DeleteOne]
+    assert operations[0]._doc["name"] == "Cheeseburger"
+    assert operations[0]._doc["_id"] == burger.id
+    assert outbox_ids(session_factory) == []
+    checkpoint_update = projector.checkpoints.update_one.call_args.args[1]
+    assert checkpoint_update["$max"] == {"last_event_id": 4}
+    assert projector.run_once() == 0
+
+
+def test_projector_keeps_newer_documents(session_factory):
+    with session_factory() as session:
+        SQLProductRepository(session, record_changes=True).create(make_product("Burger"))
+
+    collection = MagicMock()
+    collection.bulk_write.side_effect = BulkWriteError({"writeErrors": [{"code": 11000}]})
+    projector = ProductProjector(session_factory, collection)
+    assert projector.run_once() == 1
+
+    with session_factory() as session:
+        SQLProductRepository(session, record_changes=True).create(make_product("Fries"))
+    collection.bulk_write.side_effect = BulkWriteError({"writeErrors": [{"code": 2}]})
+    with pytest.raises(BulkWriteError):
+        projector.run_once()
+    # O evento continua no outbox para a próxima tentativa
+    assert len(outbox_ids(session_factory)) == 1
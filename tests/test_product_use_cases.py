@@ -2,7 +2,16 @@ import pytest
 from unittest.mock import MagicMock
 
 from app.application.use_cases.product_use_cases import ProductUseCases
-from app.domain.entities.product import Product, ProductDb, ProductCategory
+from app.domain.entities.product import (
+    Product,
+    ProductBulkUpdate,
+    ProductCategory,
+    ProductDb,
+    ProductFilter,
+    ProductPage,
+    ProductSortField,
+    SortOrder,
+)
 from app.domain.interfaces.product_repository import ProductRepository
 
 
@@ -33,6 +42,30 @@ class TestProductUseCases:
         assert result[1].id == 2
         self.mock_repo.get_all.assert_called_once()
 
+    def test_list_products(self):
+        filters = ProductFilter(category=ProductCategory.SIDE, in_stock=True)
+        page = ProductPage(
+            items=[
+                ProductDb(
+                    id=2, name="Fries", description="Crispy fries",
+                    category=ProductCategory.SIDE, price=5.99, quantity=20,
+                    created_at=None, updated_at=None
+                )
+            ],
+            next_cursor="next"
+        )
+        self.mock_repo.get_page.return_value = page
+
+        result = self.use_cases.list_products(
+            filters, ProductSortField.PRICE, SortOrder.DESC, 1, None
+        )
+
+        assert result.next_cursor == "next"
+        assert result.items[0].id == 2
+        self.mock_repo.get_page.assert_called_once_with(
+            filters, ProductSortField.PRICE, SortOrder.DESC, 1, None
+        )
+
     def test_get_product_by_id(self):
         product = ProductDb(
             id=1, name="Burger", description="Tasty burger", 
@@ -79,17 +112,11 @@ class TestProductUseCases:
             name="Updated Product", description="Updated description", 
             category=ProductCategory.MAIN_ITEM, price=16.99, quantity=5
         )
-        existing = ProductDb(
-            id=product_id, name="Old Name", description="Old description", 
-            category=ProductCategory.MAIN_ITEM, price=15.99, quantity=10,
-            created_at=None, updated_at=None
-        )
         updated = ProductDb(
             id=product_id, name="Updated Product", description="Updated description", 
             category=ProductCategory.MAIN_ITEM, price=16.99, quantity=5,
             created_at=None, updated_at=None
         )
-        self.mock_repo.get_by_id.return_value = existing
         self.mock_repo.update.return_value = updated
 
         result = self.use_cases.update_product(product_id, product)
@@ -97,8 +124,9 @@ class TestProductUseCases:
         assert result.id == product_id
         assert result.name == "Updated Product"
         assert result.price == 16.99
-        self.mock_repo.get_by_id.assert_called_once_with(product_id)
-        self.mock_repo.update.assert_called_once_with(product_id, product)
+        # Uma única ida ao repositório, sem consulta prévia
+        self.mock_repo.get_by_id.assert_not_called()
+        self.mock_repo.update.assert_called_once_with(product_id, product, None)
         
     def test_update_product_not_found(self):
         product_id = 999
@@ -106,13 +134,13 @@ class TestProductUseCases:
             name="Updated Product", description="Updated description", 
             category=ProductCategory.MAIN_ITEM, price=16.99, quantity=5
         )
-        self.mock_repo.get_by_id.return_value = None
+        self.mock_repo.update.return_value = None
 
         result = self.use_cases.update_product(product_id, product)
 
         assert result is None
-        self.mock_repo.get_by_id.assert_called_once_with(product_id)
-        self.mock_repo.update.assert_not_called()
+        self.mock_repo.get_by_id.assert_not_called()
+        self.mock_repo.update.assert_called_once_with(product_id, product, None)
         
     def test_delete_product(self):
         product_id = 1
@@ -123,52 +151,55 @@ class TestProductUseCases:
         assert result is True
         self.mock_repo.delete.assert_called_once_with(product_id)
         
+    def test_update_products_reports_missing_and_duplicates(self):
+        updates = [
+            ProductBulkUpdate(
+                id=product_id, name="Product", description="Description",
+                category=ProductCategory.SIDE, price=1.0, quantity=1
+            )
+            for product_id in (1, 2, 1)
+        ]
+        updated = ProductDb(**updates[0].model_dump())
+        self.mock_repo.update_many.return_value = [updated, None]
+
+        result = self.use_cases.update_products(updates)
+
+        assert [item.id for item in result.items] == [1]
+        assert [(error.index, error.id) for error in result.errors] == [(1, 2), (2, 1)]
+        self.mock_repo.update_many.assert_called_once_with(updates[:2])
+
+    def test_delete_products(self):
+        self.mock_repo.delete_many.return_value = [3]
+
+        result = self.use_cases.delete_products([3, 4])
+
+        assert result.deleted_ids == [3]
+        assert [error.id for error in result.errors] == [4]
+        self.mock_repo.delete_many.assert_called_once_with([3, 4])
+
     def test_update_product_quantity(self):
         product_id = 1
         quantity_change = -2
         
-        existing = ProductDb(
-            id=product_id, name="Product", description="Description", 
-            category=ProductCategory.MAIN_ITEM, price=15.99, quantity=10,
-            created_at=None, updated_at=None
-        )
-        
         updated = ProductDb(
             id=product_id, name="Product", description="Description", 
             category=ProductCategory.MAIN_ITEM, price=15.99, quantity=8,
             created_at=None, updated_at=None
         )
         
-        self.mock_repo.get_by_id.return_value = existing
-        self.mock_repo.update.return_value = updated
+        self.mock_repo.adjust_quantity.return_value = updated
         
         result = self.use_cases.update_product_quantity(product_id, quantity_change)
         
         assert result.quantity == 8
-        self.mock_repo.get_by_id.assert_called_once_with(product_id)
-        self.mock_repo.update.assert_called_once()
-        
-    def test_update_product_quantity_not_below_zero(self):
-        product_id = 1
-        quantity_change = -15
-        
-        existing = ProductDb(
-            id=product_id, name="Product", description="Description", 
-            category=ProductCategory.MAIN_ITEM, price=15.99, quantity=10,
-            created_at=None, updated_at=None
-        )
-        
-        updated = ProductDb(
-            id=product_id, name="Product", description="Description", 
-            category=ProductCategory.MAIN_ITEM, price=15.99, quantity=0,
-            created_at=None, updated_at=None
-        )
+        self.mock_repo.adjust_quantity.assert_called_once_with(product_id, quantity_change, floor=0)
+        self.mock_repo.get_by_id.assert_not_called()
+        self.mock_repo.update.assert_not_called()
         
-        self.mock_repo.get_by_id.return_value = existing
-        self.mock_repo.update.return_value = updated
+    def test_update_product_quantity_not_found(self):
+        self.mock_repo.adjust_quantity.return_value = None
         
-        result = self.use_cases.update_product_quantity(product_id, quantity_change)
+        result = self.use_cases.update_product_quantity(999, -1)
         
-        assert result.quantity == 0
-        self.mock_repo.get_by_id.assert_called_once_with(product_id)
-        self.mock_repo.update.assert_called_once() 
\ No newline at end of file
+        assert result is None
+        self.mock_repo.adjust_quantity.assert_called_once_with(999, -1, floor=0)
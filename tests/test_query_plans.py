@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine
+
+from app.adapters.models.sql.base import Base
+from app.adapters.repositories.query_plans import _plan_stages, sql_query_plans
+
+
+def test_filtered_listings_use_indexes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as connection:
+        plans = sql_query_plans(connection)
+
+    assert "ix_products_category_price" in plans["category_by_price"]["plan"][0]
+    assert "ix_products_category_quantity" in plans["category_in_stock"]["plan"][0]
+    assert "ix_products_updated_at" in plans["catalog_stamp"]["plan"][0]
+    assert "products_fts" in plans["search"]["plan"][0]
+
+
+def test_mongo_plan_stages():
+    winning_plan = {
+        "stage": "LIMIT",
+        "inputStage": {
+            "stage": "FETCH",
+            "inputStage": {"stage": "IXSCAN", "indexName": "category_price"},
+        },
+    }
+    assert _plan_stages(winning_plan) == ["LIMIT", "FETCH", "IXSCAN category_price"]
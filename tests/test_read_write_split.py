@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from sqlalchemy.exc import OperationalError
+
+from app.adapters.repositories import RepositoryType, get_product_repository
+from app.adapters.repositories.read_write_split import ReadWriteSplitRepository, ReplicaMonitor
+from app.domain.entities.product import CatalogStamp, Product, ProductCategory, ProductDb
+from app.domain.interfaces.product_repository import ProductRepository
+
+
+def make_product(product_id: int) -> ProductDb:
+    return ProductDb(
+        id=product_id, name="Burger", description="Tasty burger",
+        category=ProductCategory.MAIN_ITEM, price=15.99, quantity=10,
+        created_at=None, updated_at=None
+    )
+
+
+def stamp(count: int, seconds_ago: float) -> CatalogStamp:
+    return CatalogStamp(count=count, last_modified=datetime.utcnow() - timedelta(seconds=seconds_ago))
+
+
+class TestReadWriteSplitRepository:
+    def setup_method(self):
+        self.now = [0.0]
+        self.monitor = ReplicaMonitor(max_lag=5, check_interval=1, clock=lambda: self.now[0])
+        self.primary = MagicMock(spec=ProductRepository)
+        self.replicas = [MagicMock(spec=ProductRepository), MagicMock(spec=ProductRepository)]
+        current = stamp(3, 60)
+        self.primary.get_catalog_stamp.return_value = current
+        for replica in self.replicas:
+            replica.get_catalog_stamp.return_value = current
+            replica.get_by_id.return_value = make_product(1)
+        self.repository = ReadWriteSplitRepository(self.primary, self.replicas, self.monitor)
+
+    def test_reads_are_spread_over_fresh_replicas(self):
+        self.repository.get_by_id(1)
+        self.repository.get_by_id(1)
+
+        self.replicas[0].get_by_id.assert_called_once_with(1)
+        self.replicas[1].get_by_id.assert_called_once_with(1)
+        self.primary.get_by_id.assert_not_called()
+
+    def test_writes_go_to_primary_and_pin_later_reads(self):
+        self.repository.create(Product(
+            name="Fries", description="Crispy", category=ProductCategory.SIDE,
+            price=5, quantity=3
+        ))
+        self.repository.get_by_id(1)
+
+        self.primary.create.assert_called_once()
+        self.primary.get_by_id.assert_called_once_with(1)
+        for replica in self.replicas:
+            replica.get_by_id.assert_not_called()
+
+    def test_lagging_replica_is_skipped_until_it_catches_up(self):
+        # A réplica 0 ainda não recebeu uma alteração feita há 10s (> max_lag)
+        current = stamp(4, 10)
+        self.primary.get_catalog_stamp.return_value = current
+        self.replicas[1].get_catalog_stamp.return_value = current
+
+        for _ in range(2):
+            self.repository.get_by_id(1)
+        self.replicas[0].get_by_id.assert_not_called()
+        assert self.replicas[1].get_by_id.call_count == 2
+
+        # Depois do intervalo de verificação a réplica volta a ser usada
+        self.replicas[0].get_catalog_stamp.return_value = current
+        self.now[0] = 1.0
+        for _ in range(2):
+            self.repository.get_by_id(1)
+        self.replicas[0].get_by_id.assert_called_once_with(1)
+
+    def test_recent_changes_within_lag_are_tolerated(self):
+        # A réplica está 2s atrás do primário (< max_lag)
+        self.primary.get_catalog_stamp.return_value = stamp(4, 1)
+        self.replicas[0].get_catalog_stamp.return_value = stamp(3, 3)
+
+        self.repository.get_by_id(1)
+
+        self.replicas[0].get_by_id.assert_called_once_with(1)
+
+    def test_stuck_replica_is_stale_while_primary_keeps_writing(self):
+        # O primário acabou de ser escrito, mas as réplicas pararam há uma hora
+        self.primary.get_catalog_stamp.return_value = stamp(4, 0.5)
+        self.primary.get_by_id.return_value = make_product(1)
+        for replica in self.replicas:
+            replica.get_catalog_stamp.return_value = stamp(3, 3600)
+
+        self.repository.get_by_id(1)
+
+        self.primary.get_by_id.assert_called_once_with(1)
+        for replica in self.replicas:
+            replica.get_by_id.assert_not_called()
+
+    def test_failing_replica_falls_back_to_primary(self):
+        self.replicas[0].get_by_id.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        self.primary.get_by_id.return_value = make_product(1)
+
+        assert self.repository.get_by_id(1).id == 1
+        self.primary.get_by_id.assert_called_once_with(1)
+        assert not self.monitor.is_fresh(0)
+
+    def test_no_fresh_replica_reads_from_primary(self):
+        for replica in self.replicas:
+            replica.get_catalog_stamp.return_value = stamp(2, 60)
+
+        self.repository.get_all()
+
+        self.primary.get_all.assert_called_once()
+
+
+def test_factory_splits_reads_only_when_readers_are_configured():
+    session = MagicMock()
+
+    assert not isinstance(
+        get_product_repository(RepositoryType.SQL, session), ReadWriteSplitRepository
+    )
+    repository = get_product_repository(RepositoryType.SQL, session, replica_sessions=[MagicMock()])
+    assert isinstance(repository, ReadWriteSplitRepository)
+    assert len(repository.readers) == 1
+
+
+def test_millisecond_stamps_of_the_mongo_read_model_count_as_caught_up():
+    monitor = ReplicaMonitor(max_lag=5, check_interval=1)
+    primary = CatalogStamp(count=2, last_modified=datetime(2024, 1, 1, 12, 0, 0, 123456))
+    replica = CatalogStamp(count=2, last_modified=datetime(2024, 1, 1, 12, 0, 0, 123000))
+
+    assert monitor.is_within_lag(primary, replica)
+    assert not monitor.is_within_lag(primary, replica.model_copy(update={"count": 1}))
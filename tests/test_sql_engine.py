@@ -0,0 +1,165 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.adapters.models.pool_metrics import PoolMetrics, get_sql_pool_metrics
+from app.adapters.models.sql.base import Base
+from app.adapters.models.sql.search_index import has_search_index
+from app.adapters.models.sql.engine import (
+    TimedQueuePool,
+    engine_options,
+    install_engine_hooks,
+    pool_status,
+)
+from app.adapters.models.sql.session import dispose_engine, get_db, get_engine, init_db
+from app.config import settings
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "migrations"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_engine_options_for_sqlite():
+    # Banco em memória mantém o pool padrão do SQLAlchemy
+    options = engine_options("sqlite:///:memory:")
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert "poolclass" not in options
+
+    options = engine_options("sqlite:///./products.db")
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 5
+
+
+def test_sqlite_pragmas_and_pool_metrics(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url))
+    install_engine_hooks(engine, url)
+    checkouts = get_sql_pool_metrics("primary").snapshot()["checkouts"]
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+
+    status = pool_status(engine)
+    assert status["name"] == "primary"
+    assert status["class"] == "TimedQueuePool"
+    assert status["idle"] == 1
+    assert status["checkouts"] == checkouts + 1
+    engine.dispose()
+
+
+def test_each_engine_reports_its_own_pool_metrics(tmp_path):
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url, **engine_options(url, pool_name="replica_test"))
+    install_engine_hooks(engine, url)
+    primary_checkouts = get_sql_pool_metrics("primary").snapshot()["checkouts"]
+
+    with engine.connect():
+        pass
+    # O pool da réplica não se mistura com o do primário, nem depois do dispose
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert get_sql_pool_metrics("replica_test").snapshot()["checkouts"] == 2
+    assert get_sql_pool_metrics("primary").snapshot()["checkouts"] == primary_checkouts
+    assert pool_status(engine)["name"] == "replica_test"
+    engine.dispose()
+
+
+def test_pool_metrics_snapshot():
+    metrics = PoolMetrics()
+    metrics.record_checkout()
+    metrics.record_checkout()
+    metrics.record_checkin()
+    metrics.record_wait(0.2)
+    metrics.record_wait(0.4)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checked_out"] == 1
+    assert snapshot["max_checked_out"] == 2
+    assert round(snapshot["wait_seconds_avg"], 2) == 0.3
+    assert snapshot["wait_seconds_max"] == 0.4
+
+
+def test_init_db_warms_up_pool_and_dispose_resets_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQL_DATABASE_URL", f"sqlite:///{tmp_path / 'lazy.db'}")
+    dispose_engine()
+
+    init_db(create_schema=True, warmup=2)
+    engine = get_engine()
+    assert "products" in inspect(engine).get_table_names()
+    assert pool_status(engine)["idle"] == 2
+
+    dispose_engine()
+    assert get_engine.cache_info().currsize == 0
+
+
+@pytest.mark.anyio
+async def test_get_db_checks_out_a_connection_only_when_queried(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQL_DATABASE_URL", f"sqlite:///{tmp_path / 'lazy.db'}")
+    dispose_engine()
+    checkouts = get_sql_pool_metrics("primary").snapshot()["checkouts"]
+
+    # Requisição que não consulta o banco
+    dependency = get_db()
+    db = await dependency.__anext__()
+    await dependency.aclose()
+    assert get_sql_pool_metrics("primary").snapshot()["checkouts"] == checkouts
+
+    # Requisição que consulta: a conexão é devolvida ao pool no fechamento
+    dependency = get_db()
+    db = await dependency.__anext__()
+    db.execute(text("SELECT 1"))
+    await dependency.aclose()
+    assert not db.in_transaction()
+    assert get_sql_pool_metrics("primary").snapshot()["checked_out"] == 0
+    dispose_engine()
+
+
+def test_migrations_bring_a_legacy_database_up_to_the_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        # Tabela criada antes dos índices e da coluna version
+        connection.execute(text(
+            "CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+            "description VARCHAR NOT NULL, category VARCHAR NOT NULL, price FLOAT NOT NULL, "
+            "quantity INTEGER, created_at DATETIME, updated_at DATETIME)"
+        ))
+        connection.execute(text("CREATE INDEX ix_products_id ON products (id)"))
+        connection.execute(text("CREATE INDEX ix_products_name ON products (name)"))
+        connection.execute(text(
+            "INSERT INTO products (name, description, category, price, quantity) "
+            "VALUES ('Burger', 'Tasty', 'Main Item', 10, 1)"
+        ))
+    # Os scripts têm corpos de trigger, então rodam inteiros; os de Postgres ficam de fora
+    raw = engine.raw_connection()
+    try:
+        for script in sorted(MIGRATIONS.glob("*.sql")):
+            if not script.name.endswith(".postgresql.sql"):
+                raw.driver_connection.executescript(script.read_text())
+    finally:
+        raw.close()
+
+    # Só as migrações, como com SQL_CREATE_SCHEMA=false: todas as tabelas dos modelos existem
+    inspector = inspect(engine)
+    for table in Base.metadata.tables.values():
+        assert {column["name"] for column in inspector.get_columns(table.name)} == {
+            column.name for column in table.columns
+        }
+        assert {index["name"] for index in inspector.get_indexes(table.name)} >= {
+            index.name for index in table.indexes
+        }
+    # E create_all não tem mais nada a fazer
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version FROM products")).scalar() == 1
+        # Produtos antigos entram no índice de busca
+        assert has_search_index(connection)
+        match = text("SELECT rowid FROM products_fts WHERE products_fts MATCH 'burger'")
+        assert connection.execute(match).all()
+    engine.dispose()
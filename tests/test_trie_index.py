@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from app.adapters.search.trie_index import TrieIndex, tokenize
+from app.domain.entities.product import ProductCategory, ProductDb
+
+
+def make_product(product_id: int, name: str, description: str) -> ProductDb:
+    now = datetime(2024, 1, 1)
+    return ProductDb(
+        id=product_id, name=name, description=description,
+        category=ProductCategory.MAIN_ITEM, price=1.0, quantity=1,
+        created_at=now, updated_at=now
+    )
+
+
+class TestTrieIndex:
+    def setup_method(self):
+        self.index = TrieIndex()
+        self.index.rebuild([
+            make_product(1, "Cheese Burger", "Beef with cheddar"),
+            make_product(2, "Fries", "Great with a burger"),
+            make_product(3, "Burrito", "Beans and cheese"),
+        ], stamp="v1")
+
+    def search(self, query: str, limit: int = 10):
+        return [product.id for product in self.index.search(tokenize(query), limit)]
+
+    def test_tokenize(self):
+        assert tokenize("Cheese-Burger, EXTRA!") == ["cheese", "burger", "extra"]
+
+    def test_name_matches_rank_first(self):
+        assert self.search("burger") == [1, 2]
+
+    def test_prefix_and_all_terms_required(self):
+        assert self.search("bur") == [1, 3, 2]
+        assert self.search("chee bur") == [1, 3]
+        assert self.search("cheese fries") == []
+
+    def test_limit_and_rebuild(self):
+        assert self.search("bur", limit=1) == [1]
+        self.index.rebuild([make_product(4, "Veggie Burger", "Plant based")], stamp="v2")
+        assert self.index.stamp == "v2"
+        assert len(self.index) == 1
+        assert self.search("burger") == [4]